@@ -0,0 +1,414 @@
+"""
+End-to-end benchmark suite of the API stack.
+
+Drives the same scenarios through three entry points: src.app through the
+Flask test client, src.app behind a real WSGI server (werkzeug's threaded
+server, in this process, over one keep-alive HTTP connection), and
+lambda_function.lambda_handler with API Gateway events. Storage is a
+deterministic local backend: the InMemoryTaskRepository for src.app and an
+in-memory collection for lambda_function, both filled from a fixed random
+seed, so that two runs on the same machine do the same work.
+
+The scenarios are login, a listing at each store size (1k, 100k and 1M tasks
+by default) and get, create, update and delete at the largest size. Listings
+from src.app return the first page of the user's tasks; lambda_function has
+no pagination and returns every task, and no single-task GET, so its get
+scenario is skipped. Each scenario sends requests one at a time for
+--requests requests or --seconds, whichever ends first, after a short warm-up,
+and reports throughput and p50/p95/p99 latency. gunicorn with several workers
+is measured by bench_server.py.
+
+Results are printed as a table and, with --output, written as JSON. The
+comparison mode reads two such files and flags every scenario whose p50
+latency grew by more than --threshold and by more than --min-delta-ms, which
+keeps run-to-run noise on sub-millisecond scenarios from being reported. The
+p95 and throughput changes are shown next to it: tail latency varies too much
+between runs on a shared machine to gate on, and with one client sending
+requests back to back throughput is the inverse of the mean latency. The comparison
+exits with status 1 when there is any regression, so it can gate a CI job.
+
+Usage (from the backend directory):
+    python benchmarks/bench_api.py [--targets flask,wsgi,lambda] [--sizes 1000,100000,1000000] [--requests N] [--seconds S] [--output results.json]
+    python benchmarks/bench_api.py --compare BASELINE.json CURRENT.json [--threshold 0.2] [--min-delta-ms 0.1]
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import lambda_function
+from src import codec
+from src.api import handlers
+from src.app import app
+from src.domain.models import Task
+from src.infrastructure.memory_repository import InMemoryTaskRepository, InMemoryUserRepository
+
+SEED = 1
+USERS = 100
+BENCH_USER = "user-0"
+BENCH_PASSWORD = "bench-password"
+PAGE_SIZE = 50
+WARMUP_REQUESTS = 3
+LOAD_BATCH_SIZE = 100000
+START = datetime(2023, 1, 1)
+
+# lambda_function validates its own status names
+LAMBDA_STATUSES = {"pending": "TODO", "in_progress": "IN_PROGRESS", "completed": "COMPLETED"}
+
+
+class MemoryCollection:
+    """The part of a pymongo collection used by lambda_function, backed by a dict keyed by task id."""
+
+    def __init__(self):
+        self.documents = {}
+
+    def load(self, documents):
+        for document in documents:
+            document["_id"] = str(len(self.documents))
+            self.documents[document["id"]] = document
+
+    def find(self):
+        return list(self.documents.values())
+
+    def insert_one(self, document):
+        document["_id"] = str(len(self.documents))
+        self.documents[document["id"]] = document
+        return type("InsertOneResult", (), {"inserted_id": document["_id"]})
+
+    def find_one_and_update(self, query, update, return_document=None):
+        document = self.documents.get(query["id"])
+        if document is None:
+            return None
+        document.update(update["$set"])
+        return dict(document)
+
+    def delete_one(self, query):
+        deleted = self.documents.pop(query["id"], None) is not None
+        return type("DeleteResult", (), {"deleted_count": int(deleted)})
+
+
+class FlaskClient:
+    """Sends requests to src.app through the Flask test client."""
+
+    def __init__(self):
+        self.client = app.test_client()
+
+    def send(self, method, path, body=None, token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+    def close(self):
+        pass
+
+
+class WsgiClient:
+    """Serves src.app with a threaded WSGI server and sends requests over one keep-alive connection."""
+
+    def __init__(self):
+        from werkzeug.serving import make_server
+
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port)
+
+    def send(self, method, path, body=None, token=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        payload = codec.dumps(body).encode("utf-8") if body is not None else None
+        self.connection.request(method, path, body=payload, headers=headers)
+        response = self.connection.getresponse()
+        data = response.read()
+        return response.status, json.loads(data) if data else None
+
+    def close(self):
+        self.connection.close()
+        self.server.shutdown()
+
+
+class LambdaClient:
+    """Calls lambda_function.lambda_handler with API Gateway events."""
+
+    def send(self, method, path, body=None, token=None):
+        event = {
+            "httpMethod": method,
+            "path": path,
+            "headers": {"Authorization": f"Bearer {token}"} if token else {},
+            "pathParameters": {"id": path.rsplit("/", 1)[-1]},
+            "body": codec.dumps(body) if body is not None else None
+        }
+        response = lambda_function.lambda_handler(event, None)
+        return response["statusCode"], codec.loads(response["body"])
+
+    def close(self):
+        pass
+
+
+def task_batch(rng, start, count):
+    """Builds tasks start to start + count - 1, identical on every run."""
+    tasks = []
+    for i in range(start, start + count):
+        created_at = START + timedelta(seconds=i)
+        tasks.append(Task(
+            task_id=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            title=f"Task {i}",
+            description="Task used by the end-to-end benchmark " * rng.randrange(1, 4),
+            status=rng.choice(list(LAMBDA_STATUSES)),
+            created_by=f"user-{rng.randrange(USERS)}",
+            created_at=created_at,
+            updated_at=created_at + timedelta(seconds=rng.randrange(30 * 86400))
+        ))
+    return tasks
+
+
+def lambda_document(task):
+    return {
+        "id": task.task_id,
+        "title": task.title,
+        "description": task.description,
+        "status": LAMBDA_STATUSES[task.status],
+        "created_at": task.created_at.isoformat(),
+        "updated_at": task.updated_at.isoformat(),
+        "created_by": task.created_by
+    }
+
+
+class Stores:
+    """The seeded backends of both stacks, grown in place from one deterministic task sequence."""
+
+    def __init__(self, api, lambda_):
+        self.rng = random.Random(SEED)
+        self.size = 0
+        self.owned = []
+        self.repository = InMemoryTaskRepository() if api else None
+        self.collection = MemoryCollection() if lambda_ else None
+        if api:
+            handlers.task_repository = self.repository
+            handlers.task_service = None
+            handlers.user_repository, handlers.auth_service = InMemoryUserRepository(), None
+            handlers.get_auth_service().register(BENCH_USER, BENCH_PASSWORD)
+        if lambda_:
+            lambda_function.collection = self.collection
+
+    def grow(self, size):
+        while self.size < size:
+            tasks = task_batch(self.rng, self.size, min(LOAD_BATCH_SIZE, size - self.size))
+            self.size += len(tasks)
+            self.owned.extend(task.task_id for task in tasks if task.created_by == BENCH_USER)
+            if self.repository is not None:
+                self.repository.save_many(tasks)
+            if self.collection is not None:
+                self.collection.load(lambda_document(task) for task in tasks)
+
+
+def measure(call, requests, seconds):
+    """
+    Runs a scenario and summarizes its latencies.
+
+    The call returns whether the response had the expected status, or None
+    when the scenario has nothing left to do.
+    """
+    for _ in range(WARMUP_REQUESTS):
+        call()
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    while len(latencies) < requests and time.perf_counter() - started < seconds:
+        start = time.perf_counter()
+        ok = call()
+        if ok is None:
+            break
+        latencies.append(time.perf_counter() - start)
+        errors += not ok
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(q):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000, 3) if latencies else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 1) if latencies else 0.0,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99)
+    }
+
+
+class Scenarios:
+    """The requests of each scenario in the dialect of one stack."""
+
+    def __init__(self, client, is_lambda, owned):
+        self.client = client
+        self.is_lambda = is_lambda
+        self.owned = owned
+        self.created = []
+        self.counter = 0
+        self.credentials = {"username": "admin", "password": "password"} if is_lambda \
+            else {"username": BENCH_USER, "password": BENCH_PASSWORD}
+        status, body = client.send("POST", "/login" if is_lambda else "/auth/login", self.credentials)
+        if status != 200:
+            raise RuntimeError(f"login failed with status {status}")
+        self.token = body["access_token"] if is_lambda else body["token"]
+
+    def next_owned(self):
+        self.counter += 1
+        return self.owned[self.counter % len(self.owned)]
+
+    def login(self):
+        return self.client.send("POST", "/login" if self.is_lambda else "/auth/login", self.credentials)[0] == 200
+
+    def list(self):
+        path = "/tasks" if self.is_lambda else f"/tasks?limit={PAGE_SIZE}"
+        return self.client.send("GET", path, token=self.token)[0] == 200
+
+    def get(self):
+        return self.client.send("GET", f"/tasks/{self.next_owned()}", token=self.token)[0] == 200
+
+    def create(self):
+        body = {"title": "Benchmark task", "description": "Created by the end-to-end benchmark"}
+        status, response = self.client.send("POST", "/tasks", body, self.token)
+        if status == 201:
+            self.created.append(response["task"]["id"] if self.is_lambda else response["task_id"])
+        return status == 201
+
+    def update(self):
+        status = LAMBDA_STATUSES["completed"] if self.is_lambda else "completed"
+        return self.client.send("PUT", f"/tasks/{self.next_owned()}", {"status": status}, self.token)[0] == 200
+
+    def delete(self):
+        if not self.created:
+            return None
+        return self.client.send("DELETE", f"/tasks/{self.created.pop()}", token=self.token)[0] == 204
+
+
+CLIENTS = {"flask": FlaskClient, "wsgi": WsgiClient, "lambda": LambdaClient}
+
+
+def run(targets, sizes, requests, seconds):
+    """Runs every scenario on every target and returns the results keyed by target and scenario."""
+    stores = Stores(api=bool({"flask", "wsgi"} & set(targets)), lambda_="lambda" in targets)
+    clients = {target: CLIENTS[target]() for target in targets}
+    scenarios = {}
+    results = {target: {} for target in targets}
+    try:
+        for size in sorted(sizes):
+            stores.grow(size)
+            print(f"{stores.size} tasks loaded", file=sys.stderr)
+            for target in targets:
+                if target not in scenarios:
+                    scenarios[target] = Scenarios(clients[target], target == "lambda", stores.owned)
+                    results[target]["login"] = measure(scenarios[target].login, requests, seconds)
+                results[target][f"list_{size}"] = measure(scenarios[target].list, requests, seconds)
+
+        for target in targets:
+            names = ["create", "update", "delete"] if target == "lambda" else ["get", "create", "update", "delete"]
+            for name in names:
+                results[target][name] = measure(getattr(scenarios[target], name), requests, seconds)
+    finally:
+        for client in clients.values():
+            client.close()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print(f"{'target':<8}{'scenario':<16}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for target, scenarios in results.items():
+        for name, result in scenarios.items():
+            print(
+                f"{target:<8}{name:<16}{result['throughput']:>10,.1f}{result['p50_ms']:>10.3f}"
+                f"{result['p95_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['errors']:>8}"
+            )
+
+
+def compare(baseline, current, threshold, min_delta_ms):
+    """Prints the changes between two result files and returns the scenarios that regressed."""
+    regressions = []
+    print(f"{'target':<8}{'scenario':<16}{'p50 change':>12}{'p95 change':>12}{'req/s change':>14}")
+    for target, scenarios in current["results"].items():
+        for name, result in scenarios.items():
+            before = baseline["results"].get(target, {}).get(name)
+            if not before or not before["requests"] or not result["requests"]:
+                print(f"{target:<8}{name:<16}{'not in both runs':>38}")
+                continue
+            p50 = result["p50_ms"] / before["p50_ms"] - 1
+            p95 = result["p95_ms"] / before["p95_ms"] - 1
+            throughput = result["throughput"] / before["throughput"] - 1
+            regressed = p50 > threshold and result["p50_ms"] - before["p50_ms"] > min_delta_ms
+            if regressed:
+                regressions.append(f"{target}/{name}")
+            print(
+                f"{target:<8}{name:<16}{p50:>+12.1%}{p95:>+12.1%}{throughput:>+14.1%}"
+                + ("  REGRESSION" if regressed else "")
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--targets", default="flask,wsgi,lambda")
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--output")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"))
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--min-delta-ms", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as baseline, open(args.compare[1]) as current:
+            regressions = compare(json.load(baseline), json.load(current), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"{len(regressions)} regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        return
+
+    targets = args.targets.split(",")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(targets, sizes, args.requests, args.seconds)
+    print_results(results)
+    if args.output:
+        report = {
+            "meta": {
+                "created_at": datetime.utcnow().isoformat(),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "sizes": sizes,
+                "requests": args.requests,
+                "seconds": args.seconds
+            },
+            "results": results
+        }
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
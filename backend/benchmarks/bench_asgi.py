@@ -0,0 +1,133 @@
+"""
+Benchmark of the ASGI application against the threaded Flask deployment.
+
+Starts the API with src.serve (gunicorn, threads per worker) and with uvicorn
+serving src.asgi, with the same number of processes, then holds many
+concurrent keep-alive connections open against each, every connection sending
+requests back to back for a fixed time. By default the request is an
+authenticated ``GET /tasks?limit=20``, which needs MongoDB running and is
+where waiting on the database lets the event loop overlap requests that
+threads cannot; with ``--no-db`` it is an unauthenticated ``GET /tasks``,
+which only measures the per-request overhead of each stack.
+
+Usage (from the backend directory):
+    python benchmarks/bench_asgi.py [--no-db] [--connections N] [--seconds S] [--workers N] [--threads N]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from src.config import JWT_SECRET
+from src.infrastructure.jwt_backends import HS256Backend
+
+HOST = "127.0.0.1"
+
+
+def wait_for_port(port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server did not start listening on port {port}")
+
+
+async def connection_loop(port, request, deadline, latencies, errors):
+    """Sends requests on one keep-alive connection until the deadline."""
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+    except OSError:
+        errors.append(1)
+        return
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    except (OSError, asyncio.IncompleteReadError):
+        errors.append(1)
+    finally:
+        writer.close()
+
+
+async def load(port, request, connections, seconds):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(connection_loop(port, request, deadline, latencies, errors) for _ in range(connections)))
+    return latencies, len(errors)
+
+
+def measure(command, port, request, connections, seconds):
+    """Starts a server, loads it and returns requests per second, p50 and p99 in ms, and failed connections."""
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        asyncio.run(load(port, request, 1, 0.5))
+        latencies, errors = asyncio.run(load(port, request, connections, seconds))
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    if not latencies:
+        return 0.0, 0.0, 0.0, errors
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    return len(latencies) / seconds, p50, p99, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--no-db", action="store_true")
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8010)
+    args = parser.parse_args()
+
+    headers = f"Host: {HOST}\r\nConnection: keep-alive\r\n"
+    path = "/tasks"
+    if not args.no_db:
+        token = HS256Backend(JWT_SECRET).encode({"sub": "bench", "exp": datetime.utcnow() + timedelta(hours=1)})
+        path = "/tasks?limit=20"
+        headers += f"Authorization: Bearer {token}\r\n"
+    request = f"GET {path} HTTP/1.1\r\n{headers}\r\n".encode("ascii")
+
+    servers = [
+        (f"flask {args.workers}x{args.threads} threads", [
+            sys.executable, "-m", "src.serve", "--bind", f"{HOST}:{args.port}",
+            "--workers", str(args.workers), "--threads", str(args.threads)
+        ]),
+        (f"asgi {args.workers} process", [
+            sys.executable, "-m", "uvicorn", "src.asgi:app", "--host", HOST, "--port", str(args.port),
+            "--workers", str(args.workers), "--no-access-log"
+        ]),
+    ]
+
+    print(f"GET {path}, {args.connections} connections for {args.seconds:.0f} s")
+    print(f"{'server':<24}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'failed':>8}")
+    for name, command in servers:
+        throughput, p50, p99, errors = measure(command, args.port, request, args.connections, args.seconds)
+        print(f"{name:<24}{throughput:>10,.0f}{p50:>10.2f}{p99:>10.2f}{errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark of serializing a task listing to JSON.
+
+Compares the previous approach, where ``to_dict`` formatted every date with
+``isoformat`` before handing the result to the standard library encoder, with
+the application codec, which receives datetime objects and serializes them
+natively. The codec uses orjson when it is installed.
+
+Usage (from the backend directory):
+    python benchmarks/bench_json_codec.py [--tasks N] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import codec
+from src.domain.models import Task
+
+
+def build_tasks(count):
+    start = datetime(2023, 1, 1)
+    return [
+        Task(
+            title=f"Benchmark task {i}",
+            description="A task used to measure serialization " * 3,
+            status=("pending", "in_progress", "completed")[i % 3],
+            created_by=f"user-{i % 100}",
+            created_at=start + timedelta(minutes=i),
+            updated_at=start + timedelta(minutes=i, microseconds=i)
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_dumps(tasks):
+    """Serializes tasks the way responses were built before the codec."""
+    items = []
+    for task in tasks:
+        data = task.to_dict()
+        data["created_at"] = data["created_at"].isoformat()
+        data["updated_at"] = data["updated_at"].isoformat()
+        items.append(data)
+    return json.dumps({"tasks": items})
+
+
+def codec_dumps(tasks):
+    return codec.dumps({"tasks": [task.to_dict() for task in tasks]})
+
+
+def best_of(func, tasks, repeat):
+    """Returns the fastest of several runs in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(tasks)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    tasks = build_tasks(args.tasks)
+    assert json.loads(legacy_dumps(tasks)) == codec.loads(codec_dumps(tasks))
+
+    legacy = best_of(legacy_dumps, tasks, args.repeat)
+    current = best_of(codec_dumps, tasks, args.repeat)
+
+    print(f"Serializing {args.tasks} tasks (best of {args.repeat})")
+    print(f"{'stdlib json + isoformat':<28}{legacy:>10.1f} ms")
+    print(f"{'codec (' + codec.BACKEND + ')':<28}{current:>10.1f} ms")
+    print(f"{'speedup':<28}{legacy / current:>10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark of the JWT backends: import time and verification latency.
+
+Measures, in fresh interpreters, the time to import the authentication module
+with each backend, then the latency of verifying the same HS256 token with the
+built-in HS256 backend and with python-jose. The token cache is not involved.
+
+Usage (from the backend directory):
+    python benchmarks/bench_jwt_backend.py [--verifications N] [--imports N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from src.config import JWT_SECRET
+from src.infrastructure.jwt_backends import HS256Backend, JoseBackend
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); "
+    "from src.infrastructure.auth import JwtAuthService; JwtAuthService(); "
+    "print(time.perf_counter() - start)"
+)
+
+
+def import_seconds(backend, runs):
+    """Returns the best time to import and build the auth service in a new interpreter."""
+    env = dict(os.environ, JWT_BACKEND=backend)
+    best = float("inf")
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        best = min(best, float(output))
+    return best
+
+
+def verify_microseconds(backend, token, count):
+    """Returns the mean time of one verification."""
+    backend.decode(token)
+    start = time.perf_counter()
+    for _ in range(count):
+        backend.decode(token)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--verifications", type=int, default=20000)
+    parser.add_argument("--imports", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = [("hs256", "auto", HS256Backend(JWT_SECRET)), ("jose", "jose", JoseBackend(JWT_SECRET, "HS256"))]
+    token = backends[0][2].encode({"sub": "bench", "exp": datetime.utcnow() + timedelta(hours=1)})
+
+    print(f"{args.verifications} verifications, best of {args.imports} imports")
+    print(f"{'backend':<10}{'import ms':>12}{'verify us':>12}")
+    for name, setting, backend in backends:
+        imported = import_seconds(setting, args.imports) * 1000
+        verify = verify_microseconds(backend, token, args.verifications)
+        print(f"{name:<10}{imported:>12.1f}{verify:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
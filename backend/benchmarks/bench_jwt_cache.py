@@ -0,0 +1,70 @@
+"""
+Benchmark of authenticated request throughput with and without the token cache.
+
+Runs GET /tasks/<id> through the native handler path with the same bearer
+token on every request, as a polling client would, once with the verified
+token cache disabled and once with it enabled. Storage is stubbed out so that
+token verification dominates the cost of a request.
+
+Usage (from the backend directory):
+    python benchmarks/bench_jwt_cache.py [--requests N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api import handlers
+from src.domain.models import Task
+from src.infrastructure.auth import JwtAuthService
+
+
+class StubTaskService:
+    """Task service returning one prebuilt task without touching storage."""
+
+    def __init__(self):
+        self.task = Task(title="Benchmark task", created_by="bench")
+
+    def get_task_by_id_for_user(self, task_id, user_id):
+        return self.task
+
+
+def requests_per_second(auth_service, token, task_id, count):
+    handlers.auth_service = auth_service
+    event = {
+        "headers": {"Authorization": f"Bearer {token}"},
+        "pathParameters": {"taskId": task_id}
+    }
+    assert handlers.get_task.native(event, None)["statusCode"] == 200
+
+    start = time.perf_counter()
+    for _ in range(count):
+        handlers.get_task.native(event, None)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    handlers.task_service = StubTaskService()
+    task_id = handlers.task_service.task.task_id
+    token = JwtAuthService(token_cache_size=0).register("bench", "benchmark-password")
+
+    uncached = requests_per_second(JwtAuthService(token_cache_size=0), token, task_id, args.requests)
+    cached_service = JwtAuthService()
+    cached = requests_per_second(cached_service, token, task_id, args.requests)
+
+    print(f"{args.requests} requests with one token")
+    print(f"{'without token cache':<22}{uncached:>12,.0f} req/s")
+    print(f"{'with token cache':<22}{cached:>12,.0f} req/s")
+    print(f"{'speedup':<22}{cached / uncached:>12.1f} x")
+    print(f"cache stats: {cached_service.token_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
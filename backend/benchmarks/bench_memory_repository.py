@@ -0,0 +1,103 @@
+"""
+Benchmark of the in-memory task repository against a full scan.
+
+Fills an InMemoryTaskRepository with tasks spread over many users and times
+the first page of one user's listing, a filtered listing, a deep keyset page
+and a lookup by id, then the same listings answered by filtering and sorting
+every task, as an unindexed store has to.
+
+Usage (from the backend directory):
+    python benchmarks/bench_memory_repository.py [--tasks N] [--users N] [--iterations N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domain.models import Task
+from src.domain.pagination import encode_cursor
+from src.domain.queries import TaskQuery
+from src.infrastructure.memory_repository import InMemoryTaskRepository
+
+PAGE_SIZE = 50
+
+
+def build(count, users):
+    rng = random.Random(1)
+    start = datetime(2023, 1, 1)
+    return [
+        Task(
+            title=f"Task {i}",
+            status=rng.choice(["pending", "in_progress", "completed"]),
+            created_by=f"user-{rng.randrange(users)}",
+            created_at=start + timedelta(seconds=i),
+            updated_at=start + timedelta(seconds=rng.randrange(count))
+        )
+        for i in range(count)
+    ]
+
+
+def scan(tasks, user, status=None, after=None):
+    """First page of a user's tasks, newest update first, by filtering and sorting everything."""
+    matching = [
+        t for t in tasks
+        if t.created_by == user and (status is None or t.status == status)
+        and (after is None or (t.updated_at, t.task_id) < after)
+    ]
+    matching.sort(key=lambda t: (t.updated_at, t.task_id), reverse=True)
+    return matching[:PAGE_SIZE]
+
+
+def microseconds(function, iterations):
+    function()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    tasks = build(args.tasks, args.users)
+    repository = InMemoryTaskRepository()
+    start = time.perf_counter()
+    repository.save_many(tasks)
+    load_seconds = time.perf_counter() - start
+
+    user = "user-0"
+    owned = repository.get_all_for_user(user)
+    middle = owned[len(owned) // 2]
+    cursor = encode_cursor(middle)
+    pending = TaskQuery(status="pending")
+
+    cases = [
+        ("first page", lambda: repository.get_all_for_user(user, limit=PAGE_SIZE),
+         lambda: scan(tasks, user)),
+        ("status filter", lambda: repository.get_all_for_user(user, limit=PAGE_SIZE, query=pending),
+         lambda: scan(tasks, user, "pending")),
+        ("deep page", lambda: repository.get_all_for_user(user, limit=PAGE_SIZE, cursor=cursor),
+         lambda: scan(tasks, user, after=(middle.updated_at, middle.task_id))),
+        ("get by id", lambda: repository.get_by_id_for_user(middle.task_id, user),
+         lambda: next(t for t in tasks if t.task_id == middle.task_id)),
+    ]
+
+    print(f"{args.tasks} tasks over {args.users} users, loaded in {load_seconds:.2f} s")
+    print(f"{'operation':<16}{'indexed us':>12}{'scan us':>12}{'speedup':>10}")
+    for name, indexed, scanned in cases:
+        fast = microseconds(indexed, args.iterations)
+        slow = microseconds(scanned, max(1, args.iterations // 20))
+        print(f"{name:<16}{fast:>12.1f}{slow:>12.1f}{slow / fast:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark of the request metrics.
+
+Times recording one request (start, observe and finish) on a single thread
+and with several threads recording at once, then rendering the /metrics
+exposition, and the cost the instrumentation adds to an unauthenticated
+GET /tasks through the Flask test client.
+
+Usage (from the backend directory):
+    python benchmarks/bench_metrics.py [--iterations N] [--threads N]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.metrics import RequestMetrics
+
+ROUTES = ["/tasks", "/tasks/<task_id>", "/tasks/batch", "/auth/login"]
+
+
+def record(registry, iterations):
+    for i in range(iterations):
+        series = registry.start("GET", ROUTES[i & 3])
+        registry.observe(series, 200, 0.004, 0, 1500)
+        registry.finish(series)
+
+
+def microseconds(function, iterations):
+    function()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def flask_request_microseconds(enabled, iterations):
+    """Per-request time of GET /tasks without a token, with the hooks registered or removed."""
+    from src.app import app
+
+    hooks = {"before_request": [], "after_request": [], "teardown_request": []}
+    if not enabled:
+        for name in hooks:
+            hooks[name] = list(getattr(app, f"{name}_funcs")[None])
+            getattr(app, f"{name}_funcs")[None] = [
+                f for f in hooks[name] if not f.__name__.endswith("_request_timing")
+            ]
+    client = app.test_client()
+    try:
+        return microseconds(lambda: client.get("/tasks"), iterations)
+    finally:
+        if not enabled:
+            for name, functions in hooks.items():
+                getattr(app, f"{name}_funcs")[None] = functions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    registry = RequestMetrics()
+    start = time.perf_counter()
+    record(registry, args.iterations)
+    single = (time.perf_counter() - start) / args.iterations * 1e6
+
+    per_thread = args.iterations // args.threads
+    threads = [threading.Thread(target=record, args=(registry, per_thread)) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    threaded = (time.perf_counter() - start) / (per_thread * args.threads) * 1e6
+
+    render = microseconds(registry.render, 200)
+    # Alternate the two variants and keep the best round of each, as the request path is noisy
+    requests = max(1, args.iterations // 500)
+    rounds = [(flask_request_microseconds(False, requests), flask_request_microseconds(True, requests)) for _ in range(5)]
+    plain = min(r[0] for r in rounds)
+    instrumented = min(r[1] for r in rounds)
+
+    print(f"{'operation':<28}{'us':>10}")
+    print(f"{'record, 1 thread':<28}{single:>10.2f}")
+    print(f"{f'record, {args.threads} threads':<28}{threaded:>10.2f}")
+    print(f"{'render':<28}{render:>10.1f}")
+    print(f"{'GET /tasks, no metrics':<28}{plain:>10.1f}")
+    print(f"{'GET /tasks, metrics':<28}{instrumented:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark of per-operation latency of the task repositories.
+
+Loads the same tasks into the SQLite, MongoDB and in-memory repositories and
+times each repository operation the API performs on a request: an insert,
+lookups by id, the first and a deep page of a user's listing, a filtered
+listing, a field update and a delete. MongoDB is skipped when no server
+answers at MONGO_URI within MONGO_SERVER_SELECTION_TIMEOUT_MS; its data goes
+to a throwaway database that is dropped afterwards.
+
+Usage (from the backend directory):
+    python benchmarks/bench_repositories.py [--tasks N] [--users N] [--iterations N] [--backends sqlite,mongo,memory]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import MONGO_URI
+from src.domain.models import Task
+from src.domain.pagination import encode_cursor
+from src.domain.queries import TaskQuery
+
+PAGE_SIZE = 50
+BENCH_DB_NAME = "taskmanager_bench"
+
+
+def build(count, users):
+    rng = random.Random(1)
+    start = datetime(2023, 1, 1)
+    return [
+        Task(
+            title=f"Task {i}",
+            description="x" * rng.randrange(200),
+            status=rng.choice(["pending", "in_progress", "completed"]),
+            created_by=f"user-{rng.randrange(users)}",
+            created_at=start + timedelta(seconds=i),
+            updated_at=start + timedelta(seconds=rng.randrange(count))
+        )
+        for i in range(count)
+    ]
+
+
+def open_sqlite(directory):
+    from src.infrastructure.sqlite_repository import SqliteTaskRepository
+
+    repository = SqliteTaskRepository(os.path.join(directory, "bench.db"))
+    return repository, repository.close
+
+
+def open_mongo(directory):
+    from pymongo.errors import PyMongoError
+    from src.infrastructure.mongo_clients import get_client
+    from src.infrastructure.repositories import MongoTaskRepository
+
+    try:
+        get_client(MONGO_URI).admin.command("ping")
+    except PyMongoError:
+        return None, None
+    get_client(MONGO_URI).drop_database(BENCH_DB_NAME)
+    repository = MongoTaskRepository(MONGO_URI, BENCH_DB_NAME, "tasks")
+    return repository, lambda: get_client(MONGO_URI).drop_database(BENCH_DB_NAME)
+
+
+def open_memory(directory):
+    from src.infrastructure.memory_repository import InMemoryTaskRepository
+
+    return InMemoryTaskRepository(), None
+
+
+BACKENDS = {"sqlite": open_sqlite, "mongo": open_mongo, "memory": open_memory}
+
+
+def percentiles(function, arguments):
+    """Calls the function once per argument and returns the p50 and p99 latency in microseconds."""
+    latencies = []
+    for argument in arguments:
+        start = time.perf_counter()
+        function(argument)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6
+
+
+def run(repository, tasks, users, iterations):
+    """Loads the tasks and times every operation, returning the load rate and (name, p50, p99) rows."""
+    start = time.perf_counter()
+    repository.save_many(tasks)
+    load_rate = len(tasks) / (time.perf_counter() - start)
+
+    rng = random.Random(2)
+    picked = [rng.choice(tasks) for _ in range(iterations)]
+    owners = [f"user-{rng.randrange(users)}" for _ in range(iterations)]
+    cursors = {}
+    for user in set(owners):
+        owned = repository.get_all_for_user(user, limit=PAGE_SIZE * 10)
+        cursors[user] = encode_cursor(owned[len(owned) // 2]) if owned else None
+    pending = TaskQuery(status="pending")
+    new_tasks = [Task(title=f"New {i}", created_by=owners[i]) for i in range(iterations)]
+
+    operations = [
+        ("save", repository.save, new_tasks),
+        ("get_by_id", lambda task: repository.get_by_id(task.task_id), picked),
+        ("get_by_id_for_user", lambda task: repository.get_by_id_for_user(task.task_id, task.created_by), picked),
+        ("first page", lambda user: repository.get_all_for_user(user, limit=PAGE_SIZE), owners),
+        ("deep page", lambda user: repository.get_all_for_user(user, limit=PAGE_SIZE, cursor=cursors[user]), owners),
+        ("status filter", lambda user: repository.get_all_for_user(user, limit=PAGE_SIZE, query=pending), owners),
+        ("update_fields", lambda task: repository.update_fields(task.task_id, {"status": "completed"}), picked),
+        ("delete", lambda task: repository.delete(task.task_id), new_tasks),
+    ]
+    return load_rate, [(name, *percentiles(function, arguments)) for name, function, arguments in operations]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--backends", default="sqlite,mongo,memory")
+    args = parser.parse_args()
+
+    tasks = build(args.tasks, args.users)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.backends.split(","):
+            repository, cleanup = BACKENDS[name](directory)
+            if repository is None:
+                print(f"{name}: skipped, no server answering at MONGO_URI")
+                continue
+            try:
+                results[name] = run(repository, tasks, args.users, args.iterations)
+            finally:
+                if cleanup:
+                    cleanup()
+
+    print(f"{args.tasks} tasks over {args.users} users, {args.iterations} calls per operation, latency in us")
+    print(f"{'backend':<10}{'load tasks/s':>14}")
+    for name, (load_rate, _) in results.items():
+        print(f"{name:<10}{load_rate:>14,.0f}")
+    print()
+    print(f"{'operation':<22}" + "".join(f"{name + ' p50':>14}{name + ' p99':>14}" for name in results))
+    for index, (operation, *_) in enumerate(next(iter(results.values()))[1] if results else []):
+        row = "".join(f"{rows[index][1]:>14.1f}{rows[index][2]:>14.1f}" for _, rows in results.values())
+        print(f"{operation:<22}{row}")
+
+
+if __name__ == "__main__":
+    main()
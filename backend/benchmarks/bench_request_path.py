@@ -0,0 +1,98 @@
+"""
+Microbenchmark of the Flask request path: JSON string events vs native bodies.
+
+The legacy path re-encodes the parsed request body into the event, decodes it
+again in the handler, encodes the response body to a string and decodes it
+once more before Flask encodes it for the wire. The native path passes Python
+values end to end and encodes once. Storage and token verification are stubbed
+out so that only the request/response plumbing is measured.
+
+Usage (from the backend directory):
+    python benchmarks/bench_request_path.py [--iterations N] [--page-size N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.app import app, handle_handler_response
+from src.api import handlers
+from src.domain.models import Task
+
+
+class StubTaskService:
+    """Task service returning prebuilt tasks without touching storage."""
+
+    def __init__(self, page_size):
+        start = datetime(2023, 1, 1)
+        self.page = [
+            Task(
+                title=f"Benchmark task {i}",
+                description="A task used to measure request overhead " * 3,
+                status="in_progress",
+                created_by="bench",
+                created_at=start,
+                updated_at=start + timedelta(seconds=i)
+            )
+            for i in range(page_size)
+        ]
+
+    def get_all_tasks_for_user(self, user_id, limit=None, cursor=None, query=None):
+        return self.page
+
+    def create_task(self, title, description, status, user_id):
+        return Task(title=title, description=description, status=status, created_by=user_id)
+
+
+def legacy_request(handler, body):
+    event = {"body": json.dumps(body), "headers": {"Authorization": "Bearer bench"}}
+    response = handler(event, None)
+    response["body"] = json.loads(response["body"])
+    return handle_handler_response(response)
+
+
+def native_request(handler, body):
+    event = {"body": body, "headers": {"Authorization": "Bearer bench"}}
+    return handle_handler_response(handler.native(event, None))
+
+
+def measure(path, handler, body, iterations):
+    """Returns the CPU time per request in microseconds."""
+    for _ in range(min(iterations, 100)):
+        path(handler, body)
+    start = time.process_time()
+    for _ in range(iterations):
+        path(handler, body)
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    handlers.task_service = StubTaskService(args.page_size)
+    handlers.get_auth_service().verify_token = lambda token: {"sub": "bench"}
+
+    cases = [
+        ("create", handlers.create_task, {"title": "New task", "description": "Benchmark", "status": "pending"}),
+        (f"list ({args.page_size} tasks)", handlers.get_tasks, {}),
+    ]
+
+    print(f"{'operation':<20}{'legacy us/req':>15}{'native us/req':>15}{'saved':>10}")
+    with app.app_context():
+        for name, handler, body in cases:
+            legacy = measure(legacy_request, handler, body, args.iterations)
+            native = measure(native_request, handler, body, args.iterations)
+            saved = (legacy - native) / legacy * 100
+            print(f"{name:<20}{legacy:>15.1f}{native:>15.1f}{saved:>9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
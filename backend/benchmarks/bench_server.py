@@ -0,0 +1,115 @@
+"""
+Benchmark of HTTP throughput with the development server and with src.serve.
+
+Starts the API with ``flask run`` (the previous Docker command: one process,
+one thread per request, HTTP/1.0) and with the gunicorn entry point in turn,
+then drives each with client processes that send requests back to back over
+keep-alive connections for a fixed time. By default the request is an
+authenticated ``GET /tasks?limit=20``, which needs MongoDB running; with
+``--no-db`` it is an unauthenticated ``GET /tasks``, which goes through
+routing, the handler and JSON encoding but stops at the 401. src.serve runs
+one worker per CPU by default, or a single one with TASK_STORAGE=memory,
+which src.serve refuses to split across workers.
+
+Usage (from the backend directory):
+    python benchmarks/bench_server.py [--no-db] [--clients N] [--seconds S] [--workers N] [--threads N]
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from src.config import JWT_SECRET, TASK_STORAGE
+from src.infrastructure.jwt_backends import HS256Backend
+
+HOST = "127.0.0.1"
+
+
+def wait_for_port(port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server did not start listening on port {port}")
+
+
+def drive(args):
+    """Sends requests for a fixed time and returns their latencies in seconds."""
+    port, path, headers, seconds = args
+    connection = http.client.HTTPConnection(HOST, port)
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while True:
+        start = time.perf_counter()
+        if start >= deadline:
+            break
+        connection.request("GET", path, headers=headers)
+        connection.getresponse().read()
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+    return latencies
+
+
+def measure(command, port, path, headers, clients, seconds):
+    """Starts a server, loads it and returns requests per second, p50 and p99 in ms."""
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        drive((port, path, headers, 0.5))
+        with multiprocessing.Pool(clients) as pool:
+            results = pool.map(drive, [(port, path, headers, seconds)] * clients)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(latency for result in results for latency in result)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    return len(latencies) / seconds, p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--no-db", action="store_true")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=1 if TASK_STORAGE == "memory" else os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8010)
+    args = parser.parse_args()
+
+    if args.no_db:
+        path, headers = "/tasks", {}
+    else:
+        token = HS256Backend(JWT_SECRET).encode({"sub": "bench", "exp": datetime.utcnow() + timedelta(hours=1)})
+        path, headers = "/tasks?limit=20", {"Authorization": f"Bearer {token}"}
+
+    servers = [
+        ("flask run", [sys.executable, "-m", "flask", "--app", "src/app.py", "run",
+                       "--host", HOST, "--port", str(args.port)]),
+        ("src.serve", [sys.executable, "-m", "src.serve", "--bind", f"{HOST}:{args.port}",
+                       "--workers", str(args.workers), "--threads", str(args.threads)]),
+    ]
+
+    print(f"GET {path}, {args.clients} clients for {args.seconds:.0f} s, "
+          f"src.serve with {args.workers} workers x {args.threads} threads")
+    print(f"{'server':<12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, command in servers:
+        throughput, p50, p99 = measure(command, args.port, path, headers, args.clients, args.seconds)
+        print(f"{name:<12}{throughput:>10,.0f}{p50:>10.2f}{p99:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark of Task memory footprint and construction throughput.
+
+Compares the previous dict-backed Task, built with ``from_dict`` from
+documents holding ISO date strings, with the slotted Task built through the
+trusted ``from_document`` path from documents holding native datetimes, as
+returned by pymongo.
+
+Usage (from the backend directory):
+    python benchmarks/bench_task_model.py [--tasks N] [--repeat N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domain.models import Task
+
+
+class LegacyTask:
+    """Copy of the Task model before it used __slots__."""
+
+    def __init__(self, title: str, description: str = "", status: str = "pending",
+                 task_id: Optional[str] = None, created_at: Optional[datetime] = None,
+                 updated_at: Optional[datetime] = None, created_by: Optional[str] = None):
+        self.task_id = task_id or str(uuid4())
+        self.title = title
+        self.description = description
+        self.status = status
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or self.created_at
+        self.created_by = created_by
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LegacyTask':
+        created_at = data.get("created_at")
+        if created_at and isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+
+        updated_at = data.get("updated_at")
+        if updated_at and isinstance(updated_at, str):
+            updated_at = datetime.fromisoformat(updated_at)
+
+        return cls(
+            task_id=data.get("task_id"),
+            title=data["title"],
+            description=data.get("description", ""),
+            status=data.get("status", "pending"),
+            created_at=created_at,
+            updated_at=updated_at,
+            created_by=data.get("created_by")
+        )
+
+
+def build_documents(count, string_dates):
+    start = datetime(2023, 1, 1)
+    documents = []
+    for i in range(count):
+        created_at = start + timedelta(minutes=i)
+        updated_at = created_at + timedelta(seconds=i % 60)
+        documents.append({
+            "task_id": str(uuid4()),
+            "title": f"Benchmark task {i}",
+            "description": "A task used to measure the model",
+            "status": ("pending", "in_progress", "completed")[i % 3],
+            "created_at": created_at.isoformat() if string_dates else created_at,
+            "updated_at": updated_at.isoformat() if string_dates else updated_at,
+            "created_by": f"user-{i % 100}"
+        })
+    return documents
+
+
+def measure_memory(build, documents):
+    """Returns the bytes allocated to hold the built tasks."""
+    gc.collect()
+    tracemalloc.start()
+    tasks = [build(document) for document in documents]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks
+    return current
+
+
+def measure_throughput(build, documents, repeat):
+    """Returns the best rate in tasks per second."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        [build(document) for document in documents]
+        best = min(best, time.perf_counter() - start)
+    return len(documents) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    string_documents = build_documents(args.tasks, string_dates=True)
+    native_documents = build_documents(args.tasks, string_dates=False)
+
+    cases = [
+        ("legacy from_dict (ISO strings)", LegacyTask.from_dict, string_documents),
+        ("legacy from_dict (datetimes)", LegacyTask.from_dict, native_documents),
+        ("slotted from_dict (datetimes)", Task.from_dict, native_documents),
+        ("slotted from_document", Task.from_document, native_documents),
+    ]
+
+    print(f"{args.tasks} tasks")
+    print(f"{'case':<34}{'memory MB':>12}{'tasks/s':>14}")
+    for name, build, documents in cases:
+        # Memory of the task objects only; date objects are counted when parsed
+        memory = measure_memory(build, documents) / 1024 / 1024
+        rate = measure_throughput(build, documents, args.repeat)
+        print(f"{name:<34}{memory:>12.1f}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,10 @@
-import json
 import os
 import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
-from jose import jwt, JWTError
-from pymongo import MongoClient
-from bson import ObjectId
+from src import codec
+from src.infrastructure.jwt_backends import InvalidTokenError, create_jwt_backend
 
 # MongoDB configuration
 MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017')
@@ -17,11 +15,22 @@ COLLECTION_NAME = os.environ.get('COLLECTION_NAME', 'tasks')
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-for-development')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+jwt_backend = create_jwt_backend(SECRET_KEY, ALGORITHM, os.environ.get('JWT_BACKEND', 'auto'))
 
-# Initialize MongoDB client
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
-collection = db[COLLECTION_NAME]
+# MongoDB client, created on first use so that cold starts do not pay for it
+client = None
+db = None
+collection = None
+
+def get_collection():
+    global client, db, collection
+    if collection is None:
+        from src.infrastructure.mongo_clients import get_client
+
+        client = get_client(MONGO_URI)
+        db = client[DB_NAME]
+        collection = db[COLLECTION_NAME]
+    return collection
 
 def create_response(status_code: int, body: Dict, headers: Dict = None) -> Dict:
     response_headers = {
@@ -35,14 +44,14 @@ def create_response(status_code: int, body: Dict, headers: Dict = None) -> Dict:
     return {
         'statusCode': status_code,
         'headers': response_headers,
-        'body': json.dumps(body)
+        'body': codec.dumps(body)
     }
 
 def verify_token(token: str) -> Dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt_backend.decode(token)
         return payload
-    except JWTError:
+    except InvalidTokenError:
         return None
 
 def authenticate_request(event: Dict) -> Optional[Dict]:
@@ -55,7 +64,7 @@ def authenticate_request(event: Dict) -> Optional[Dict]:
 
 def login(event, context):
     try:
-        credentials = json.loads(event['body'])
+        credentials = codec.loads(event['body'])
         username = credentials.get('username')
         password = credentials.get('password')
         
@@ -78,7 +87,7 @@ def create_access_token(data: Dict, expires_delta: timedelta = None) -> str:
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt_backend.encode(to_encode)
     return encoded_jwt
 
 def get_tasks(event, context):
@@ -88,7 +97,7 @@ def get_tasks(event, context):
         if not user:
             return create_response(401, {"error": "Unauthorized"})
             
-        tasks = list(collection.find())
+        tasks = list(get_collection().find())
         # Convert ObjectId to string for JSON serialization
         for task in tasks:
             task['_id'] = str(task['_id'])
@@ -104,7 +113,7 @@ def create_task(event, context):
         if not user:
             return create_response(401, {"error": "Unauthorized"})
             
-        task_data = json.loads(event['body'])
+        task_data = codec.loads(event['body'])
         
         # Validate required fields
         if not task_data.get('title'):
@@ -120,7 +129,7 @@ def create_task(event, context):
             'created_by': user.get('sub', 'unknown')
         }
         
-        result = collection.insert_one(task)
+        result = get_collection().insert_one(task)
         task['_id'] = str(result.inserted_id)
         
         return create_response(201, {'task': task})
@@ -135,7 +144,7 @@ def update_task(event, context):
             return create_response(401, {"error": "Unauthorized"})
             
         task_id = event['pathParameters']['id']
-        updates = json.loads(event['body'])
+        updates = codec.loads(event['body'])
         
         # Validate status if provided
         if 'status' in updates and updates['status'] not in ['TODO', 'IN_PROGRESS', 'COMPLETED']:
@@ -149,22 +158,18 @@ def update_task(event, context):
         
         update_doc['updated_at'] = datetime.utcnow().isoformat()
         
-        # Find task by ID
-        task = collection.find_one({'id': task_id})
-        if not task:
-            return create_response(404, {'error': 'Task not found'})
-        
-        # Update task
-        result = collection.update_one(
+        from pymongo import ReturnDocument
+
+        # Update task and fetch the result in a single round trip
+        updated_task = get_collection().find_one_and_update(
             {'id': task_id},
-            {'$set': update_doc}
+            {'$set': update_doc},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.modified_count == 0:
+        if not updated_task:
             return create_response(404, {'error': 'Task not found'})
         
-        # Get updated task
-        updated_task = collection.find_one({'id': task_id})
         updated_task['_id'] = str(updated_task['_id'])
         
         return create_response(200, {'task': updated_task})
@@ -180,13 +185,8 @@ def delete_task(event, context):
             
         task_id = event['pathParameters']['id']
         
-        # Find task by ID
-        task = collection.find_one({'id': task_id})
-        if not task:
-            return create_response(404, {'error': 'Task not found'})
-        
-        # Delete task
-        result = collection.delete_one({'id': task_id})
+        # Delete task; deleted_count tells whether it existed
+        result = get_collection().delete_one({'id': task_id})
         
         if result.deleted_count == 0:
             return create_response(404, {'error': 'Task not found'})
@@ -0,0 +1,213 @@
+"""
+Coroutine API handlers for the ASGI application.
+
+Each handler mirrors the one of the same name in ``src.api.handlers`` with the
+storage calls awaited on an AsyncTaskService, so that a request waiting on
+MongoDB holds no thread and one process can keep thousands of them in flight.
+Token verification, validation and response building do not block and are
+shared with the synchronous handlers, as is the auth service.
+
+Handlers return native responses, like the synchronous handlers called
+through ``native``; streamed bodies are asynchronous iterators.
+"""
+
+from datetime import timedelta
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Dict, Optional
+
+from src import codec
+from src.domain.interfaces import AsyncTaskRepository, AsyncTaskService
+from src.domain.models import Task
+from src.domain.exceptions import ResourceNotFoundError
+from src.domain.validators import TaskValidator
+from src.domain.pagination import DEFAULT_PAGE_SIZE, next_cursor
+from src.domain.queries import TaskQuery, parse_query_date
+from src.config import MONGO_URI, DB_NAME, TASK_STREAM_BATCH_SIZE, TASK_SYNC_LAG_SECONDS
+from src.api.error_handler import handle_exceptions_async
+from src.api.events import parse_body
+from src.api.conditional import etag_matches, page_etag, task_etag, version_etag
+from src.api.handlers import (
+    create_response, create_not_modified_response, create_stream_response, get_user_from_token,
+    tombstone_retention, parse_batch_request, report_created_batch, report_applied_batch
+)
+
+# Built on first use by the getters below; assigning them replaces the defaults.
+# The event loop runs one coroutine at a time and building them does not
+# await, so unlike the synchronous getters these need no lock.
+task_repository: Optional[AsyncTaskRepository] = None
+task_service: Optional[AsyncTaskService] = None
+
+def get_task_repository() -> AsyncTaskRepository:
+    """Returns the asynchronous task repository, creating the Motor client on first use."""
+    global task_repository
+    if task_repository is None:
+        from src.infrastructure.async_repositories import MotorTaskRepository
+
+        task_repository = MotorTaskRepository(MONGO_URI, DB_NAME, "tasks", tombstone_retention)
+    return task_repository
+
+def get_task_service() -> AsyncTaskService:
+    """Returns the asynchronous task service, building it and its repository on first use."""
+    global task_service
+    if task_service is None:
+        from src.application.async_services import AsyncTaskServiceImpl
+
+        task_service = AsyncTaskServiceImpl(
+            get_task_repository(),
+            sync_lag=timedelta(seconds=TASK_SYNC_LAG_SECONDS),
+            tombstone_retention=tombstone_retention
+        )
+    return task_service
+
+def reset_singletons() -> None:
+    """Forgets the asynchronous services so the next request builds new ones, e.g. in a forked worker."""
+    global task_repository, task_service
+    task_repository = task_service = None
+
+@handle_exceptions_async
+async def get_tasks(event: Dict, context: Any = None) -> Dict:
+    """Gets one page of the caller's filtered tasks, or the changes after a ``since`` watermark."""
+    user_id = get_user_from_token(event)
+    params = event.get("queryStringParameters") or {}
+
+    TaskValidator.validate_list_query(params, user_id)
+
+    version = await get_task_service().get_tasks_version(user_id)
+    etag = version_etag(user_id, version, params) if version is not None else None
+    if etag and etag_matches(event, etag):
+        return create_not_modified_response(etag)
+
+    limit = int(params.get("limit", DEFAULT_PAGE_SIZE))
+    if "since" in params:
+        changes = await get_task_service().sync_tasks_for_user(user_id, parse_query_date(params["since"]), limit=limit)
+        return create_response(HTTPStatus.OK, changes.to_dict(), etag)
+
+    query = TaskQuery.from_params(params)
+    tasks = await get_task_service().get_all_tasks_for_user(
+        user_id, limit=limit, cursor=params.get("cursor"), query=query
+    )
+    if etag is None:
+        etag = page_etag(user_id, tasks, params)
+        if etag_matches(event, etag):
+            return create_not_modified_response(etag)
+
+    return create_response(HTTPStatus.OK, {
+        "tasks": [task.to_dict() for task in tasks],
+        "next_cursor": next_cursor(tasks, limit, query.sort)
+    }, etag)
+
+async def _ndjson_lines(tasks: AsyncIterator[Task]) -> AsyncIterator[bytes]:
+    """Serializes tasks as newline-delimited JSON, one task per line."""
+    async for task in tasks:
+        yield codec.dumps_bytes(task.to_dict()) + b"\n"
+
+@handle_exceptions_async
+async def stream_tasks(event: Dict, context: Any = None) -> Dict:
+    """Streams the caller's filtered tasks as newline-delimited JSON, reading them in batches."""
+    user_id = get_user_from_token(event)
+    params = event.get("queryStringParameters") or {}
+
+    TaskValidator.validate_list_query(params, user_id)
+
+    limit = int(params["limit"]) if params.get("limit") else None
+    tasks = get_task_service().iter_tasks_for_user(
+        user_id,
+        limit=limit,
+        cursor=params.get("cursor"),
+        query=TaskQuery.from_params(params),
+        batch_size=TASK_STREAM_BATCH_SIZE
+    )
+    return create_stream_response(HTTPStatus.OK, _ndjson_lines(tasks), "application/x-ndjson")
+
+@handle_exceptions_async
+async def get_task(event: Dict, context: Any = None) -> Dict:
+    """Gets a specific task, answering a matching If-None-Match with 304."""
+    user_id = get_user_from_token(event)
+    task_id = event["pathParameters"]["taskId"]
+
+    TaskValidator.validate_task_id(task_id)
+
+    task = await get_task_service().get_task_by_id_for_user(task_id, user_id)
+    if not task:
+        raise ResourceNotFoundError("Task", task_id)
+
+    etag = task_etag(task)
+    if etag_matches(event, etag):
+        return create_not_modified_response(etag)
+    return create_response(HTTPStatus.OK, task.to_dict(), etag)
+
+@handle_exceptions_async
+async def create_task(event: Dict, context: Any = None) -> Dict:
+    """Creates a new task."""
+    user_id = get_user_from_token(event)
+    body = parse_body(event)
+
+    TaskValidator.validate_create_task(body)
+
+    task = await get_task_service().create_task(
+        title=body["title"],
+        description=body.get("description", ""),
+        status=body.get("status", "pending"),
+        user_id=user_id
+    )
+    return create_response(HTTPStatus.CREATED, task.to_dict())
+
+@handle_exceptions_async
+async def create_tasks_batch(event: Dict, context: Any = None) -> Dict:
+    """Creates up to TASK_BATCH_MAX_SIZE tasks with a single write, reporting each one."""
+    user_id, items, invalid, valid = parse_batch_request(event, TaskValidator.validate_create_task)
+    tasks, failed = [], {}
+    if valid:
+        tasks, failed = await get_task_service().create_tasks([items[index] for index in valid], user_id)
+    return report_created_batch(invalid, valid, tasks, failed)
+
+@handle_exceptions_async
+async def update_tasks_batch(event: Dict, context: Any = None) -> Dict:
+    """Updates up to TASK_BATCH_MAX_SIZE of the caller's tasks with a single write, reporting each one."""
+    user_id, items, invalid, valid = parse_batch_request(event, TaskValidator.validate_batch_update, unique_key="task_id")
+    found = await get_task_service().update_tasks([items[index] for index in valid], user_id) if valid else set()
+    return report_applied_batch(items, invalid, valid, found, HTTPStatus.OK)
+
+@handle_exceptions_async
+async def delete_tasks_batch(event: Dict, context: Any = None) -> Dict:
+    """Deletes up to TASK_BATCH_MAX_SIZE of the caller's tasks with a single write, reporting each one."""
+    user_id, items, invalid, valid = parse_batch_request(event, TaskValidator.validate_batch_task_id, unique_key="task_id")
+    task_ids = [items[index]["task_id"] for index in valid]
+    found = await get_task_service().delete_tasks(task_ids, user_id) if valid else set()
+    return report_applied_batch(items, invalid, valid, found, HTTPStatus.OK)
+
+@handle_exceptions_async
+async def update_task(event: Dict, context: Any = None) -> Dict:
+    """Updates an existing task."""
+    user_id = get_user_from_token(event)
+    task_id = event["pathParameters"]["taskId"]
+    body = parse_body(event)
+
+    TaskValidator.validate_task_id(task_id)
+    TaskValidator.validate_update_task(body)
+
+    task = await get_task_service().update_task(
+        task_id=task_id,
+        title=body.get("title"),
+        description=body.get("description"),
+        status=body.get("status")
+    )
+
+    if not task:
+        raise ResourceNotFoundError("Task", task_id)
+
+    return create_response(HTTPStatus.OK, task.to_dict())
+
+@handle_exceptions_async
+async def delete_task(event: Dict, context: Any = None) -> Dict:
+    """Deletes a task."""
+    user_id = get_user_from_token(event)
+    task_id = event["pathParameters"]["taskId"]
+
+    TaskValidator.validate_task_id(task_id)
+
+    success = await get_task_service().delete_task(task_id)
+    if not success:
+        raise ResourceNotFoundError("Task", task_id)
+
+    return create_response(HTTPStatus.NO_CONTENT, {})
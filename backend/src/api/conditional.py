@@ -0,0 +1,91 @@
+"""
+Entity tags for conditional GET requests.
+
+Tags are strong validators: they change whenever the representation of the
+resource changes. A task's tag is derived from its id and updated_at. A
+listing's tag is derived from the caller, the query parameters and either the
+change counter of the caller's tasks, which needs no task to be read, or the
+id and updated_at of every task on the page when no counter is available.
+"""
+
+import hashlib
+from typing import Any, Dict, Iterable, Optional
+
+from src.api.events import get_header
+from src.domain.models import Task
+
+
+def _tag(*parts: str) -> str:
+    digest = hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def _params_key(params: Dict[str, Any]) -> str:
+    return "&".join(f"{name}={value}" for name, value in sorted(params.items()))
+
+
+def task_etag(task: Task) -> str:
+    """
+    Build the entity tag of a task.
+
+    Args:
+        task: The task
+
+    Returns:
+        Quoted strong entity tag
+    """
+    return _tag(task.task_id, task.updated_at.isoformat())
+
+
+def version_etag(user_id: str, version: int, params: Dict[str, Any]) -> str:
+    """
+    Build the entity tag of a listing from the change counter of the user's tasks.
+
+    Args:
+        user_id: The owner of the listed tasks
+        version: The change counter, read before the listing
+        params: The query parameters of the listing
+
+    Returns:
+        Quoted strong entity tag
+    """
+    return _tag("v", user_id, str(version), _params_key(params))
+
+
+def page_etag(user_id: str, tasks: Iterable[Task], params: Dict[str, Any]) -> str:
+    """
+    Build the entity tag of a listing from the tasks on the page.
+
+    Args:
+        user_id: The owner of the listed tasks
+        tasks: The tasks on the page
+        params: The query parameters of the listing
+
+    Returns:
+        Quoted strong entity tag
+    """
+    return _tag("p", user_id, _params_key(params),
+                *(f"{task.task_id}@{task.updated_at.isoformat()}" for task in tasks))
+
+
+def etag_matches(event: Dict[str, Any], etag: str) -> bool:
+    """
+    Check whether the If-None-Match header of a request matches an entity tag.
+
+    Uses the weak comparison that RFC 9110 prescribes for If-None-Match.
+
+    Args:
+        event: Request event
+        etag: Current entity tag of the resource
+
+    Returns:
+        True if the client's copy is current and a 304 can be returned
+    """
+    header: Optional[str] = get_header(event, "If-None-Match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -5,18 +5,34 @@ This module provides functions and decorators for handling exceptions
 and creating standardized error responses.
 """
 
-import json
 from functools import wraps
 from typing import Dict, Any, Callable
 from http import HTTPStatus
 
 from ..domain.exceptions import TaskManagerException
+from .events import encode_response
 
 def create_error_response(message: str, error_type: str, status_code: int = 500,
                          details: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Create a standardized error response.
     
+    Args:
+        message: The error message
+        error_type: The type of error
+        status_code: HTTP status code
+        details: Optional additional error details
+        
+    Returns:
+        Dict containing the formatted error response with a JSON string body
+    """
+    return encode_response(build_error_response(message, error_type, status_code, details))
+
+def build_error_response(message: str, error_type: str, status_code: int = 500,
+                         details: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Build a standardized error response with a native body.
+    
     Args:
         message: The error message
         error_type: The type of error
@@ -43,13 +59,41 @@ def create_error_response(message: str, error_type: str, status_code: int = 500,
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Credentials": "true"
         },
-        "body": json.dumps(response)
+        "body": response
     }
 
+def exception_response(error: Exception) -> Dict[str, Any]:
+    """
+    Build the native error response of an exception raised by a handler.
+    
+    Args:
+        error: The exception
+        
+    Returns:
+        The error response of a TaskManagerException, or a generic 500 for anything else
+    """
+    if isinstance(error, TaskManagerException):
+        return build_error_response(
+            message=str(error),
+            error_type=error.__class__.__name__,
+            status_code=error.status_code,
+            details=getattr(error, "errors", None)
+        )
+    return build_error_response(
+        message="An unexpected error occurred",
+        error_type="InternalServerError",
+        status_code=500
+    )
+
 def handle_exceptions(func: Callable) -> Callable:
     """
     Decorator to handle exceptions in API handlers.
     
+    Calling the wrapped handler returns a Lambda-style response whose body is a
+    JSON string. The handler is also exposed as ``wrapper.native``, which takes
+    an event whose body may already be parsed and returns the response body as
+    native Python data, leaving the encoding to the caller.
+    
     Args:
         func: The handler function to wrap
         
@@ -57,20 +101,37 @@ def handle_exceptions(func: Callable) -> Callable:
         Wrapped function that handles exceptions
     """
     @wraps(func)
-    def wrapper(*args, **kwargs):
+    def native(*args, **kwargs):
         try:
             return func(*args, **kwargs)
-        except TaskManagerException as e:
-            return create_error_response(
-                message=str(e),
-                error_type=e.__class__.__name__,
-                status_code=e.status_code,
-                details=getattr(e, "errors", None)
-            )
         except Exception as e:
-            return create_error_response(
-                message="An unexpected error occurred",
-                error_type="InternalServerError",
-                status_code=500
-            )
-    return wrapper 
\ No newline at end of file
+            return exception_response(e)
+    
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return encode_response(native(*args, **kwargs))
+    
+    wrapper.native = native
+    return wrapper
+
+def handle_exceptions_async(func: Callable) -> Callable:
+    """
+    Decorator to handle exceptions in coroutine API handlers.
+    
+    The wrapped coroutine returns native responses, like ``handle_exceptions``
+    handlers called through ``native``.
+    
+    Args:
+        func: The coroutine handler to wrap
+        
+    Returns:
+        Wrapped coroutine function that handles exceptions
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            return exception_response(e)
+    
+    return wrapper
@@ -0,0 +1,74 @@
+"""
+Conversion between wire-format events and native request/response data.
+
+Handlers work on native Python bodies. Lambda events carry the request body as
+a JSON string and expect the response body as one, so the body is decoded once
+when it enters a handler and encoded once when the response leaves through the
+Lambda entry points. The Flask application passes native bodies in both
+directions and lets Flask encode the response.
+"""
+
+from collections.abc import Iterator
+from typing import Any, Dict, Optional
+
+from src import codec
+
+
+def parse_body(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the request body of an event as a dictionary.
+
+    Args:
+        event: Request event whose body is a JSON string or an already parsed value
+
+    Returns:
+        The parsed body, or an empty dictionary if there is none
+    """
+    body = event.get("body")
+    if not body:
+        return {}
+    if isinstance(body, str):
+        return codec.loads(body)
+    return body
+
+
+def encode_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Encode the body of a native response as a JSON string.
+
+    Streamed bodies and bodies that are already encoded are left untouched.
+
+    Args:
+        response: Response with a native body
+
+    Returns:
+        The same response with its body encoded as JSON
+    """
+    body = response.get("body")
+    if not isinstance(body, (str, Iterator)):
+        response["body"] = codec.dumps(body)
+    return response
+
+
+def get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    """
+    Get a request header of an event regardless of its case.
+
+    API Gateway may lower-case header names while Flask title-cases them.
+
+    Args:
+        event: Request event
+        name: Header name
+
+    Returns:
+        The header value, or None if it is missing
+    """
+    headers = event.get("headers") or {}
+    value = headers.get(name)
+    if value is not None:
+        return value
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
@@ -4,42 +4,163 @@ API handlers for the Task Manager application.
 This module contains the handler functions for all API endpoints, including authentication
 and task management operations. Each handler follows a consistent pattern of validating
 input, processing the request, and returning a standardized response.
+
+The task service, its repository and the auth service are built on first use
+rather than at import time, and the storage modules are only imported then, so
+that a cold start does not pay for a database client until a handler needs one.
 """
 
-import json
-from typing import Dict, Any, Optional
+import threading
+from datetime import timedelta
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Set, Tuple
 from http import HTTPStatus
 
-from src.application.services import TaskServiceImpl
-from src.infrastructure.repositories import MongoTaskRepository
-from src.infrastructure.auth import JwtAuthService
+from src import codec
+from src.domain.interfaces import AuthService, TaskRepository, TaskService, UserRepository
 from src.domain.models import Task
 from src.domain.exceptions import (
     AuthenticationError, ValidationError,
     ResourceNotFoundError, DatabaseError
 )
 from src.domain.validators import TaskValidator, AuthValidator
+from src.domain.pagination import DEFAULT_PAGE_SIZE, next_cursor
+from src.domain.queries import TaskQuery, parse_query_date
 from src.config import (
     MONGO_URI, DB_NAME, JWT_SECRET,
     JWT_ALGORITHM, JWT_EXPIRE_MINUTES,
-    CORS_ORIGINS
+    CORS_ORIGINS, TASK_STREAM_BATCH_SIZE,
+    TASK_CACHE_ENABLED, TASK_CACHE_SIZE, TASK_CACHE_TTL_SECONDS, TASK_BATCH_MAX_SIZE,
+    TASK_SYNC_LAG_SECONDS, TASK_TOMBSTONE_RETENTION_DAYS, TASK_STORAGE,
+    SQLITE_PATH, SQLITE_BUSY_TIMEOUT_MS
 )
 from src.api.error_handler import handle_exceptions
+from src.api.events import parse_body
+from src.api.conditional import etag_matches, page_etag, task_etag, version_etag
+
+tombstone_retention = timedelta(days=TASK_TOMBSTONE_RETENTION_DAYS) if TASK_TOMBSTONE_RETENTION_DAYS > 0 else None
+
+# Built on first use by the getters below; assigning them replaces the defaults
+task_repository: Optional[TaskRepository] = None
+task_service: Optional[TaskService] = None
+user_repository: Optional[UserRepository] = None
+auth_service: Optional[AuthService] = None
+_singletons_lock = threading.Lock()
+
+def get_task_repository() -> TaskRepository:
+    """Returns the task repository selected by TASK_STORAGE, connecting to it on first use."""
+    global task_repository
+    if task_repository is None:
+        with _singletons_lock:
+            if task_repository is None:
+                if TASK_STORAGE == "mongo":
+                    from src.infrastructure.repositories import MongoTaskRepository
+                    
+                    repository = MongoTaskRepository(MONGO_URI, DB_NAME, "tasks", tombstone_retention)
+                elif TASK_STORAGE == "sqlite":
+                    from src.infrastructure.sqlite_repository import SqliteTaskRepository
+                    
+                    repository = SqliteTaskRepository(SQLITE_PATH, tombstone_retention, SQLITE_BUSY_TIMEOUT_MS)
+                elif TASK_STORAGE == "memory":
+                    from src.infrastructure.memory_repository import InMemoryTaskRepository
+                    
+                    repository = InMemoryTaskRepository(tombstone_retention)
+                else:
+                    raise ValueError(f"Unsupported task storage: {TASK_STORAGE}")
+                if TASK_CACHE_ENABLED:
+                    from src.infrastructure.cached_repository import CachingTaskRepository
+                    
+                    repository = CachingTaskRepository(repository, TASK_CACHE_SIZE, TASK_CACHE_TTL_SECONDS)
+                task_repository = repository
+    return task_repository
+
+def get_task_service() -> TaskService:
+    """Returns the task service, building it and its repository on first use."""
+    global task_service
+    if task_service is None:
+        repository = get_task_repository()
+        with _singletons_lock:
+            if task_service is None:
+                from src.application.services import TaskServiceImpl
+                
+                task_service = TaskServiceImpl(
+                    repository,
+                    sync_lag=timedelta(seconds=TASK_SYNC_LAG_SECONDS),
+                    tombstone_retention=tombstone_retention
+                )
+    return task_service
+
+def get_user_repository() -> UserRepository:
+    """Returns the user repository in the storage selected by TASK_STORAGE, connecting to it on first use."""
+    global user_repository
+    if user_repository is None:
+        with _singletons_lock:
+            if user_repository is None:
+                if TASK_STORAGE == "mongo":
+                    from src.infrastructure.repositories import MongoUserRepository
+                    
+                    user_repository = MongoUserRepository(MONGO_URI, DB_NAME)
+                elif TASK_STORAGE == "sqlite":
+                    from src.infrastructure.sqlite_repository import SqliteUserRepository
+                    
+                    user_repository = SqliteUserRepository(SQLITE_PATH, SQLITE_BUSY_TIMEOUT_MS)
+                elif TASK_STORAGE == "memory":
+                    from src.infrastructure.memory_repository import InMemoryUserRepository
+                    
+                    user_repository = InMemoryUserRepository()
+                else:
+                    raise ValueError(f"Unsupported task storage: {TASK_STORAGE}")
+    return user_repository
+
+def get_auth_service() -> AuthService:
+    """Returns the authentication service, building it and its user repository on first use."""
+    global auth_service
+    if auth_service is None:
+        users = get_user_repository()
+        with _singletons_lock:
+            if auth_service is None:
+                from src.infrastructure.auth import JwtAuthService
+                
+                auth_service = JwtAuthService(users=users)
+    return auth_service
+
+def reset_singletons() -> None:
+    """Forgets the services and their caches so the next request builds new ones, e.g. in a forked worker."""
+    global task_repository, task_service, user_repository, auth_service, _singletons_lock
+    _singletons_lock = threading.Lock()
+    task_repository = task_service = user_repository = auth_service = None
 
-task_repository = MongoTaskRepository(MONGO_URI, DB_NAME, "tasks")
-task_service = TaskServiceImpl(task_repository)
-auth_service = JwtAuthService()
+def create_response(status_code: int, body: Any, etag: Optional[str] = None) -> Dict:
+    """Creates a standardized HTTP response with a native body, encoded at the edge."""
+    headers = {
+        "Content-Type": "application/json",
+        "Access-Control-Allow-Origin": CORS_ORIGINS[0] if CORS_ORIGINS else "*",
+        "Access-Control-Allow-Credentials": "true"
+    }
+    if etag:
+        headers["ETag"] = etag
+        headers["Cache-Control"] = "private, no-cache"
+    return {
+        "statusCode": status_code,
+        "headers": headers,
+        "body": body
+    }
 
-def create_response(status_code: int, body: Any) -> Dict:
-    """Creates a standardized HTTP response."""
+def create_not_modified_response(etag: str) -> Dict:
+    """Creates an empty 304 response telling the client its cached copy is current."""
+    response = create_response(HTTPStatus.NOT_MODIFIED, "", etag)
+    del response["headers"]["Content-Type"]
+    return response
+
+def create_stream_response(status_code: int, chunks: Iterable[str], content_type: str) -> Dict:
+    """Creates an HTTP response whose body is produced incrementally by an iterable."""
     return {
         "statusCode": status_code,
         "headers": {
-            "Content-Type": "application/json",
+            "Content-Type": content_type,
             "Access-Control-Allow-Origin": CORS_ORIGINS[0] if CORS_ORIGINS else "*",
             "Access-Control-Allow-Credentials": "true"
         },
-        "body": json.dumps(body)
+        "body": chunks
     }
 
 def get_user_from_token(event: Dict) -> str:
@@ -49,7 +170,7 @@ def get_user_from_token(event: Dict) -> str:
         raise AuthenticationError("Missing or invalid authorization header")
     
     token = auth_header.split(" ")[1]
-    payload = auth_service.verify_token(token)
+    payload = get_auth_service().verify_token(token)
     if not payload:
         raise AuthenticationError("Invalid or expired token")
     
@@ -70,21 +191,21 @@ def register(event: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict containing the response with status code and body
     """
-    data = json.loads(event["body"])
-    validate_login_data(data)
+    data = parse_body(event)
+    AuthValidator.validate_login_data(data)
     
-    token = auth_service.register(data["username"], data["password"])
+    token = get_auth_service().register(data["username"], data["password"])
     return create_response(201, {"token": token})
 
 @handle_exceptions
 def login(event: Dict, context: Any) -> Dict:
     try:
-        body = json.loads(event.get("body", "{}"))
+        body = parse_body(event)
         
         if not body.get("username") or not body.get("password"):
             return create_response(400, {"error": "Username and password are required"})
         
-        token = auth_service.authenticate(body["username"], body["password"])
+        token = get_auth_service().authenticate(body["username"], body["password"])
         if not token:
             return create_response(401, {"error": "Invalid credentials"})
         
@@ -94,34 +215,99 @@ def login(event: Dict, context: Any) -> Dict:
 
 @handle_exceptions
 def get_tasks(event: Dict, context: Any) -> Dict:
-    """Gets all tasks."""
+    """
+    Gets one page of the caller's filtered tasks, continuing from an optional cursor.
+    
+    With a ``since`` watermark it instead returns the caller's tasks changed
+    and deleted after the watermark, together with the next watermark.
+    
+    When the repository tracks a change counter for the caller's tasks, a
+    matching If-None-Match is answered with 304 before any task is read.
+    Otherwise the tag is computed from the page, and a 304 still skips
+    serializing it.
+    """
     user_id = get_user_from_token(event)
-    tasks = task_service.get_all_tasks()
-    return create_response(HTTPStatus.OK, {"tasks": [task.to_dict() for task in tasks]})
+    params = event.get("queryStringParameters") or {}
+    
+    TaskValidator.validate_list_query(params, user_id)
+    
+    version = get_task_service().get_tasks_version(user_id)
+    etag = version_etag(user_id, version, params) if version is not None else None
+    if etag and etag_matches(event, etag):
+        return create_not_modified_response(etag)
+    
+    limit = int(params.get("limit", DEFAULT_PAGE_SIZE))
+    if "since" in params:
+        changes = get_task_service().sync_tasks_for_user(user_id, parse_query_date(params["since"]), limit=limit)
+        return create_response(HTTPStatus.OK, changes.to_dict(), etag)
+    
+    query = TaskQuery.from_params(params)
+    tasks = get_task_service().get_all_tasks_for_user(user_id, limit=limit, cursor=params.get("cursor"), query=query)
+    if etag is None:
+        etag = page_etag(user_id, tasks, params)
+        if etag_matches(event, etag):
+            return create_not_modified_response(etag)
+    
+    return create_response(HTTPStatus.OK, {
+        "tasks": [task.to_dict() for task in tasks],
+        "next_cursor": next_cursor(tasks, limit, query.sort)
+    }, etag)
+
+def _ndjson_lines(tasks: Iterator[Task]) -> Iterator[bytes]:
+    """Serializes tasks as newline-delimited JSON, one task per line."""
+    for task in tasks:
+        yield codec.dumps_bytes(task.to_dict()) + b"\n"
+
+@handle_exceptions
+def stream_tasks(event: Dict, context: Any) -> Dict:
+    """
+    Streams the caller's filtered tasks as newline-delimited JSON.
+    
+    Authentication and validation happen before the response is returned; the
+    tasks themselves are read in batches while the body is being sent, so memory
+    use is bounded by the batch size rather than the size of the listing.
+    """
+    user_id = get_user_from_token(event)
+    params = event.get("queryStringParameters") or {}
+    
+    TaskValidator.validate_list_query(params, user_id)
+    
+    limit = int(params["limit"]) if params.get("limit") else None
+    tasks = get_task_service().iter_tasks_for_user(
+        user_id,
+        limit=limit,
+        cursor=params.get("cursor"),
+        query=TaskQuery.from_params(params),
+        batch_size=TASK_STREAM_BATCH_SIZE
+    )
+    return create_stream_response(HTTPStatus.OK, _ndjson_lines(tasks), "application/x-ndjson")
 
 @handle_exceptions
 def get_task(event: Dict, context: Any) -> Dict:
-    """Gets a specific task."""
+    """Gets a specific task, answering a matching If-None-Match with 304."""
     user_id = get_user_from_token(event)
     task_id = event["pathParameters"]["taskId"]
     
     TaskValidator.validate_task_id(task_id)
     
-    task = task_service.get_task_by_id(task_id)
+    task = get_task_service().get_task_by_id_for_user(task_id, user_id)
     if not task:
         raise ResourceNotFoundError("Task", task_id)
     
-    return create_response(HTTPStatus.OK, task.to_dict())
+    etag = task_etag(task)
+    if etag_matches(event, etag):
+        return create_not_modified_response(etag)
+    return create_response(HTTPStatus.OK, task.to_dict(), etag)
 
 @handle_exceptions
 def create_task(event: Dict, context: Any) -> Dict:
     """Creates a new task."""
     user_id = get_user_from_token(event)
-    body = json.loads(event.get("body", "{}"))
+    body = parse_body(event)
     
     TaskValidator.validate_create_task(body)
     
-    task = task_service.create_task(
+    task = get_task_service().create_task(
         title=body["title"],
         description=body.get("description", ""),
         status=body.get("status", "pending"),
@@ -129,17 +315,121 @@ def create_task(event: Dict, context: Any) -> Dict:
     )
     return create_response(HTTPStatus.CREATED, task.to_dict())
 
+def _item_error(index: int, error: Exception, status_code: int) -> Dict[str, Any]:
+    """Builds the result of a batch item that failed, shaped like an error response body."""
+    result = {
+        "index": index,
+        "status": status_code,
+        "error": {"message": str(error), "type": error.__class__.__name__}
+    }
+    if getattr(error, "errors", None):
+        result["error"]["details"] = error.errors
+    return result
+
+def create_batch_response(results: List[Dict[str, Any]], success_status: int) -> Dict:
+    """Creates the response of a batch, 207 Multi-Status unless every item succeeded."""
+    failed = sum(1 for result in results if result["status"] != success_status)
+    status_code = success_status if not failed else HTTPStatus.MULTI_STATUS
+    return create_response(status_code, {
+        "results": results,
+        "succeeded": len(results) - failed,
+        "failed": failed
+    })
+
+def parse_batch_request(event: Dict, validate: Callable[[Dict[str, Any]], None],
+                    unique_key: Optional[str] = None) -> Tuple[str, List[Dict[str, Any]], Dict[int, Exception], List[int]]:
+    """
+    Authenticates a batch request and validates each of its items.
+    
+    Returns:
+        The user ID, the items, the error of each invalid item by position and the positions of the valid ones
+    """
+    user_id = get_user_from_token(event)
+    items = TaskValidator.validate_batch(parse_body(event), TASK_BATCH_MAX_SIZE)
+    invalid = TaskValidator.validate_batch_items(items, validate, unique_key=unique_key)
+    valid = [index for index in range(len(items)) if index not in invalid]
+    return user_id, items, invalid, valid
+
+def report_created_batch(invalid: Dict[int, Exception], valid: List[int],
+                            tasks: List[Task], failed: Dict[int, str]) -> Dict:
+    """Reports each item of a batch creation, in request order, given the tasks built from the valid items."""
+    results = [_item_error(index, error, error.status_code) for index, error in invalid.items()]
+    for position, (index, task) in enumerate(zip(valid, tasks)):
+        if position in failed:
+            results.append(_item_error(index, DatabaseError(failed[position]), HTTPStatus.INTERNAL_SERVER_ERROR))
+        else:
+            results.append({"index": index, "status": HTTPStatus.CREATED, "task": task.to_dict()})
+    
+    results.sort(key=lambda result: result["index"])
+    return create_batch_response(results, HTTPStatus.CREATED)
+
+def report_applied_batch(items: List[Dict[str, Any]], invalid: Dict[int, Exception], valid: List[int],
+                            found: Set[str], success_status: int) -> Dict:
+    """Reports each item of a batch update or deletion, in request order, given the IDs of the tasks found."""
+    results = [_item_error(index, error, error.status_code) for index, error in invalid.items()]
+    for index in valid:
+        task_id = items[index]["task_id"]
+        if task_id in found:
+            results.append({"index": index, "status": success_status, "task_id": task_id})
+        else:
+            results.append(_item_error(index, ResourceNotFoundError("Task", task_id), HTTPStatus.NOT_FOUND))
+    
+    results.sort(key=lambda result: result["index"])
+    return create_batch_response(results, success_status)
+
+@handle_exceptions
+def create_tasks_batch(event: Dict, context: Any) -> Dict:
+    """
+    Creates up to TASK_BATCH_MAX_SIZE tasks with a single write.
+    
+    Every item is validated before anything is written; the valid ones are
+    saved together and each item gets its own result, in request order.
+    """
+    user_id, items, invalid, valid = parse_batch_request(event, TaskValidator.validate_create_task)
+    tasks, failed = get_task_service().create_tasks([items[index] for index in valid], user_id) if valid else ([], {})
+    return report_created_batch(invalid, valid, tasks, failed)
+
+def _apply_batch(event: Dict, validate: Callable[[Dict[str, Any]], None],
+                 apply: Callable[[List[Dict[str, Any]], str], Set[str]], success_status: int) -> Dict:
+    """
+    Validates a batch of task operations, applies the valid ones with one call and reports each item.
+    
+    Args:
+        event: Request event whose body has a ``tasks`` list of items with a task_id
+        validate: Validates one item
+        apply: Takes the valid items and the user ID, returns the IDs of the tasks found
+        success_status: Status of an item that was applied
+    """
+    user_id, items, invalid, valid = parse_batch_request(event, validate, unique_key="task_id")
+    found = apply([items[index] for index in valid], user_id) if valid else set()
+    return report_applied_batch(items, invalid, valid, found, success_status)
+
+@handle_exceptions
+def update_tasks_batch(event: Dict, context: Any) -> Dict:
+    """Updates up to TASK_BATCH_MAX_SIZE of the caller's tasks with a single write, reporting each one."""
+    return _apply_batch(event, TaskValidator.validate_batch_update, get_task_service().update_tasks, HTTPStatus.OK)
+
+@handle_exceptions
+def delete_tasks_batch(event: Dict, context: Any) -> Dict:
+    """Deletes up to TASK_BATCH_MAX_SIZE of the caller's tasks with a single write, reporting each one."""
+    return _apply_batch(
+        event,
+        TaskValidator.validate_batch_task_id,
+        lambda items, user_id: get_task_service().delete_tasks([item["task_id"] for item in items], user_id),
+        HTTPStatus.OK
+    )
+
 @handle_exceptions
 def update_task(event: Dict, context: Any) -> Dict:
     """Updates an existing task."""
     user_id = get_user_from_token(event)
     task_id = event["pathParameters"]["taskId"]
-    body = json.loads(event.get("body", "{}"))
+    body = parse_body(event)
     
     TaskValidator.validate_task_id(task_id)
     TaskValidator.validate_update_task(body)
     
-    task = task_service.update_task(
+    task = get_task_service().update_task(
         task_id=task_id,
         title=body.get("title"),
         description=body.get("description"),
@@ -159,7 +449,7 @@ def delete_task(event: Dict, context: Any) -> Dict:
     
     TaskValidator.validate_task_id(task_id)
     
-    success = task_service.delete_task(task_id)
+    success = get_task_service().delete_task(task_id)
     if not success:
         raise ResourceNotFoundError("Task", task_id)
     
@@ -1,14 +1,75 @@
+import time
 from typing import Dict, Any
 from http import HTTPStatus
 
+from src.config import METRICS_ENABLED
+from .metrics import CONTENT_TYPE, UNMATCHED_ROUTE, metrics
+
 from .handlers import (
     login, get_tasks, get_task,
-    create_task, update_task, delete_task
+    create_task, create_tasks_batch, update_task, delete_task,
+    update_tasks_batch, delete_tasks_batch
 )
 
+# Plantillas de ruta con las que se etiquetan las métricas
+ROUTES = ("/login", "/tasks", "/tasks/batch", "/tasks/batch/delete")
+
+def route_template(path: str) -> str:
+    """
+    Devuelve la plantilla de ruta de una petición, sin el identificador de la tarea.
+    """
+    if path in ROUTES:
+        return path
+    if path.startswith("/tasks/"):
+        return "/tasks/<task_id>"
+    return UNMATCHED_ROUTE
+
+def body_size(message: Dict) -> int:
+    """
+    Devuelve el tamaño en bytes del cuerpo de un evento o respuesta, que
+    API Gateway transporta como texto UTF-8 o como base64.
+    """
+    body = message.get("body")
+    if not body:
+        return 0
+    if isinstance(body, bytes):
+        return len(body)
+    if message.get("isBase64Encoded"):
+        return len(body) * 3 // 4 - body[-2:].count("=")
+    return len(body) if body.isascii() else len(body.encode())
+
 def lambda_handler(event: Dict, context: Any) -> Dict:
     """
-    Manejador principal de Lambda que enruta las solicitudes a los manejadores específicos.
+    Manejador principal de Lambda que enruta las solicitudes a los manejadores
+    específicos y registra su latencia, estado y tamaños en las métricas.
+    """
+    if not METRICS_ENABLED:
+        return route(event, context)
+
+    http_method = event.get("httpMethod", "").upper()
+    path = event.get("path", "")
+    if path == "/metrics" and http_method == "GET":
+        return {
+            "statusCode": HTTPStatus.OK,
+            "headers": {"Content-Type": CONTENT_TYPE},
+            "body": metrics.render()
+        }
+
+    series = metrics.start(http_method, route_template(path))
+    started = time.perf_counter()
+    try:
+        response = route(event, context)
+        metrics.observe(
+            series, int(response.get("statusCode", HTTPStatus.OK)), time.perf_counter() - started,
+            body_size(event), body_size(response)
+        )
+        return response
+    finally:
+        metrics.finish(series)
+
+def route(event: Dict, context: Any) -> Dict:
+    """
+    Enruta una solicitud al manejador específico según su método y ruta.
     """
     http_method = event.get("httpMethod", "").upper()
     path = event.get("path", "")
@@ -22,6 +83,15 @@ def lambda_handler(event: Dict, context: Any) -> Dict:
         elif http_method == "POST":
             return create_task(event, context)
     
+    if path == "/tasks/batch":
+        if http_method == "POST":
+            return create_tasks_batch(event, context)
+        elif http_method == "PUT":
+            return update_tasks_batch(event, context)
+    
+    if path == "/tasks/batch/delete" and http_method == "POST":
+        return delete_tasks_batch(event, context)
+    
     if path.startswith("/tasks/"):
         task_id = path.split("/")[-1]
         if http_method == "GET":
@@ -0,0 +1,211 @@
+"""
+Request metrics in the Prometheus text exposition format.
+
+Every thread records into its own shard of counters, so recording a request
+takes no lock and shares no mutable state with other threads; the shared
+lock is only taken once per thread, to register its shard, and when the
+metrics are rendered. Series and their bucket lists are created the first
+time a thread sees a method and route, after which recording only
+increments existing counters.
+
+Rendering sums the shards of all threads. Shards of threads that have ended,
+which the threaded development server creates one per request, are folded
+into a single retired shard so they do not accumulate.
+
+Metrics are kept per process: each gunicorn worker and each Lambda container
+reports only the requests it served.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the request and response size buckets, in bytes
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# Route label of requests that matched no route, so unknown paths do not create series
+UNMATCHED_ROUTE = "unmatched"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Series:
+    """Counters of one method and route within one shard."""
+
+    __slots__ = (
+        "in_flight", "latency_counts", "latency_sum", "statuses",
+        "request_size_counts", "request_size_sum", "response_size_counts", "response_size_sum"
+    )
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.statuses: Dict[int, int] = {}
+        self.request_size_counts = [0] * (len(SIZE_BUCKETS) + 1)
+        self.request_size_sum = 0
+        self.response_size_counts = [0] * (len(SIZE_BUCKETS) + 1)
+        self.response_size_sum = 0
+
+    def merge(self, other: "_Series") -> None:
+        self.in_flight += other.in_flight
+        self.latency_sum += other.latency_sum
+        self.request_size_sum += other.request_size_sum
+        self.response_size_sum += other.response_size_sum
+        for counts, other_counts in (
+            (self.latency_counts, other.latency_counts),
+            (self.request_size_counts, other.request_size_counts),
+            (self.response_size_counts, other.response_size_counts),
+        ):
+            for i, count in enumerate(other_counts):
+                counts[i] += count
+        # A snapshot: the owning thread may add a status while another thread merges its series
+        for status, count in list(other.statuses.items()):
+            self.statuses[status] = self.statuses.get(status, 0) + count
+
+
+# A shard maps method -> route -> series; nested dicts avoid building a key tuple per request
+_Shard = Dict[str, Dict[str, _Series]]
+
+
+def _merge_shard(target: _Shard, shard: _Shard) -> None:
+    for method, routes in list(shard.items()):
+        for route, series in list(routes.items()):
+            target.setdefault(method, {}).setdefault(route, _Series()).merge(series)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    """Per-route latency, in-flight, status and payload size metrics."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: Dict[threading.Thread, _Shard] = {}
+        self._retired: _Shard = {}
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards[threading.current_thread()] = shard
+        return shard
+
+    def start(self, method: str, route: str) -> _Series:
+        """
+        Count a request as in flight.
+
+        Args:
+            method: HTTP method of the request
+            route: Route template that matched, such as ``/tasks/<task_id>``
+
+        Returns:
+            The series to pass to observe and finish, from the same thread
+        """
+        shard = self._shard()
+        routes = shard.get(method)
+        if routes is None:
+            routes = shard[method] = {}
+        series = routes.get(route)
+        if series is None:
+            series = routes[route] = _Series()
+        series.in_flight += 1
+        return series
+
+    def observe(self, series: _Series, status: int, seconds: float,
+                request_bytes: Optional[int] = None, response_bytes: Optional[int] = None) -> None:
+        """
+        Record the outcome of a request.
+
+        Args:
+            series: Series returned by start
+            status: HTTP status code of the response
+            seconds: Time taken to produce the response
+            request_bytes: Size of the request body, if known
+            response_bytes: Size of the response body, if known; unknown for streamed bodies
+        """
+        series.latency_counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        series.latency_sum += seconds
+        statuses = series.statuses
+        statuses[status] = statuses.get(status, 0) + 1
+        if request_bytes is not None:
+            series.request_size_counts[bisect_left(SIZE_BUCKETS, request_bytes)] += 1
+            series.request_size_sum += request_bytes
+        if response_bytes is not None:
+            series.response_size_counts[bisect_left(SIZE_BUCKETS, response_bytes)] += 1
+            series.response_size_sum += response_bytes
+
+    def finish(self, series: _Series) -> None:
+        """Count a request started with start as no longer in flight."""
+        series.in_flight -= 1
+
+    def snapshot(self) -> _Shard:
+        """Sum the shards of all threads, retiring those of threads that have ended."""
+        total: _Shard = {}
+        with self._lock:
+            for thread in [thread for thread in self._shards if not thread.is_alive()]:
+                _merge_shard(self._retired, self._shards.pop(thread))
+            _merge_shard(total, self._retired)
+            for shard in self._shards.values():
+                _merge_shard(total, shard)
+        return total
+
+    def render(self) -> str:
+        """Render the metrics of this process in the Prometheus text format."""
+        total = self.snapshot()
+        series = [
+            (f'method="{_escape(method)}",route="{_escape(route)}"', total[method][route])
+            for method in sorted(total) for route in sorted(total[method])
+        ]
+
+        lines = [
+            "# HELP http_requests_in_flight Requests being served.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        lines.extend(f"http_requests_in_flight{{{labels}}} {s.in_flight}" for labels, s in series)
+
+        lines.append("# HELP http_responses_total Responses sent, by status code.")
+        lines.append("# TYPE http_responses_total counter")
+        for labels, s in series:
+            lines.extend(
+                f'http_responses_total{{{labels},status="{status}"}} {count}'
+                for status, count in sorted(s.statuses.items())
+            )
+
+        for name, help_text, bounds, counts, total_sum in (
+            ("http_request_duration_seconds", "Time taken to produce the response.",
+             LATENCY_BUCKETS, "latency_counts", "latency_sum"),
+            ("http_request_size_bytes", "Size of the request body.",
+             SIZE_BUCKETS, "request_size_counts", "request_size_sum"),
+            ("http_response_size_bytes", "Size of the response body, when known before sending it.",
+             SIZE_BUCKETS, "response_size_counts", "response_size_sum"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, s in series:
+                lines.extend(self._histogram(name, labels, bounds, getattr(s, counts), getattr(s, total_sum)))
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _histogram(name: str, labels: str, bounds: tuple, counts: List[int], total_sum: float) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip(bounds + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {_format_number(total_sum)}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+metrics = RequestMetrics()
@@ -5,22 +5,81 @@ This module sets up the Flask application with routes for authentication and tas
 It handles request/response conversion between Flask and the internal API handlers.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 import os
-import json
+import time
+from collections.abc import Iterator
+from http import HTTPStatus
 from dotenv import load_dotenv
-from src.api.handlers import login, register, get_tasks, get_task, create_task, update_task, delete_task
+from src import codec
+from src.config import METRICS_ENABLED
+from src.api.metrics import CONTENT_TYPE, UNMATCHED_ROUTE, metrics
+from src.api.handlers import (
+    login, register, get_tasks, stream_tasks, get_task,
+    create_task, create_tasks_batch, update_task, delete_task,
+    update_tasks_batch, delete_tasks_batch
+)
 
 load_dotenv()
 
+class CodecJSONProvider(JSONProvider):
+    """Flask JSON provider backed by the application's JSON codec."""
+    
+    def dumps(self, obj, **kwargs):
+        return codec.dumps(obj)
+    
+    def loads(self, s, **kwargs):
+        return codec.loads(s)
+
 app = Flask(__name__)
+app.json = CodecJSONProvider(app)
 CORS(app)
 
+def start_request_timing():
+    """Count the request as in flight under the route template it matched."""
+    # Each access through the request proxy costs a context lookup, so it is resolved once
+    current = request._get_current_object()
+    route = current.url_rule.rule if current.url_rule is not None else UNMATCHED_ROUTE
+    current.environ["metrics.series"] = metrics.start(current.method, route)
+    current.environ["metrics.started"] = time.perf_counter()
+
+def record_request_timing(response):
+    """
+    Record the latency, status and payload sizes of the request.
+    
+    Streamed bodies are recorded when their first byte is ready, with no
+    response size.
+    """
+    environ = request.environ
+    series = environ.get("metrics.series")
+    if series is not None:
+        length = environ.get("CONTENT_LENGTH", "")
+        metrics.observe(
+            series, response.status_code, time.perf_counter() - environ["metrics.started"],
+            int(length) if length.isdigit() else 0, response.content_length
+        )
+    return response
+
+def finish_request_timing(exc):
+    """Count the request as no longer in flight, even if it failed."""
+    series = request.environ.pop("metrics.series", None)
+    if series is not None:
+        metrics.finish(series)
+
+if METRICS_ENABLED:
+    app.before_request(start_request_timing)
+    app.after_request(record_request_timing)
+    app.teardown_request(finish_request_timing)
+
 def convert_request_to_event(flask_request, path_params=None):
     """
     Convert Flask request to the format expected by the handlers.
     
+    The body is passed through as the parsed JSON value; handlers only decode
+    string bodies, which come from Lambda events.
+    
     Args:
         flask_request: The Flask request object
         path_params: Optional dictionary of path parameters
@@ -28,32 +87,51 @@ def convert_request_to_event(flask_request, path_params=None):
     Returns:
         Dict containing the converted request data
     """
-    try:
-        body = flask_request.get_json()
-    except:
-        body = {}
+    body = flask_request.get_json(silent=True)
     
     return {
-        "body": json.dumps(body or {}),
+        "body": body or {},
         "pathParameters": path_params or {},
+        "queryStringParameters": flask_request.args.to_dict(),
         "headers": dict(flask_request.headers)
     }
 
+def wants_stream(flask_request):
+    """
+    Check whether the client asked for a streamed NDJSON listing.
+    
+    Args:
+        flask_request: The Flask request object
+        
+    Returns:
+        True if the request has ``?stream=1`` or prefers ``application/x-ndjson``
+    """
+    if flask_request.args.get("stream") in ("1", "true"):
+        return True
+    best = flask_request.accept_mimetypes.best_match(["application/json", "application/x-ndjson"])
+    return best == "application/x-ndjson"
+
 def handle_handler_response(handler_response):
     """
-    Convert handler response to Flask response.
+    Convert a native handler response to Flask response.
+    
+    The body is encoded exactly once, here. Streamed bodies are sent as they
+    are produced, and 304 responses are sent without a body.
     
     Args:
-        handler_response: The response from the API handler
+        handler_response: The native response from the API handler
         
     Returns:
         Tuple containing the Flask response, status code, and headers
     """
     try:
-        response_body = json.loads(handler_response["body"])
         headers = handler_response.get("headers", {})
         status_code = handler_response.get("statusCode", 200)
-        return jsonify(response_body), status_code, headers
+        if status_code == HTTPStatus.NOT_MODIFIED:
+            return Response(status=status_code, headers=headers)
+        if isinstance(handler_response["body"], Iterator):
+            return Response(handler_response["body"], status=status_code, headers=headers)
+        return jsonify(handler_response["body"]), status_code, headers
     except Exception as e:
         app.logger.error(f"Error handling response: {str(e)}")
         return jsonify({"error": {"message": str(e), "type": "ResponseError"}}), 500
@@ -62,43 +140,68 @@ def handle_handler_response(handler_response):
 def register_route():
     """Handle user registration."""
     event = convert_request_to_event(request)
-    return handle_handler_response(register(event))
+    return handle_handler_response(register.native(event))
 
 @app.route('/auth/login', methods=['POST'])
 def login_route():
     """Handle user login."""
     event = convert_request_to_event(request)
-    return handle_handler_response(login(event))
+    return handle_handler_response(login.native(event, None))
 
 @app.route('/tasks', methods=['GET'])
 def get_tasks_route():
-    """Get all tasks."""
+    """Get a page of tasks, or stream all of them as NDJSON."""
     event = convert_request_to_event(request)
-    return handle_handler_response(get_tasks(event))
+    handler = stream_tasks if wants_stream(request) else get_tasks
+    return handle_handler_response(handler.native(event, None))
 
 @app.route('/tasks/<task_id>', methods=['GET'])
 def get_task_route(task_id):
     """Get a specific task by ID."""
     event = convert_request_to_event(request, {"taskId": task_id})
-    return handle_handler_response(get_task(event))
+    return handle_handler_response(get_task.native(event, None))
 
 @app.route('/tasks', methods=['POST'])
 def create_task_route():
     """Create a new task."""
     event = convert_request_to_event(request)
-    return handle_handler_response(create_task(event))
+    return handle_handler_response(create_task.native(event, None))
+
+@app.route('/tasks/batch', methods=['POST'])
+def create_tasks_batch_route():
+    """Create several tasks at once."""
+    event = convert_request_to_event(request)
+    return handle_handler_response(create_tasks_batch.native(event, None))
+
+@app.route('/tasks/batch', methods=['PUT'])
+def update_tasks_batch_route():
+    """Update several tasks at once."""
+    event = convert_request_to_event(request)
+    return handle_handler_response(update_tasks_batch.native(event, None))
+
+@app.route('/tasks/batch/delete', methods=['POST'])
+def delete_tasks_batch_route():
+    """Delete several tasks at once."""
+    event = convert_request_to_event(request)
+    return handle_handler_response(delete_tasks_batch.native(event, None))
 
 @app.route('/tasks/<task_id>', methods=['PUT'])
 def update_task_route(task_id):
     """Update an existing task."""
     event = convert_request_to_event(request, {"taskId": task_id})
-    return handle_handler_response(update_task(event))
+    return handle_handler_response(update_task.native(event, None))
 
 @app.route('/tasks/<task_id>', methods=['DELETE'])
 def delete_task_route(task_id):
     """Delete a task."""
     event = convert_request_to_event(request, {"taskId": task_id})
-    return handle_handler_response(delete_task(event))
+    return handle_handler_response(delete_task.native(event, None))
+
+if METRICS_ENABLED:
+    @app.route('/metrics', methods=['GET'])
+    def metrics_route():
+        """Expose the request metrics of this process in Prometheus text format."""
+        return Response(metrics.render(), content_type=CONTENT_TYPE)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8000, debug=os.getenv('DEBUG', 'False').lower() == 'true') 
\ No newline at end of file
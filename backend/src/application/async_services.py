@@ -0,0 +1,100 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from datetime import datetime, timedelta
+
+from ..domain.interfaces import AsyncTaskRepository, AsyncTaskService
+from ..domain.models import Task
+from ..domain.pagination import DEFAULT_PAGE_SIZE
+from ..domain.queries import TaskQuery
+from ..domain.sync import DEFAULT_SYNC_LAG, SyncResult, collect_changes_async
+
+class AsyncTaskServiceImpl(AsyncTaskService):
+    """Implementación asíncrona del servicio de tareas, equivalente a TaskServiceImpl."""
+
+    def __init__(self, task_repository: AsyncTaskRepository, sync_lag: timedelta = DEFAULT_SYNC_LAG,
+                 tombstone_retention: Optional[timedelta] = None):
+        """Inicializa el servicio de tareas con un repositorio asíncrono y la configuración de sincronización."""
+        self.task_repository = task_repository
+        self.sync_lag = sync_lag
+        self.tombstone_retention = tombstone_retention
+
+    async def get_all_tasks_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                                     query: Optional[TaskQuery] = None) -> List[Task]:
+        """Obtiene las tareas creadas por un usuario que cumplen la consulta."""
+        return await self.task_repository.get_all_for_user(user_id, limit=limit, cursor=cursor, query=query)
+
+    def iter_tasks_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                            query: Optional[TaskQuery] = None,
+                            batch_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[Task]:
+        """Recorre las tareas de un usuario que cumplen la consulta, leyéndolas por lotes."""
+        return self.task_repository.iter_all_for_user(
+            user_id, limit=limit, cursor=cursor, query=query, batch_size=batch_size
+        )
+
+    async def sync_tasks_for_user(self, user_id: str, since: datetime, limit: int = DEFAULT_PAGE_SIZE) -> SyncResult:
+        """Obtiene los cambios en las tareas de un usuario posteriores a la marca de sincronización."""
+        return await collect_changes_async(
+            self.task_repository, user_id, since, limit,
+            lag=self.sync_lag, retention=self.tombstone_retention
+        )
+
+    async def get_tasks_version(self, user_id: str) -> Optional[int]:
+        """Obtiene el contador de cambios de las tareas de un usuario, o None si no se registra."""
+        return await self.task_repository.get_version(user_id)
+
+    async def get_task_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """Obtiene una tarea por su ID si fue creada por el usuario."""
+        return await self.task_repository.get_by_id_for_user(task_id, user_id)
+
+    async def create_task(self, title: str, description: str, status: str, user_id: str) -> Task:
+        """Crea una nueva tarea."""
+        task = Task(
+            title=title,
+            description=description,
+            status=status,
+            created_by=user_id
+        )
+        return await self.task_repository.save(task)
+
+    async def create_tasks(self, tasks_data: List[Dict[str, Any]], user_id: str) -> Tuple[List[Task], Dict[int, str]]:
+        """Crea varias tareas ya validadas con una sola escritura y devuelve los errores por posición."""
+        tasks = [
+            Task(
+                title=data["title"],
+                description=data.get("description", ""),
+                status=data.get("status", "pending"),
+                created_by=user_id
+            )
+            for data in tasks_data
+        ]
+        return tasks, await self.task_repository.save_many(tasks)
+
+    async def update_task(self, task_id: str, title: Optional[str] = None,
+                          description: Optional[str] = None, status: Optional[str] = None) -> Optional[Task]:
+        """Actualiza una tarea existente escribiendo solo los campos modificados."""
+        update_data = {}
+        if title is not None:
+            update_data['title'] = title
+        if description is not None:
+            update_data['description'] = description
+        if status is not None:
+            update_data['status'] = status
+
+        return await self.task_repository.update_fields(task_id, update_data)
+
+    async def delete_task(self, task_id: str) -> bool:
+        """Elimina una tarea por su ID."""
+        return await self.task_repository.delete(task_id)
+
+    async def update_tasks(self, updates: List[Dict[str, Any]], user_id: str) -> Set[str]:
+        """Actualiza varias tareas del usuario con una sola escritura y devuelve los IDs encontrados."""
+        fields_by_id = {
+            update["task_id"]: {
+                name: update[name] for name in ("title", "description", "status") if name in update
+            }
+            for update in updates
+        }
+        return await self.task_repository.update_fields_many(fields_by_id, user_id)
+
+    async def delete_tasks(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """Elimina varias tareas del usuario con una sola escritura y devuelve los IDs encontrados."""
+        return await self.task_repository.delete_many(task_ids, user_id)
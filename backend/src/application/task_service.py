@@ -5,10 +5,14 @@ This module provides the TaskService class which implements the business logic
 for task management operations.
 """
 
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 from src.domain.interfaces import TaskService, TaskRepository
 from src.domain.models import Task
+from src.domain.pagination import DEFAULT_PAGE_SIZE
+from src.domain.queries import TaskQuery
 from src.domain.exceptions import ResourceNotFoundError
+from src.domain.sync import DEFAULT_SYNC_LAG, SyncResult, collect_changes
 
 class TaskServiceImpl(TaskService):
     """
@@ -18,23 +22,102 @@ class TaskServiceImpl(TaskService):
     for task management operations.
     """
     
-    def __init__(self, task_repository: TaskRepository):
+    def __init__(self, task_repository: TaskRepository, sync_lag: timedelta = DEFAULT_SYNC_LAG,
+                 tombstone_retention: Optional[timedelta] = None):
         """
         Initialize the task service.
         
         Args:
             task_repository: The repository to use for task storage
+            sync_lag: How far behind the current time sync watermarks are kept
+            tombstone_retention: How long the repository keeps tombstones, if they expire
         """
         self.task_repository = task_repository
+        self.sync_lag = sync_lag
+        self.tombstone_retention = tombstone_retention
     
-    def get_all_tasks(self) -> List[Task]:
+    def get_all_tasks(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                      query: Optional[TaskQuery] = None) -> List[Task]:
         """
-        Get all tasks.
+        Get tasks matching a query in its sort order.
         
+        Args:
+            limit: Optional maximum number of tasks to return
+            cursor: Optional cursor returned with the previous page
+            query: Optional filters and sort order
+            
+        Returns:
+            List of tasks
+        """
+        return self.task_repository.get_all(limit=limit, cursor=cursor, query=query)
+    
+    def get_all_tasks_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                               query: Optional[TaskQuery] = None) -> List[Task]:
+        """
+        Get the tasks created by a user that match a query.
+        
+        Args:
+            user_id: The ID of the user that owns the tasks
+            limit: Optional maximum number of tasks to return
+            cursor: Optional cursor returned with the previous page
+            query: Optional filters and sort order
+            
+        Returns:
+            List of tasks
+        """
+        return self.task_repository.get_all_for_user(user_id, limit=limit, cursor=cursor, query=query)
+    
+    def iter_tasks_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                            query: Optional[TaskQuery] = None,
+                            batch_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Task]:
+        """
+        Iterate the tasks created by a user that match a query.
+        
+        Args:
+            user_id: The ID of the user that owns the tasks
+            limit: Optional maximum number of tasks to yield
+            cursor: Optional cursor to resume after
+            query: Optional filters and sort order
+            batch_size: Number of tasks fetched from storage at a time
+            
+        Returns:
+            Iterator of tasks
+        """
+        return self.task_repository.iter_all_for_user(
+            user_id, limit=limit, cursor=cursor, query=query, batch_size=batch_size
+        )
+    
+    def sync_tasks_for_user(self, user_id: str, since: datetime, limit: int = DEFAULT_PAGE_SIZE) -> SyncResult:
+        """
+        Get the changes of a user's tasks after a sync watermark.
+        
+        Args:
+            user_id: The owner of the tasks
+            since: Watermark returned by the previous sync
+            limit: Maximum number of changed tasks and of deletions to return
+            
         Returns:
-            List of all tasks
+            SyncResult with the changed tasks, the deletions and the new watermark
+            
+        Raises:
+            SyncExpiredError: If deletions after the watermark may have been purged
         """
-        return self.task_repository.get_all()
+        return collect_changes(
+            self.task_repository, user_id, since, limit,
+            lag=self.sync_lag, retention=self.tombstone_retention
+        )
+    
+    def get_tasks_version(self, user_id: str) -> Optional[int]:
+        """
+        Get the change counter of a user's tasks.
+        
+        Args:
+            user_id: The owner of the tasks
+            
+        Returns:
+            A value that changes whenever one of the user's tasks is written, or None if not tracked
+        """
+        return self.task_repository.get_version(user_id)
     
     def get_task_by_id(self, task_id: str) -> Optional[Task]:
         """
@@ -48,6 +131,19 @@ class TaskServiceImpl(TaskService):
         """
         return self.task_repository.get_by_id(task_id)
     
+    def get_task_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """
+        Get a task by its ID if it was created by the user.
+        
+        Args:
+            task_id: The ID of the task to retrieve
+            user_id: The ID of the user that must own the task
+            
+        Returns:
+            Task if found and owned by the user, None otherwise
+        """
+        return self.task_repository.get_by_id_for_user(task_id, user_id)
+    
     def create_task(self, title: str, description: str, status: str, user_id: str) -> Task:
         """
         Create a new task.
@@ -69,11 +165,36 @@ class TaskServiceImpl(TaskService):
         )
         return self.task_repository.save(task)
     
+    def create_tasks(self, tasks_data: List[Dict[str, Any]], user_id: str) -> Tuple[List[Task], Dict[int, str]]:
+        """
+        Create several tasks with a single repository write.
+        
+        Args:
+            tasks_data: Validated task data, each with a title and optional description and status
+            user_id: The ID of the user creating the tasks
+            
+        Returns:
+            The tasks in the order given, and the error of each one that was not saved by position
+        """
+        tasks = [
+            Task(
+                title=data["title"],
+                description=data.get("description", ""),
+                status=data.get("status", "pending"),
+                created_by=user_id
+            )
+            for data in tasks_data
+        ]
+        return tasks, self.task_repository.save_many(tasks)
+    
     def update_task(self, task_id: str, title: Optional[str] = None,
                    description: Optional[str] = None, status: Optional[str] = None) -> Optional[Task]:
         """
         Update an existing task.
         
+        Only the provided fields are written, together with updated_at, in a
+        single atomic repository operation.
+        
         Args:
             task_id: The ID of the task to update
             title: Optional new title
@@ -81,19 +202,22 @@ class TaskServiceImpl(TaskService):
             status: Optional new status
             
         Returns:
-            The updated task if found, None otherwise
+            The updated task
+            
+        Raises:
+            ResourceNotFoundError: If the task does not exist
         """
-        task = self.task_repository.get_by_id(task_id)
+        fields = {
+            name: value
+            for name, value in (("title", title), ("description", description), ("status", status))
+            if value is not None
+        }
+        
+        task = self.task_repository.update_fields(task_id, fields)
         if not task:
             raise ResourceNotFoundError("Task", task_id)
         
-        task.update(
-            title=title if title is not None else task.title,
-            description=description if description is not None else task.description,
-            status=status if status is not None else task.status
-        )
-        
-        return self.task_repository.update(task)
+        return task
     
     def delete_task(self, task_id: str) -> bool:
         """
@@ -109,4 +233,36 @@ class TaskServiceImpl(TaskService):
         if not task:
             raise ResourceNotFoundError("Task", task_id)
         
-        return self.task_repository.delete(task_id) 
\ No newline at end of file
+        return self.task_repository.delete(task_id)
+    
+    def update_tasks(self, updates: List[Dict[str, Any]], user_id: str) -> Set[str]:
+        """
+        Update several of a user's tasks with a single repository write.
+        
+        Args:
+            updates: Validated items, each with a task_id and the fields to set
+            user_id: The ID of the user that must own the tasks
+            
+        Returns:
+            IDs of the tasks that were found and updated
+        """
+        fields_by_id = {
+            update["task_id"]: {
+                name: update[name] for name in ("title", "description", "status") if name in update
+            }
+            for update in updates
+        }
+        return self.task_repository.update_fields_many(fields_by_id, user_id)
+    
+    def delete_tasks(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """
+        Delete several of a user's tasks with a single repository write.
+        
+        Args:
+            task_ids: IDs of the tasks to delete
+            user_id: The ID of the user that must own the tasks
+            
+        Returns:
+            IDs of the tasks that were found and deleted
+        """
+        return self.task_repository.delete_many(task_ids, user_id) 
\ No newline at end of file
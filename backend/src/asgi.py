@@ -0,0 +1,157 @@
+"""
+ASGI application for the Task Manager API.
+
+This module exposes the same routes as the Flask application in ``src.app``,
+served by the coroutine handlers in ``src.api.async_handlers`` so that one
+process keeps many requests in flight while they wait on MongoDB. Requests are
+converted to the same events as in the Flask application, and registration
+and login reuse the synchronous handlers in the thread pool, since they read
+and write the user repository and hash passwords. Users are kept in the
+storage selected by TASK_STORAGE, so every worker sees the same users.
+
+Usage (from the backend directory):
+    uvicorn src.asgi:app --host 0.0.0.0 --port 8000 [--workers N]
+"""
+
+from collections.abc import AsyncIterator
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from src import codec
+from src.api import async_handlers, handlers
+
+async def convert_request_to_event(request: Request) -> Dict[str, Any]:
+    """
+    Convert a Starlette request to the event format expected by the handlers.
+
+    Header names are title-cased as Flask presents them, and a body that is not
+    valid JSON is treated as missing, like Flask's ``get_json(silent=True)``.
+
+    Args:
+        request: The Starlette request
+
+    Returns:
+        Dict containing the converted request data
+    """
+    body = None
+    raw = await request.body()
+    if raw:
+        try:
+            body = codec.loads(raw)
+        except ValueError:
+            body = None
+
+    return {
+        "body": body or {},
+        "pathParameters": dict(request.path_params),
+        "queryStringParameters": dict(request.query_params),
+        "headers": {name.title(): value for name, value in request.headers.items()}
+    }
+
+def _accept_quality(accept: str, media_type: str) -> float:
+    """Get the quality an Accept header gives a media type, counting only exact matches."""
+    for media_range in accept.split(","):
+        name, _, parameters = media_range.strip().partition(";")
+        if name.strip() != media_type:
+            continue
+        for parameter in parameters.split(";"):
+            key, _, value = parameter.strip().partition("=")
+            if key == "q":
+                try:
+                    return float(value)
+                except ValueError:
+                    return 0.0
+        return 1.0
+    return 0.0
+
+def wants_stream(request: Request) -> bool:
+    """
+    Check whether the client asked for a streamed NDJSON listing.
+
+    Args:
+        request: The Starlette request
+
+    Returns:
+        True if the request has ``?stream=1`` or prefers ``application/x-ndjson`` to JSON
+    """
+    if request.query_params.get("stream") in ("1", "true"):
+        return True
+    accept = request.headers.get("accept", "")
+    ndjson = _accept_quality(accept, "application/x-ndjson")
+    return ndjson > 0 and ndjson > _accept_quality(accept, "application/json")
+
+def handle_handler_response(handler_response: Dict[str, Any]) -> Response:
+    """
+    Convert a native handler response to a Starlette response.
+
+    The body is encoded exactly once, here. Streamed bodies are sent as they
+    are produced, and 204 and 304 responses are sent without a body.
+
+    Args:
+        handler_response: The native response from the API handler
+
+    Returns:
+        The Starlette response
+    """
+    headers = handler_response.get("headers", {})
+    status_code = handler_response.get("statusCode", 200)
+    if status_code in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED):
+        return Response(status_code=status_code, headers=headers)
+    body = handler_response["body"]
+    if isinstance(body, AsyncIterator):
+        return StreamingResponse(body, status_code=status_code, headers=headers)
+    return Response(codec.dumps_bytes(body), status_code=status_code, headers=headers,
+                    media_type="application/json")
+
+def route(handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]) -> Callable[[Request], Awaitable[Response]]:
+    """Build a Starlette endpoint that runs a coroutine handler on the converted request."""
+    async def endpoint(request: Request) -> Response:
+        return handle_handler_response(await handler(await convert_request_to_event(request)))
+    return endpoint
+
+async def register_route(request: Request) -> Response:
+    """Handle user registration."""
+    event = await convert_request_to_event(request)
+    return handle_handler_response(await run_in_threadpool(handlers.register.native, event))
+
+async def login_route(request: Request) -> Response:
+    """Handle user login."""
+    event = await convert_request_to_event(request)
+    return handle_handler_response(await run_in_threadpool(handlers.login.native, event, None))
+
+async def get_tasks_route(request: Request) -> Response:
+    """Get a page of tasks, or stream all of them as NDJSON."""
+    handler = async_handlers.stream_tasks if wants_stream(request) else async_handlers.get_tasks
+    return handle_handler_response(await handler(await convert_request_to_event(request)))
+
+def task_route(handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]) -> Callable[[Request], Awaitable[Response]]:
+    """Build a Starlette endpoint for a ``/tasks/{task_id}`` route, passing the ID as ``taskId``."""
+    async def endpoint(request: Request) -> Response:
+        event = await convert_request_to_event(request)
+        event["pathParameters"] = {"taskId": request.path_params["task_id"]}
+        return handle_handler_response(await handler(event))
+    return endpoint
+
+routes = [
+    Route("/auth/register", register_route, methods=["POST"]),
+    Route("/auth/login", login_route, methods=["POST"]),
+    Route("/tasks", get_tasks_route, methods=["GET"]),
+    Route("/tasks", route(async_handlers.create_task), methods=["POST"]),
+    Route("/tasks/batch", route(async_handlers.create_tasks_batch), methods=["POST"]),
+    Route("/tasks/batch", route(async_handlers.update_tasks_batch), methods=["PUT"]),
+    Route("/tasks/batch/delete", route(async_handlers.delete_tasks_batch), methods=["POST"]),
+    Route("/tasks/{task_id}", task_route(async_handlers.get_task), methods=["GET"]),
+    Route("/tasks/{task_id}", task_route(async_handlers.update_task), methods=["PUT"]),
+    Route("/tasks/{task_id}", task_route(async_handlers.delete_task), methods=["DELETE"]),
+]
+
+app = Starlette(routes=routes, middleware=[Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"],
+                                                      allow_headers=["*"])])
@@ -0,0 +1,62 @@
+"""
+JSON codec used for every request and response body.
+
+The codec uses orjson when it is installed and falls back to the standard
+library otherwise. Both backends serialize ``datetime`` values natively as ISO
+8601 strings, so domain objects can hand dates to the codec unformatted.
+The backend can be forced with the ``JSON_CODEC`` setting.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Union
+
+from src.config import JSON_CODEC
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if JSON_CODEC not in ("auto", "orjson", "json"):
+    raise ValueError(f"Unsupported JSON_CODEC: {JSON_CODEC}")
+
+if JSON_CODEC == "orjson" and orjson is None:
+    raise ImportError("JSON_CODEC is set to orjson but orjson is not installed")
+
+BACKEND = "orjson" if orjson is not None and JSON_CODEC != "json" else "json"
+
+
+def _default(value: Any) -> Any:
+    """Serializes the values the standard library encoder does not support."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if BACKEND == "orjson":
+    def dumps_bytes(value: Any) -> bytes:
+        """Encodes a value as UTF-8 JSON bytes."""
+        return orjson.dumps(value)
+
+    def dumps(value: Any) -> str:
+        """Encodes a value as a JSON string."""
+        return orjson.dumps(value).decode("utf-8")
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decodes a JSON document."""
+        return orjson.loads(data)
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+    def dumps_bytes(value: Any) -> bytes:
+        """Encodes a value as UTF-8 JSON bytes."""
+        return _encoder.encode(value).encode("utf-8")
+
+    def dumps(value: Any) -> str:
+        """Encodes a value as a JSON string."""
+        return _encoder.encode(value)
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decodes a JSON document."""
+        return json.loads(data)
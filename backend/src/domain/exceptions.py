@@ -30,4 +30,9 @@ class ResourceNotFoundError(TaskManagerException):
 class DatabaseError(TaskManagerException):
     """Database error."""
     def __init__(self, message: str = "Database error occurred"):
-        super().__init__(message, status_code=500) 
\ No newline at end of file
+        super().__init__(message, status_code=500) 
+
+class SyncExpiredError(TaskManagerException):
+    """Error when a sync watermark is older than the retained deletion history."""
+    def __init__(self, message: str = "Watermark is too old, a full resync is required"):
+        super().__init__(message, status_code=410)
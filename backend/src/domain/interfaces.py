@@ -1,42 +1,181 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
 
-from .models import Task
+from .models import Task, Tombstone
+from .pagination import DEFAULT_PAGE_SIZE, next_cursor
+from .queries import TaskQuery
+from .sync import SyncResult
 
 class TaskRepository(ABC):
     """Interface for the task repository."""
     
     @abstractmethod
-    def get_all(self) -> List[Task]:
-        """Gets all tasks."""
+    def get_all(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                query: Optional[TaskQuery] = None) -> List[Task]:
+        """Gets the tasks matching a query in its sort order, optionally one page at a time."""
         pass
     
+    @abstractmethod
+    def get_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                         query: Optional[TaskQuery] = None) -> List[Task]:
+        """Gets the tasks created by a user that match a query, optionally one page at a time."""
+        pass
+    
+    def iter_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                          query: Optional[TaskQuery] = None,
+                          batch_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Task]:
+        """
+        Iterates the tasks created by a user that match a query, fetching them in batches.
+        
+        The default implementation walks the listing page by page with keyset
+        cursors; storage backends with native cursors should override it.
+        """
+        query = query or TaskQuery()
+        remaining = limit
+        while True:
+            size = min(batch_size, remaining) if remaining else batch_size
+            tasks = self.get_all_for_user(user_id, limit=size, cursor=cursor, query=query)
+            yield from tasks
+            
+            if remaining:
+                remaining -= len(tasks)
+                if remaining <= 0:
+                    return
+            cursor = next_cursor(tasks, size, query.sort)
+            if not cursor:
+                return
+    
     @abstractmethod
     def get_by_id(self, task_id: str) -> Optional[Task]:
         """Gets a task by its ID."""
         pass
     
+    @abstractmethod
+    def get_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """Gets a task by its ID if it was created by the user."""
+        pass
+    
+    @abstractmethod
+    def get_changed_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Task]:
+        """Gets the user's tasks with since < updated_at <= until, ordered by updated_at and task_id."""
+        pass
+    
+    @abstractmethod
+    def get_deleted_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Tombstone]:
+        """Gets the tombstones of the user's tasks with since < deleted_at <= until, oldest first."""
+        pass
+    
+    def get_version(self, user_id: str) -> Optional[int]:
+        """
+        Gets a counter that changes whenever one of the user's tasks is written.
+        
+        Returns None when the repository does not track changes, in which case
+        listings can only be revalidated by reading them.
+        """
+        return None
+    
     @abstractmethod
     def save(self, task: Task) -> Task:
         """Saves a task."""
         pass
     
+    def save_many(self, tasks: List[Task]) -> Dict[int, str]:
+        """
+        Saves several tasks, continuing past individual failures.
+        
+        The default implementation saves the tasks one at a time; storage
+        backends with bulk inserts should override it.
+        
+        Returns:
+            Error message of each task that could not be saved, keyed by its position
+        """
+        errors = {}
+        for index, task in enumerate(tasks):
+            try:
+                self.save(task)
+            except Exception as e:
+                errors[index] = str(e)
+        return errors
+    
     @abstractmethod
     def update(self, task: Task) -> Task:
         """Updates a task."""
         pass
     
+    @abstractmethod
+    def update_fields(self, task_id: str, fields: Dict[str, Any]) -> Optional[Task]:
+        """Atomically sets the given fields and updated_at, returning the updated task or None if missing."""
+        pass
+    
+    def update_fields_many(self, updates: Dict[str, Dict[str, Any]], user_id: str) -> Set[str]:
+        """
+        Sets fields of several tasks of a user, each with its own fields, and their updated_at.
+        
+        The default implementation updates the tasks one at a time; storage
+        backends with bulk writes should override it.
+        
+        Returns:
+            IDs of the tasks that exist, belong to the user and were updated
+        """
+        updated = set()
+        for task_id, fields in updates.items():
+            if self.get_by_id_for_user(task_id, user_id) and self.update_fields(task_id, fields):
+                updated.add(task_id)
+        return updated
+    
     @abstractmethod
     def delete(self, task_id: str) -> bool:
-        """Deletes a task by its ID."""
+        """Deletes a task by its ID, leaving a tombstone."""
         pass
+    
+    def delete_many(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """
+        Deletes several tasks of a user, leaving tombstones.
+        
+        The default implementation deletes the tasks one at a time; storage
+        backends with bulk writes should override it.
+        
+        Returns:
+            IDs of the tasks that existed, belonged to the user and were deleted
+        """
+        return {
+            task_id for task_id in task_ids
+            if self.get_by_id_for_user(task_id, user_id) and self.delete(task_id)
+        }
 
 class TaskService(ABC):
     """Interface for the task service."""
     
     @abstractmethod
-    def get_all_tasks(self) -> List[Task]:
-        """Gets all tasks."""
+    def get_all_tasks(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                      query: Optional[TaskQuery] = None) -> List[Task]:
+        """Gets the tasks matching a query in its sort order, optionally one page at a time."""
+        pass
+    
+    @abstractmethod
+    def get_all_tasks_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                               query: Optional[TaskQuery] = None) -> List[Task]:
+        """Gets the tasks created by a user that match a query, optionally one page at a time."""
+        pass
+    
+    @abstractmethod
+    def iter_tasks_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                            query: Optional[TaskQuery] = None,
+                            batch_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Task]:
+        """Iterates the tasks created by a user that match a query without loading them all at once."""
+        pass
+    
+    @abstractmethod
+    def sync_tasks_for_user(self, user_id: str, since: datetime, limit: int = DEFAULT_PAGE_SIZE) -> SyncResult:
+        """Gets the changes of a user's tasks after a sync watermark."""
+        pass
+    
+    @abstractmethod
+    def get_tasks_version(self, user_id: str) -> Optional[int]:
+        """Gets the change counter of a user's tasks, or None if it is not tracked."""
         pass
     
     @abstractmethod
@@ -44,11 +183,21 @@ class TaskService(ABC):
         """Gets a task by its ID."""
         pass
     
+    @abstractmethod
+    def get_task_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """Gets a task by its ID if it was created by the user."""
+        pass
+    
     @abstractmethod
     def create_task(self, title: str, description: str, status: str, user_id: str) -> Task:
         """Creates a new task."""
         pass
     
+    @abstractmethod
+    def create_tasks(self, tasks_data: List[Dict[str, Any]], user_id: str) -> Tuple[List[Task], Dict[int, str]]:
+        """Creates several tasks at once, returning them and the errors of those that failed by position."""
+        pass
+    
     @abstractmethod
     def update_task(self, task_id: str, title: Optional[str] = None, 
                    description: Optional[str] = None, status: Optional[str] = None) -> Optional[Task]:
@@ -59,6 +208,158 @@ class TaskService(ABC):
     def delete_task(self, task_id: str) -> bool:
         """Deletes a task by its ID."""
         pass
+    
+    @abstractmethod
+    def update_tasks(self, updates: List[Dict[str, Any]], user_id: str) -> Set[str]:
+        """Updates several of a user's tasks at once, returning the IDs of those that were found."""
+        pass
+    
+    @abstractmethod
+    def delete_tasks(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """Deletes several of a user's tasks at once, returning the IDs of those that were found."""
+        pass
+
+class AsyncTaskRepository(ABC):
+    """Interface for a task repository whose operations are coroutines, for the ASGI application."""
+    
+    @abstractmethod
+    async def get_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                               query: Optional[TaskQuery] = None) -> List[Task]:
+        """Gets the tasks created by a user that match a query, optionally one page at a time."""
+        pass
+    
+    @abstractmethod
+    def iter_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                          query: Optional[TaskQuery] = None,
+                          batch_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[Task]:
+        """Iterates asynchronously the tasks created by a user that match a query, fetching them in batches."""
+        pass
+    
+    @abstractmethod
+    async def get_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """Gets a task by its ID if it was created by the user."""
+        pass
+    
+    @abstractmethod
+    async def get_changed_for_user(self, user_id: str, since: datetime, until: datetime,
+                                   limit: Optional[int] = None) -> List[Task]:
+        """Gets the user's tasks with since < updated_at <= until, ordered by updated_at and task_id."""
+        pass
+    
+    @abstractmethod
+    async def get_deleted_for_user(self, user_id: str, since: datetime, until: datetime,
+                                   limit: Optional[int] = None) -> List[Tombstone]:
+        """Gets the tombstones of the user's tasks with since < deleted_at <= until, oldest first."""
+        pass
+    
+    async def get_version(self, user_id: str) -> Optional[int]:
+        """Gets the change counter of the user's tasks, or None when the repository does not track it."""
+        return None
+    
+    @abstractmethod
+    async def save(self, task: Task) -> Task:
+        """Saves a task."""
+        pass
+    
+    @abstractmethod
+    async def save_many(self, tasks: List[Task]) -> Dict[int, str]:
+        """Saves several tasks, returning the error message of each one that failed by position."""
+        pass
+    
+    @abstractmethod
+    async def update_fields(self, task_id: str, fields: Dict[str, Any]) -> Optional[Task]:
+        """Atomically sets the given fields and updated_at, returning the updated task or None if missing."""
+        pass
+    
+    @abstractmethod
+    async def update_fields_many(self, updates: Dict[str, Dict[str, Any]], user_id: str) -> Set[str]:
+        """Sets fields of several tasks of a user, returning the IDs of those that were updated."""
+        pass
+    
+    @abstractmethod
+    async def delete(self, task_id: str) -> bool:
+        """Deletes a task by its ID, leaving a tombstone."""
+        pass
+    
+    @abstractmethod
+    async def delete_many(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """Deletes several tasks of a user, leaving tombstones, and returns the IDs of those deleted."""
+        pass
+
+class AsyncTaskService(ABC):
+    """Interface for a task service whose operations are coroutines, for the ASGI application."""
+    
+    @abstractmethod
+    async def get_all_tasks_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                                     query: Optional[TaskQuery] = None) -> List[Task]:
+        """Gets the tasks created by a user that match a query, optionally one page at a time."""
+        pass
+    
+    @abstractmethod
+    def iter_tasks_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                            query: Optional[TaskQuery] = None,
+                            batch_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[Task]:
+        """Iterates asynchronously the tasks created by a user that match a query."""
+        pass
+    
+    @abstractmethod
+    async def sync_tasks_for_user(self, user_id: str, since: datetime, limit: int = DEFAULT_PAGE_SIZE) -> SyncResult:
+        """Gets the changes of a user's tasks after a sync watermark."""
+        pass
+    
+    @abstractmethod
+    async def get_tasks_version(self, user_id: str) -> Optional[int]:
+        """Gets the change counter of a user's tasks, or None if it is not tracked."""
+        pass
+    
+    @abstractmethod
+    async def get_task_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """Gets a task by its ID if it was created by the user."""
+        pass
+    
+    @abstractmethod
+    async def create_task(self, title: str, description: str, status: str, user_id: str) -> Task:
+        """Creates a new task."""
+        pass
+    
+    @abstractmethod
+    async def create_tasks(self, tasks_data: List[Dict[str, Any]], user_id: str) -> Tuple[List[Task], Dict[int, str]]:
+        """Creates several tasks at once, returning them and the errors of those that failed by position."""
+        pass
+    
+    @abstractmethod
+    async def update_task(self, task_id: str, title: Optional[str] = None,
+                          description: Optional[str] = None, status: Optional[str] = None) -> Optional[Task]:
+        """Updates an existing task."""
+        pass
+    
+    @abstractmethod
+    async def delete_task(self, task_id: str) -> bool:
+        """Deletes a task by its ID."""
+        pass
+    
+    @abstractmethod
+    async def update_tasks(self, updates: List[Dict[str, Any]], user_id: str) -> Set[str]:
+        """Updates several of a user's tasks at once, returning the IDs of those that were found."""
+        pass
+    
+    @abstractmethod
+    async def delete_tasks(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """Deletes several of a user's tasks at once, returning the IDs of those that were found."""
+        pass
+
+class UserRepository(ABC):
+    """Interface for the repository of registered users."""
+    
+    @abstractmethod
+    def get_password_hash(self, username: str) -> Optional[str]:
+        """Gets the stored password hash of a user, or None if the user is not registered."""
+        pass
+    
+    @abstractmethod
+    def save(self, username: str, password_hash: str) -> None:
+        """Stores the password hash of a user, replacing any previous one."""
+        pass
 
 class AuthService(ABC):
     """Interface for the authentication service."""
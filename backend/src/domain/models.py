@@ -2,8 +2,22 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from uuid import uuid4, UUID
 
+def _stored_date(value: Any) -> datetime:
+    """Returns a stored date as a datetime, parsing the ISO strings written by earlier versions."""
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
 class Task:
-    """Domain model for a task."""
+    """
+    Domain model for a task.
+    
+    Tasks use ``__slots__`` instead of a per-instance ``__dict__`` because
+    listings can hold many of them in memory at once.
+    """
+    
+    __slots__ = (
+        "task_id", "title", "description", "status",
+        "created_at", "updated_at", "created_by"
+    )
     
     def __init__(
         self,
@@ -56,6 +70,9 @@ class Task:
         """
         Converts the task to a dictionary.
         
+        Dates are kept as datetime objects; the JSON codec and the database
+        driver serialize them natively.
+        
         Returns:
             Dict with task data
         """
@@ -64,8 +81,8 @@ class Task:
             "title": self.title,
             "description": self.description,
             "status": self.status,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
             "created_by": self.created_by
         }
     
@@ -96,4 +113,76 @@ class Task:
             created_at=created_at,
             updated_at=updated_at,
             created_by=data.get("created_by")
-        ) 
\ No newline at end of file
+        )
+    
+    @classmethod
+    def from_document(cls, data: Dict[str, Any]) -> 'Task':
+        """
+        Creates a Task from a stored document without parsing or defaults.
+        
+        This is the trusted fast path for rows read back from a repository:
+        the document must contain every task field, as written by ``to_dict``.
+        Dates are datetime objects, except in documents written by earlier
+        versions, which stored them as ISO strings and are parsed here.
+        
+        Args:
+            data: Stored task document
+            
+        Returns:
+            Task instance
+        """
+        task = cls.__new__(cls)
+        task.task_id = data["task_id"]
+        task.title = data["title"]
+        task.description = data["description"]
+        task.status = data["status"]
+        task.created_at = _stored_date(data["created_at"])
+        task.updated_at = _stored_date(data["updated_at"])
+        task.created_by = data["created_by"]
+        return task 
+
+class Tombstone:
+    """
+    Record of a deleted task, kept so that clients can sync deletions.
+    """
+    
+    __slots__ = ("task_id", "created_by", "deleted_at")
+    
+    def __init__(self, task_id: str, created_by: Optional[str], deleted_at: Optional[datetime] = None):
+        """
+        Initializes a tombstone.
+        
+        Args:
+            task_id: ID of the deleted task
+            created_by: ID of the user who created the task
+            deleted_at: Deletion date
+        """
+        self.task_id = task_id
+        self.created_by = created_by
+        self.deleted_at = deleted_at or datetime.utcnow()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converts the tombstone to a dictionary.
+        
+        Returns:
+            Dict with tombstone data
+        """
+        return {
+            "task_id": self.task_id,
+            "created_by": self.created_by,
+            "deleted_at": self.deleted_at
+        }
+    
+    @classmethod
+    def from_document(cls, data: Dict[str, Any]) -> 'Tombstone':
+        """
+        Creates a Tombstone from a stored document.
+        
+        Args:
+            data: Stored tombstone document
+            
+        Returns:
+            Tombstone instance
+        """
+        return cls(data["task_id"], data["created_by"], data["deleted_at"])
@@ -0,0 +1,98 @@
+"""
+Keyset pagination helpers for task listings.
+
+Task listings are ordered by a date field plus ``task_id`` as a tie-breaker.
+A page is continued from an opaque cursor that encodes the sort key of the
+last task returned, so every page is a bounded index range scan regardless
+of depth.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from .exceptions import ValidationError
+from .models import Task
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+SORT_FIELDS = ("updated_at", "created_at")
+DEFAULT_SORT = "-updated_at"
+SORT_OPTIONS = tuple(prefix + field for field in SORT_FIELDS for prefix in ("-", ""))
+
+_SEPARATOR = "|"
+
+
+def parse_sort(sort: str) -> Tuple[str, bool]:
+    """
+    Split a sort option into its field and direction.
+
+    Args:
+        sort: One of ``SORT_OPTIONS``; a leading ``-`` means descending
+
+    Returns:
+        Tuple of (field, descending)
+    """
+    return sort.lstrip("-"), sort.startswith("-")
+
+
+def encode_cursor(task: Task, sort: str = DEFAULT_SORT) -> str:
+    """
+    Encode the sort key of a task as an opaque cursor.
+
+    Args:
+        task: The last task of the current page
+        sort: The sort option the page was listed with
+
+    Returns:
+        URL-safe cursor string
+    """
+    field, _ = parse_sort(sort)
+    value = getattr(task, field).isoformat()
+    raw = _SEPARATOR.join((sort, value, task.task_id))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, datetime, str]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor: The opaque cursor string
+
+    Returns:
+        Tuple of (sort, sort field value, task_id)
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        sort, value, task_id = raw.split(_SEPARATOR, 2)
+        if sort not in SORT_OPTIONS:
+            raise ValueError(sort)
+        return sort, datetime.fromisoformat(value), task_id
+    except (ValueError, UnicodeError, binascii.Error):
+        raise ValidationError(
+            "Invalid cursor",
+            {"cursor": "Cursor must be a value returned as next_cursor"}
+        )
+
+
+def next_cursor(tasks: List[Task], limit: Optional[int], sort: str = DEFAULT_SORT) -> Optional[str]:
+    """
+    Build the cursor for the page following ``tasks``.
+
+    Args:
+        tasks: The tasks of the current page
+        limit: The page size that was requested
+        sort: The sort option the page was listed with
+
+    Returns:
+        Cursor string if the page is full, None if it is the last page
+    """
+    if not limit or len(tasks) < limit:
+        return None
+    return encode_cursor(tasks[-1], sort)
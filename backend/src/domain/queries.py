@@ -0,0 +1,122 @@
+"""
+Query model for task listings.
+
+A TaskQuery carries the filters and sort order of a task listing from the API
+layer down to the repository, which translates it into a storage query.
+"""
+
+import copy
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from .pagination import DEFAULT_SORT, parse_sort
+
+DATE_FILTERS = ("created_after", "created_before", "updated_after", "updated_before")
+
+
+def parse_query_date(value: str) -> datetime:
+    """
+    Parse an ISO 8601 query parameter into a naive UTC datetime.
+
+    Args:
+        value: The ISO 8601 date or datetime string
+
+    Returns:
+        Naive datetime in UTC, comparable with stored task dates
+
+    Raises:
+        ValueError: If the value is not a valid ISO 8601 date
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class TaskQuery:
+    """Filters and sort order for listing tasks."""
+
+    def __init__(
+        self,
+        status: Optional[str] = None,
+        created_by: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        updated_after: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+        sort: str = DEFAULT_SORT
+    ):
+        """
+        Initializes a task query.
+
+        Args:
+            status: Only tasks with this status
+            created_by: Only tasks created by this user
+            created_after: Only tasks created at or after this date
+            created_before: Only tasks created before this date
+            updated_after: Only tasks updated at or after this date
+            updated_before: Only tasks updated before this date
+            sort: Sort option, see ``pagination.SORT_OPTIONS``
+        """
+        self.status = status
+        self.created_by = created_by
+        self.created_after = created_after
+        self.created_before = created_before
+        self.updated_after = updated_after
+        self.updated_before = updated_before
+        self.sort = sort
+
+    @property
+    def sort_key(self) -> Tuple[str, bool]:
+        """Sort field and whether it is descending."""
+        return parse_sort(self.sort)
+
+    def for_owner(self, user_id: str) -> 'TaskQuery':
+        """
+        Returns a copy of the query restricted to the tasks of one user.
+
+        Args:
+            user_id: ID of the user that owns the tasks
+
+        Returns:
+            New TaskQuery with ``created_by`` set to the user
+        """
+        scoped = copy.copy(self)
+        scoped.created_by = user_id
+        return scoped
+
+    def date_ranges(self) -> Dict[str, Tuple[Optional[datetime], Optional[datetime]]]:
+        """
+        Returns the requested date ranges keyed by task field.
+
+        Returns:
+            Dict mapping a date field to its (lower, upper) bounds
+        """
+        ranges = {
+            "created_at": (self.created_after, self.created_before),
+            "updated_at": (self.updated_after, self.updated_before)
+        }
+        return {field: bounds for field, bounds in ranges.items() if bounds != (None, None)}
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> 'TaskQuery':
+        """
+        Creates a TaskQuery from validated query string parameters.
+
+        Args:
+            params: Query string parameters of the listing request
+
+        Returns:
+            TaskQuery instance
+        """
+        dates = {
+            name: parse_query_date(params[name])
+            for name in DATE_FILTERS
+            if params.get(name)
+        }
+        return cls(
+            status=params.get("status"),
+            created_by=params.get("created_by"),
+            sort=params.get("sort") or DEFAULT_SORT,
+            **dates
+        )
@@ -0,0 +1,188 @@
+"""
+Incremental synchronization of a user's tasks.
+
+A client keeps a watermark returned by the previous sync and asks for the
+changes after it: the tasks whose ``updated_at`` is later than the watermark
+and the tombstones of the tasks deleted since then. The new watermark lags
+the current time slightly so that writes still in flight when the sync runs,
+whose timestamps were taken before they were committed, are picked up by the
+next sync instead of being skipped. Clients apply changes by ``task_id``, so
+receiving a change twice is harmless.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .exceptions import SyncExpiredError
+from .models import Task, Tombstone
+
+DEFAULT_SYNC_LAG = timedelta(seconds=2)
+
+# Change timestamp of a task and of a tombstone, in the order they are fetched
+CHANGE_KEYS: List[Callable[[Any], datetime]] = [
+    lambda task: task.updated_at,
+    lambda tombstone: tombstone.deleted_at
+]
+
+
+class SyncResult:
+    """Changes of a user's tasks between two watermarks."""
+
+    __slots__ = ("tasks", "deleted", "watermark", "has_more")
+
+    def __init__(self, tasks: List[Task], deleted: List[Tombstone], watermark: datetime, has_more: bool):
+        """
+        Initializes a sync result.
+
+        Args:
+            tasks: Tasks created or updated after the previous watermark, oldest first
+            deleted: Tombstones of tasks deleted after the previous watermark, oldest first
+            watermark: Watermark to send with the next sync
+            has_more: Whether more changes are waiting after the new watermark
+        """
+        self.tasks = tasks
+        self.deleted = deleted
+        self.watermark = watermark
+        self.has_more = has_more
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converts the result to a dictionary.
+
+        Returns:
+            Dict with the changed tasks, the deleted task ids and the new watermark
+        """
+        return {
+            "tasks": [task.to_dict() for task in self.tasks],
+            "deleted": [
+                {"task_id": tombstone.task_id, "deleted_at": tombstone.deleted_at}
+                for tombstone in self.deleted
+            ],
+            "watermark": self.watermark,
+            "has_more": self.has_more
+        }
+
+
+def _page_boundary(items: List[Any], limit: int, key: Callable[[Any], datetime]) -> Optional[datetime]:
+    """
+    Find the latest timestamp whose items all fit in a page.
+
+    Args:
+        items: Up to ``limit + 1`` items in ascending timestamp order
+        limit: Page size
+        key: Returns the timestamp of an item
+
+    Returns:
+        The timestamp of the last item before the first one left out, or None if
+        every item on the page shares the timestamp of the first one left out
+    """
+    cut = key(items[limit])
+    for item in reversed(items[:limit]):
+        if key(item) < cut:
+            return key(item)
+    return None
+
+
+def _check_watermark(since: datetime, now: datetime, retention: Optional[timedelta]) -> None:
+    """Reject a watermark older than the tombstone retention."""
+    if retention is not None and since < now - retention:
+        raise SyncExpiredError()
+
+
+def _plan_pages(pages: List[List[Any]], limit: int, until: datetime) -> Tuple[datetime, bool, List[bool]]:
+    """
+    Choose the new watermark from the first pages of tasks and tombstones.
+
+    Args:
+        pages: Up to ``limit + 1`` tasks and up to ``limit + 1`` tombstones
+        limit: Page size
+        until: Upper bound of the sync window
+
+    Returns:
+        The new watermark, whether more changes are waiting after it, and for each
+        source whether its page holds every change up to the watermark
+    """
+    watermark = until
+    has_more = False
+    complete = [True, True]
+    for index, (items, key) in enumerate(zip(pages, CHANGE_KEYS)):
+        if len(items) > limit:
+            has_more = True
+            boundary = _page_boundary(items, limit, key)
+            if boundary is None:
+                # More than a page of changes share one timestamp; take them all
+                boundary = key(items[limit])
+                complete[index] = False
+            watermark = min(watermark, boundary)
+    return watermark, has_more, complete
+
+
+def collect_changes(repository, user_id: str, since: datetime, limit: int,
+                    lag: timedelta = DEFAULT_SYNC_LAG,
+                    retention: Optional[timedelta] = None,
+                    now: Optional[datetime] = None) -> SyncResult:
+    """
+    Collect the changes of a user's tasks after a watermark.
+
+    At most about ``limit`` tasks and ``limit`` tombstones are returned. A page
+    always ends on a whole timestamp, so tasks sharing a timestamp are never
+    split across two syncs.
+
+    Args:
+        repository: TaskRepository to read from
+        user_id: ID of the user that owns the tasks
+        since: Watermark of the previous sync
+        limit: Maximum number of tasks and of tombstones to return
+        lag: How far behind the current time the new watermark is kept
+        retention: How long tombstones are kept, if they expire
+        now: Current time, replaceable in tests
+
+    Returns:
+        SyncResult with the changes and the new watermark
+
+    Raises:
+        SyncExpiredError: If tombstones older than the watermark may have expired
+    """
+    now = now or datetime.utcnow()
+    _check_watermark(since, now, retention)
+
+    until = max(since, now - lag)
+    fetches = [repository.get_changed_for_user, repository.get_deleted_for_user]
+    pages = [fetch(user_id, since, until, limit + 1) for fetch in fetches]
+    watermark, has_more, complete = _plan_pages(pages, limit, until)
+
+    changes = []
+    for items, fetch, key, is_complete in zip(pages, fetches, CHANGE_KEYS, complete):
+        if is_complete:
+            changes.append([item for item in items if key(item) <= watermark])
+        else:
+            changes.append(fetch(user_id, since, watermark, None))
+
+    return SyncResult(changes[0], changes[1], watermark, has_more)
+
+
+async def collect_changes_async(repository, user_id: str, since: datetime, limit: int,
+                                lag: timedelta = DEFAULT_SYNC_LAG,
+                                retention: Optional[timedelta] = None,
+                                now: Optional[datetime] = None) -> SyncResult:
+    """
+    Collect the changes of a user's tasks after a watermark from an AsyncTaskRepository.
+
+    Same as collect_changes, with the repository reads awaited.
+    """
+    now = now or datetime.utcnow()
+    _check_watermark(since, now, retention)
+
+    until = max(since, now - lag)
+    fetches = [repository.get_changed_for_user, repository.get_deleted_for_user]
+    pages = [await fetch(user_id, since, until, limit + 1) for fetch in fetches]
+    watermark, has_more, complete = _plan_pages(pages, limit, until)
+
+    changes = []
+    for items, fetch, key, is_complete in zip(pages, fetches, CHANGE_KEYS, complete):
+        if is_complete:
+            changes.append([item for item in items if key(item) <= watermark])
+        else:
+            changes.append(await fetch(user_id, since, watermark, None))
+
+    return SyncResult(changes[0], changes[1], watermark, has_more)
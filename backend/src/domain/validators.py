@@ -5,12 +5,14 @@ This module provides validation functions for task and user data,
 ensuring that all data meets the required format and constraints.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from datetime import datetime
 import re
 from uuid import UUID
 
-from .exceptions import ValidationError
+from .exceptions import AuthorizationError, ValidationError
+from .pagination import DEFAULT_SORT, MAX_PAGE_SIZE, SORT_OPTIONS, decode_cursor
+from .queries import DATE_FILTERS, parse_query_date
 
 class TaskValidator:
     """Validator for Task entities."""
@@ -96,6 +98,68 @@ class TaskValidator:
         cls.validate_description(data.get("description"))
         cls.validate_status(data.get("status"))
     
+    @staticmethod
+    def validate_batch(data: Any, max_size: int, key: str = "tasks") -> List[Any]:
+        """Validates the envelope of a batch request and returns its items."""
+        items = data.get(key) if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            raise ValidationError(
+                "Invalid batch",
+                {key: f"{key} must be a non-empty list"}
+            )
+        
+        if len(items) > max_size:
+            raise ValidationError(
+                "Batch too large",
+                {key: f"A batch can have at most {max_size} items"}
+            )
+        return items
+    
+    @staticmethod
+    def validate_batch_items(items: List[Any], validate: Callable[[Dict[str, Any]], None],
+                             unique_key: Optional[str] = None) -> Dict[int, ValidationError]:
+        """
+        Validates every item of a batch, returning the error of each invalid item by position.
+        
+        With a unique_key, an item repeating the value of an earlier item is invalid.
+        """
+        errors = {}
+        seen = set()
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ValidationError(
+                        "Invalid data type",
+                        {"item": "Each item must be an object"}
+                    )
+                validate(item)
+                if unique_key is not None:
+                    if item[unique_key] in seen:
+                        raise ValidationError(
+                            "Duplicate item",
+                            {unique_key: f"{unique_key} appears more than once in the batch"}
+                        )
+                    seen.add(item[unique_key])
+            except ValidationError as e:
+                errors[index] = e
+        return errors
+    
+    @classmethod
+    def validate_batch_task_id(cls, data: Dict[str, Any]) -> None:
+        """Validates the task ID of a batch item."""
+        if not isinstance(data.get("task_id"), str):
+            raise ValidationError(
+                "Missing required fields",
+                {"task_id": "task_id is required and must be a string"}
+            )
+        cls.validate_task_id(data["task_id"])
+    
+    @classmethod
+    def validate_batch_update(cls, data: Dict[str, Any]) -> None:
+        """Validates an item of a batch update: a task ID and the fields to update."""
+        cls.validate_batch_task_id(data)
+        cls.validate_update_task({key: value for key, value in data.items() if key != "task_id"})
+    
     @classmethod
     def validate_update_task(cls, data: Dict[str, Any]) -> None:
         """Validates data for updating a task."""
@@ -129,6 +193,87 @@ class TaskValidator:
             cls.validate_description(data["description"])
         if "status" in data:
             cls.validate_status(data["status"])
+    
+    @staticmethod
+    def validate_limit(limit: Optional[str]) -> None:
+        """Validates the page size of a task listing."""
+        if limit is None:
+            return
+        
+        if not str(limit).isdigit() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+            raise ValidationError(
+                "Invalid limit",
+                {"limit": f"Limit must be an integer between 1 and {MAX_PAGE_SIZE}"}
+            )
+    
+    @staticmethod
+    def validate_sort(sort: Optional[str]) -> None:
+        """Validates the sort option of a task listing."""
+        if sort is not None and sort not in SORT_OPTIONS:
+            raise ValidationError(
+                "Invalid sort",
+                {"sort": f"Sort must be one of: {', '.join(SORT_OPTIONS)}"}
+            )
+    
+    @staticmethod
+    def validate_date_filter(name: str, value: Optional[str]) -> None:
+        """Validates a date range filter of a task listing."""
+        if value is None:
+            return
+        
+        try:
+            parse_query_date(value)
+        except (TypeError, ValueError):
+            raise ValidationError(
+                "Invalid date",
+                {name: "Date must be in ISO 8601 format"}
+            )
+    
+    @classmethod
+    def validate_sync_query(cls, params: Dict[str, Any]) -> None:
+        """Validates an incremental sync, which only accepts a watermark and a limit."""
+        cls.validate_date_filter("since", params.get("since") or "")
+        
+        extra = sorted(set(params) - {"since", "limit"})
+        if extra:
+            raise ValidationError(
+                "Invalid sync query",
+                {name: "Cannot be combined with since" for name in extra}
+            )
+    
+    @classmethod
+    def validate_list_query(cls, params: Dict[str, Any], user_id: Optional[str] = None) -> None:
+        """
+        Validates the query parameters for listing tasks.
+        
+        Listings are always scoped to the caller, so a ``created_by`` filter
+        naming another user is refused rather than silently replaced.
+        """
+        cls.validate_limit(params.get("limit"))
+        cls.validate_sort(params.get("sort"))
+        cls.validate_status(params.get("status"))
+        
+        if "created_by" in params and not params["created_by"]:
+            raise ValidationError(
+                "Invalid filter",
+                {"created_by": "created_by cannot be empty"}
+            )
+        if user_id is not None and params.get("created_by") not in (None, user_id):
+            raise AuthorizationError("Cannot list tasks of another user")
+        
+        for name in DATE_FILTERS:
+            cls.validate_date_filter(name, params.get(name))
+        
+        if "since" in params:
+            cls.validate_sync_query(params)
+        
+        if params.get("cursor") is not None:
+            sort, _, _ = decode_cursor(params["cursor"])
+            if sort != (params.get("sort") or DEFAULT_SORT):
+                raise ValidationError(
+                    "Invalid cursor",
+                    {"cursor": "Cursor was issued for a different sort order"}
+                )
 
 
 class AuthValidator:
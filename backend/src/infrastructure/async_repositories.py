@@ -0,0 +1,204 @@
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from ..domain.interfaces import AsyncTaskRepository
+from ..domain.models import Task, Tombstone
+from ..domain.pagination import DEFAULT_PAGE_SIZE
+from ..domain.queries import TaskQuery
+from .mongo_clients import get_async_client, on_fork
+from .mongo_queries import (
+    OBSOLETE_TASK_INDEXES, TASK_INDEXES, TASK_PROJECTION, TOMBSTONE_INDEXES,
+    change_filter, change_sort, delete_requests, sort_spec, task_filter, tombstone_writes, version_bumps
+)
+
+class MotorTaskRepository(AsyncTaskRepository):
+    """Implementación asíncrona del repositorio de tareas usando MongoDB a través de Motor."""
+
+    def __init__(self, mongo_uri: str, db_name: str, collection_name: str,
+                 tombstone_retention: Optional[timedelta] = None):
+        """Inicializa el repositorio con las mismas colecciones que MongoTaskRepository."""
+        self.mongo_uri = mongo_uri
+        self.db_name = db_name
+        self.collection_name = collection_name
+        self.tombstone_retention = tombstone_retention
+        self._indexes_ready = False
+        self._connect()
+        on_fork(self._connect)
+
+    def _connect(self) -> None:
+        """Toma las colecciones del cliente Motor compartido del proceso; se repite tras un fork."""
+        self.client = get_async_client(self.mongo_uri)
+        self.db = self.client[self.db_name]
+        self.collection = self.db[self.collection_name]
+        self.versions = self.db[f"{self.collection_name}_versions"]
+        self.tombstones = self.db[f"{self.collection_name}_tombstones"]
+
+    async def _ensure_indexes(self) -> None:
+        """Crea los índices de consulta la primera vez que se necesitan."""
+        if not self._indexes_ready:
+            for keys in TASK_INDEXES:
+                await self.collection.create_index(keys)
+            for name in set(OBSOLETE_TASK_INDEXES) & set(await self.collection.index_information()):
+                await self.collection.drop_index(name)
+            for keys in TOMBSTONE_INDEXES:
+                await self.tombstones.create_index(keys)
+            if self.tombstone_retention:
+                await self.tombstones.create_index(
+                    [("deleted_at", ASCENDING)], expireAfterSeconds=int(self.tombstone_retention.total_seconds())
+                )
+            self._indexes_ready = True
+
+    async def _bump_version(self, user_id: Optional[str]) -> None:
+        """Incrementa el contador de cambios del usuario después de la escritura que registra."""
+        if user_id is not None:
+            await self.versions.update_one({"_id": user_id}, {"$inc": {"version": 1}}, upsert=True)
+
+    async def _find_owned_ids(self, task_ids: Iterable[str], user_id: str) -> Set[str]:
+        """Busca cuáles de las tareas existen y son del usuario con una consulta cubierta por índice."""
+        documents = self.collection.find(
+            {"created_by": user_id, "task_id": {"$in": list(task_ids)}},
+            {"_id": 0, "task_id": 1}
+        )
+        return {document["task_id"] async for document in documents}
+
+    async def _find(self, query: TaskQuery, cursor: Optional[str], limit: Optional[int]):
+        """Construye el cursor de Motor para una consulta de tareas."""
+        await self._ensure_indexes()
+        documents = self.collection.find(task_filter(query, cursor), TASK_PROJECTION).sort(sort_spec(query))
+        if limit:
+            documents = documents.limit(limit)
+        return documents
+
+    async def get_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                               query: Optional[TaskQuery] = None) -> List[Task]:
+        """Obtiene las tareas creadas por un usuario que cumplen la consulta."""
+        query = (query or TaskQuery()).for_owner(user_id)
+        documents = await self._find(query, cursor, limit)
+        return [Task.from_document(task_data) async for task_data in documents]
+
+    async def iter_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                                query: Optional[TaskQuery] = None,
+                                batch_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[Task]:
+        """Recorre las tareas de un usuario con un único cursor de Motor leído por lotes."""
+        query = (query or TaskQuery()).for_owner(user_id)
+        documents = (await self._find(query, cursor, limit)).batch_size(batch_size)
+        try:
+            async for task_data in documents:
+                yield Task.from_document(task_data)
+        finally:
+            await documents.close()
+
+    async def get_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """Obtiene una tarea por su ID si fue creada por el usuario."""
+        await self._ensure_indexes()
+        task_data = await self.collection.find_one({"created_by": user_id, "task_id": task_id}, TASK_PROJECTION)
+        if task_data:
+            return Task.from_document(task_data)
+        return None
+
+    async def get_changed_for_user(self, user_id: str, since: datetime, until: datetime,
+                                   limit: Optional[int] = None) -> List[Task]:
+        """Obtiene las tareas del usuario modificadas en la ventana, de la más antigua a la más reciente."""
+        await self._ensure_indexes()
+        documents = self.collection.find(
+            change_filter(user_id, "updated_at", since, until), TASK_PROJECTION
+        ).sort(change_sort("updated_at"))
+        if limit:
+            documents = documents.limit(limit)
+        return [Task.from_document(task_data) async for task_data in documents]
+
+    async def get_deleted_for_user(self, user_id: str, since: datetime, until: datetime,
+                                   limit: Optional[int] = None) -> List[Tombstone]:
+        """Obtiene las lápidas de las tareas del usuario borradas en la ventana, de la más antigua a la más reciente."""
+        await self._ensure_indexes()
+        documents = self.tombstones.find(
+            change_filter(user_id, "deleted_at", since, until), {"_id": 0}
+        ).sort(change_sort("deleted_at"))
+        if limit:
+            documents = documents.limit(limit)
+        return [Tombstone.from_document(data) async for data in documents]
+
+    async def get_version(self, user_id: str) -> Optional[int]:
+        """Obtiene el contador de cambios de las tareas de un usuario."""
+        document = await self.versions.find_one({"_id": user_id})
+        return document["version"] if document else 0
+
+    async def save(self, task: Task) -> Task:
+        """Guarda una tarea."""
+        task_dict = task.to_dict()
+        result = await self.collection.insert_one(task_dict)
+        await self._bump_version(task.created_by)
+        task_dict["_id"] = str(result.inserted_id)
+        return Task.from_dict(task_dict)
+
+    async def save_many(self, tasks: List[Task]) -> Dict[int, str]:
+        """Guarda varias tareas con un único insert_many no ordenado y devuelve los errores por posición."""
+        if not tasks:
+            return {}
+        errors = {}
+        try:
+            await self.collection.insert_many([task.to_dict() for task in tasks], ordered=False)
+        except BulkWriteError as e:
+            errors = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+        requests = version_bumps(task.created_by for index, task in enumerate(tasks) if index not in errors)
+        if requests:
+            await self.versions.bulk_write(requests, ordered=False)
+        return errors
+
+    async def update_fields(self, task_id: str, fields: Dict[str, Any]) -> Optional[Task]:
+        """Actualiza solo los campos indicados y updated_at en una única operación atómica."""
+        task_data = await self.collection.find_one_and_update(
+            {"task_id": task_id},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}},
+            projection=TASK_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if task_data:
+            await self._bump_version(task_data.get("created_by"))
+            return Task.from_document(task_data)
+        return None
+
+    async def delete(self, task_id: str) -> bool:
+        """Elimina una tarea por su ID dejando una lápida para la sincronización, y devuelve si existía."""
+        task_data = await self.collection.find_one_and_delete({"task_id": task_id}, projection={"created_by": 1})
+        if task_data is None:
+            return False
+        await self._ensure_indexes()
+        await self.tombstones.bulk_write(tombstone_writes([task_id], task_data.get("created_by")), ordered=False)
+        await self._bump_version(task_data.get("created_by"))
+        return True
+
+    async def update_fields_many(self, updates: Dict[str, Dict[str, Any]], user_id: str) -> Set[str]:
+        """Actualiza varias tareas del usuario con un único bulk_write no ordenado y devuelve las que siguen existiendo."""
+        await self._ensure_indexes()
+        found = await self._find_owned_ids(updates, user_id)
+        if not found:
+            return found
+        now = datetime.utcnow()
+        result = await self.collection.bulk_write([
+            UpdateOne({"created_by": user_id, "task_id": task_id}, {"$set": {**updates[task_id], "updated_at": now}})
+            for task_id in found
+        ], ordered=False)
+        if result.matched_count < len(found):
+            # Algunas se borraron entre la búsqueda y la escritura; solo se informan las que quedan
+            found = await self._find_owned_ids(found, user_id)
+        if found:
+            await self._bump_version(user_id)
+        return found
+
+    async def delete_many(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """Elimina varias tareas del usuario con un único bulk_write no ordenado, deja sus lápidas y las devuelve."""
+        await self._ensure_indexes()
+        found = await self._find_owned_ids(task_ids, user_id)
+        if not found:
+            return found
+        result = await self.collection.bulk_write(delete_requests(found, user_id), ordered=False)
+        if not result.deleted_count:
+            # Otra petición las borró todas entre la búsqueda y la escritura
+            return set()
+        await self.tombstones.bulk_write(tombstone_writes(found, user_id), ordered=False)
+        await self._bump_version(user_id)
+        return found
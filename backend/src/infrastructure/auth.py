@@ -3,16 +3,61 @@ Authentication service implementation using JWT tokens.
 
 This module provides the JwtAuthService class which handles user authentication,
 token generation, and token verification using JSON Web Tokens (JWT).
+Verified token payloads are cached until the token expires, so repeated
+requests with the same token skip signature and claim verification.
+Signing and verification are delegated to a pluggable JwtBackend.
+
+Registered users are kept in a UserRepository, so that with shared storage a
+user registered through one worker can log in through any other. Passwords
+are stored as salted PBKDF2-SHA256 hashes that record their iteration count,
+so raising PASSWORD_HASH_ITERATIONS does not invalidate existing hashes.
 """
 
+import hashlib
+import hmac
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
-from jose import jwt, JWTError
+from ..domain.interfaces import AuthService, UserRepository
+from src.config import (
+    JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRE_MINUTES, JWT_CACHE_SIZE, JWT_BACKEND, PASSWORD_HASH_ITERATIONS
+)
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.jwt_backends import JwtBackend, InvalidTokenError, create_jwt_backend
+
+def hash_password(password: str, iterations: int = PASSWORD_HASH_ITERATIONS) -> str:
+    """
+    Hash a password with a random salt.
+    
+    Args:
+        password: The password to hash
+        iterations: Number of PBKDF2 iterations
+        
+    Returns:
+        The hash as ``pbkdf2_sha256$<iterations>$<salt>$<digest>``, in hex
+    """
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${salt.hex()}${digest.hex()}"
 
-from ..domain.interfaces import AuthService
-from src.config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRE_MINUTES
+def check_password(password: str, password_hash: str) -> bool:
+    """
+    Check a password against a hash made by hash_password, in constant time.
+    
+    Args:
+        password: The password to check
+        password_hash: The stored hash
+        
+    Returns:
+        True if the password matches the hash
+    """
+    algorithm, iterations, salt, digest = password_hash.split("$")
+    if algorithm != "pbkdf2_sha256":
+        return False
+    candidate = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt), int(iterations))
+    return hmac.compare_digest(candidate, bytes.fromhex(digest))
 
 class JwtAuthService(AuthService):
     """
@@ -22,9 +67,23 @@ class JwtAuthService(AuthService):
     It provides methods for user registration, authentication, and token verification.
     """
     
-    def __init__(self):
-        """Initialize the JWT authentication service."""
-        self.users = {}
+    def __init__(self, token_cache_size: int = JWT_CACHE_SIZE, jwt_backend: Optional[JwtBackend] = None,
+                 users: Optional[UserRepository] = None):
+        """
+        Initialize the JWT authentication service.
+        
+        Args:
+            token_cache_size: Maximum number of verified tokens kept in memory; 0 disables the cache
+            jwt_backend: Backend used to sign and verify tokens; defaults to the one selected by JWT_BACKEND
+            users: Repository of the registered users; defaults to one in process memory
+        """
+        if users is None:
+            from src.infrastructure.memory_repository import InMemoryUserRepository
+            
+            users = InMemoryUserRepository()
+        self.users = users
+        self.jwt_backend = jwt_backend or create_jwt_backend(JWT_SECRET, JWT_ALGORITHM, JWT_BACKEND)
+        self.token_cache = TTLCache(token_cache_size, ttl=0) if token_cache_size > 0 else None
     
     def authenticate(self, username: str, password: str) -> Optional[str]:
         """
@@ -37,7 +96,8 @@ class JwtAuthService(AuthService):
         Returns:
             JWT token if authentication is successful, None otherwise
         """
-        if username in self.users and self.users[username] == password:
+        password_hash = self.users.get_password_hash(username)
+        if password_hash is not None and check_password(password, password_hash):
             return self._create_token(username)
         return None
     
@@ -52,23 +112,60 @@ class JwtAuthService(AuthService):
         Returns:
             JWT token for the newly registered user
         """
-        self.users[username] = password
+        self.users.save(username, hash_password(password))
         return self._create_token(username)
     
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """
         Verify a JWT token and return the user information.
         
+        Payloads of valid tokens are cached under a digest of the token until
+        the token's own expiration time. Tokens without an exp claim are
+        verified on every call.
+        
         Args:
             token: The JWT token to verify
             
         Returns:
             Dictionary containing user information if token is valid, None otherwise
         """
+        if self.token_cache is None:
+            return self._decode(token)
+        
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        payload = self.token_cache.get(key)
+        if payload is not None:
+            return dict(payload)
+        
+        payload = self._decode(token)
+        if payload is not None and isinstance(payload.get("exp"), (int, float)):
+            remaining = payload["exp"] - time.time()
+            if remaining > 0:
+                self.token_cache.set(key, payload, ttl=remaining)
+        return dict(payload) if payload is not None else None
+    
+    def token_cache_stats(self) -> Optional[Dict[str, int]]:
+        """
+        Get the counters of the verified token cache.
+        
+        Returns:
+            Dictionary with size, hits, misses, expirations and evictions, or None if the cache is disabled
+        """
+        return self.token_cache.stats() if self.token_cache is not None else None
+    
+    def _decode(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Verify the signature and claims of a JWT token.
+        
+        Args:
+            token: The JWT token to verify
+            
+        Returns:
+            The token payload if the token is valid, None otherwise
+        """
         try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-            return payload
-        except jwt.InvalidTokenError:
+            return self.jwt_backend.decode(token)
+        except InvalidTokenError:
             return None
     
     def _create_token(self, username: str) -> str:
@@ -82,7 +179,8 @@ class JwtAuthService(AuthService):
             JWT token string
         """
         payload = {
+            "sub": username,
             "user_id": username,
             "exp": datetime.utcnow() + timedelta(minutes=JWT_EXPIRE_MINUTES)
         }
-        return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM) 
\ No newline at end of file
+        return self.jwt_backend.encode(payload)
@@ -0,0 +1,201 @@
+"""
+Read-through caching decorator for task repositories.
+
+This module provides the CachingTaskRepository class, which wraps any
+TaskRepository and serves lookups by id from a bounded in-process LRU cache
+with a per-entry time to live. Writes through the decorator invalidate the
+affected entries; listings are always delegated to the wrapped repository.
+"""
+
+import copy
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from src.domain.interfaces import TaskRepository
+from src.domain.models import Task, Tombstone
+from src.domain.pagination import DEFAULT_PAGE_SIZE
+from src.domain.queries import TaskQuery
+from src.infrastructure.cache import TTLCache
+
+
+class CachingTaskRepository(TaskRepository):
+    """
+    Task repository decorator caching tasks by id.
+
+    Cached tasks are copied on the way in and out, so callers can never mutate
+    a cached entry. A read that overlaps with a write does not store its
+    result, which keeps a stale document from being cached after the write
+    invalidated it.
+    """
+
+    def __init__(self, repository: TaskRepository, max_size: int = 10000, ttl: float = 30.0):
+        """
+        Initialize the caching repository.
+
+        Args:
+            repository: The repository to wrap
+            max_size: Maximum number of cached tasks
+            ttl: Seconds a cached task is served before it is read again
+        """
+        self.repository = repository
+        self.cache = TTLCache(max_size, ttl)
+        self._write_generation = 0
+        self._generation_lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        """Expose the attributes of the wrapped repository, such as its collection."""
+        if name == "repository":
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    def _invalidate(self, task_id: str) -> None:
+        """Drop a task from the cache and mark in-flight reads as stale."""
+        with self._generation_lock:
+            self._write_generation += 1
+            self.cache.pop(task_id)
+
+    def _store(self, task: Optional[Task], generation: int) -> None:
+        """Cache a task read from the wrapped repository unless a write happened meanwhile."""
+        if task is None:
+            return
+        with self._generation_lock:
+            if generation == self._write_generation:
+                self.cache.set(task.task_id, copy.copy(task))
+
+    def _lookup(self, task_id: str) -> Optional[Task]:
+        """Get a copy of a cached task."""
+        task = self.cache.get(task_id)
+        return copy.copy(task) if task is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dictionary with size, hits, misses, expirations and evictions
+        """
+        return self.cache.stats()
+
+    def get_all(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                query: Optional[TaskQuery] = None) -> List[Task]:
+        """Delegate listings to the wrapped repository."""
+        return self.repository.get_all(limit=limit, cursor=cursor, query=query)
+
+    def get_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                         query: Optional[TaskQuery] = None) -> List[Task]:
+        """Delegate listings to the wrapped repository."""
+        return self.repository.get_all_for_user(user_id, limit=limit, cursor=cursor, query=query)
+
+    def iter_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                          query: Optional[TaskQuery] = None,
+                          batch_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Task]:
+        """Delegate streamed listings to the wrapped repository."""
+        return self.repository.iter_all_for_user(
+            user_id, limit=limit, cursor=cursor, query=query, batch_size=batch_size
+        )
+
+    def get_changed_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Task]:
+        """Delegate change listings to the wrapped repository."""
+        return self.repository.get_changed_for_user(user_id, since, until, limit)
+    
+    def get_deleted_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Tombstone]:
+        """Delegate tombstone listings to the wrapped repository."""
+        return self.repository.get_deleted_for_user(user_id, since, until, limit)
+    
+    def get_version(self, user_id: str) -> Optional[int]:
+        """Delegate change counters to the wrapped repository; they are never cached."""
+        return self.repository.get_version(user_id)
+    
+    def get_by_id(self, task_id: str) -> Optional[Task]:
+        """
+        Get a task by its ID, from the cache when possible.
+
+        Args:
+            task_id: The ID of the task to retrieve
+
+        Returns:
+            Task object if found, None otherwise
+        """
+        task = self._lookup(task_id)
+        if task is not None:
+            return task
+
+        generation = self._write_generation
+        task = self.repository.get_by_id(task_id)
+        self._store(task, generation)
+        return task
+
+    def get_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """
+        Get a task by its ID if it was created by the user, from the cache when possible.
+
+        Args:
+            task_id: The ID of the task to retrieve
+            user_id: The ID of the user that must own the task
+
+        Returns:
+            Task object if found and owned by the user, None otherwise
+        """
+        task = self._lookup(task_id)
+        if task is not None:
+            return task if task.created_by == user_id else None
+
+        generation = self._write_generation
+        task = self.repository.get_by_id_for_user(task_id, user_id)
+        self._store(task, generation)
+        return task
+
+    def save(self, task: Task) -> Task:
+        """Save a task through the wrapped repository and invalidate it."""
+        try:
+            return self.repository.save(task)
+        finally:
+            self._invalidate(task.task_id)
+
+    def save_many(self, tasks: List[Task]) -> Dict[int, str]:
+        """Save several tasks through the wrapped repository and invalidate them."""
+        try:
+            return self.repository.save_many(tasks)
+        finally:
+            for task in tasks:
+                self._invalidate(task.task_id)
+    
+    def update(self, task: Task) -> Task:
+        """Update a task through the wrapped repository and invalidate it."""
+        try:
+            return self.repository.update(task)
+        finally:
+            self._invalidate(task.task_id)
+
+    def update_fields(self, task_id: str, fields: Dict[str, Any]) -> Optional[Task]:
+        """Update some fields of a task through the wrapped repository and invalidate it."""
+        try:
+            return self.repository.update_fields(task_id, fields)
+        finally:
+            self._invalidate(task_id)
+
+    def update_fields_many(self, updates: Dict[str, Dict[str, Any]], user_id: str) -> Set[str]:
+        """Update several tasks through the wrapped repository and invalidate them."""
+        try:
+            return self.repository.update_fields_many(updates, user_id)
+        finally:
+            for task_id in updates:
+                self._invalidate(task_id)
+    
+    def delete(self, task_id: str) -> bool:
+        """Delete a task through the wrapped repository and invalidate it."""
+        try:
+            return self.repository.delete(task_id)
+        finally:
+            self._invalidate(task_id)
+    
+    def delete_many(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """Delete several tasks through the wrapped repository and invalidate them."""
+        try:
+            return self.repository.delete_many(task_ids, user_id)
+        finally:
+            for task_id in task_ids:
+                self._invalidate(task_id)
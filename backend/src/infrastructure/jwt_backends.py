@@ -0,0 +1,212 @@
+"""
+JSON Web Token signing and verification backends.
+
+This module provides the JwtBackend interface used by the authentication code,
+a minimal HS256 implementation built on ``hmac`` and ``hashlib``, and a
+python-jose backend for every other algorithm. The HS256 backend precomputes
+its key state and the encoded header, and python-jose is only imported when a
+backend that needs it is created.
+"""
+
+import base64
+import binascii
+import calendar
+import hashlib
+import hmac
+import re
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src import codec
+
+NUMERIC_DATE_CLAIMS = ("exp", "iat", "nbf")
+
+# Unpadded base64url, the only encoding allowed in a token segment
+_SEGMENT = re.compile(rb"[A-Za-z0-9_-]*")
+
+
+class InvalidTokenError(Exception):
+    """Raised when a token is malformed, badly signed or expired."""
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(segment: bytes) -> bytes:
+    """Decode a token segment, rejecting any character outside the base64url alphabet."""
+    if not _SEGMENT.fullmatch(segment):
+        raise InvalidTokenError("Malformed token")
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+
+def _numeric_dates(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert datetime date claims to seconds since the epoch, as JWT requires."""
+    claims = dict(payload)
+    for claim in NUMERIC_DATE_CLAIMS:
+        if isinstance(claims.get(claim), datetime):
+            claims[claim] = calendar.timegm(claims[claim].utctimetuple())
+    return claims
+
+
+class JwtBackend(ABC):
+    """Interface for signing and verifying JWT tokens."""
+
+    @abstractmethod
+    def encode(self, payload: Dict[str, Any]) -> str:
+        """Signs a payload and returns the token."""
+        pass
+
+    @abstractmethod
+    def decode(self, token: str) -> Dict[str, Any]:
+        """Verifies a token and returns its payload, raising InvalidTokenError if it is not valid."""
+        pass
+
+
+class HS256Backend(JwtBackend):
+    """
+    Minimal HS256 implementation on the standard library.
+
+    Verification checks the header algorithm, compares signatures in constant
+    time and validates the ``exp``, ``nbf``, ``iat``, ``aud`` and ``sub``
+    claims, matching the checks python-jose performs by default: a token with
+    an audience is only accepted by a backend created for that audience.
+    """
+
+    HEADER = {"alg": "HS256", "typ": "JWT"}
+
+    def __init__(self, secret: str, audience: Optional[str] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            secret: The shared signing secret
+            audience: The audience this service accepts tokens for, if any
+        """
+        self.audience = audience
+        self._mac = hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+        self._header_segment = _b64encode(codec.dumps_bytes(self.HEADER))
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        """
+        Sign a payload.
+
+        Args:
+            payload: The claims; datetime values of exp, iat and nbf are converted to timestamps
+
+        Returns:
+            The signed token
+        """
+        payload_segment = _b64encode(codec.dumps_bytes(_numeric_dates(payload)))
+        signing_input = self._header_segment + b"." + payload_segment
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode("ascii")
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token.
+
+        Args:
+            token: The token to verify
+
+        Returns:
+            The token payload
+
+        Raises:
+            InvalidTokenError: If the token is malformed, badly signed, expired, not yet valid
+                or meant for another audience
+        """
+        try:
+            signing_input, signature = token.encode("ascii").rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".")
+            if header_segment != self._header_segment:
+                header = codec.loads(_b64decode(header_segment))
+                if not isinstance(header, dict) or header.get("alg") != "HS256":
+                    raise InvalidTokenError("Unsupported token algorithm")
+            if not hmac.compare_digest(self._sign(signing_input), _b64decode(signature)):
+                raise InvalidTokenError("Signature verification failed")
+            payload = codec.loads(_b64decode(payload_segment))
+        except InvalidTokenError:
+            raise
+        except (ValueError, UnicodeError, binascii.Error, TypeError):
+            raise InvalidTokenError("Malformed token")
+
+        if not isinstance(payload, dict):
+            raise InvalidTokenError("Invalid token payload")
+
+        now = time.time()
+        for claim in NUMERIC_DATE_CLAIMS:
+            if claim in payload and not isinstance(payload[claim], (int, float)):
+                raise InvalidTokenError(f"Invalid {claim} claim")
+        if "exp" in payload and payload["exp"] < now:
+            raise InvalidTokenError("Token has expired")
+        if "nbf" in payload and payload["nbf"] > now:
+            raise InvalidTokenError("Token is not yet valid")
+        if "aud" in payload:
+            audiences = [payload["aud"]] if isinstance(payload["aud"], str) else payload["aud"]
+            if not isinstance(audiences, list) or not all(isinstance(a, str) for a in audiences):
+                raise InvalidTokenError("Invalid aud claim")
+            if self.audience not in audiences:
+                raise InvalidTokenError("Invalid audience")
+        if "sub" in payload and not isinstance(payload["sub"], str):
+            raise InvalidTokenError("Invalid sub claim")
+        return payload
+
+
+class JoseBackend(JwtBackend):
+    """Backend delegating to python-jose, for algorithms other than HS256."""
+
+    def __init__(self, secret: str, algorithm: str, audience: Optional[str] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            secret: The signing key
+            algorithm: Any algorithm supported by python-jose
+            audience: The audience this service accepts tokens for, if any
+        """
+        from jose import jwt, JWTError
+
+        self._jwt = jwt
+        self._error = JWTError
+        self.secret = secret
+        self.algorithm = algorithm
+        self.audience = audience
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        """Sign a payload with python-jose."""
+        return self._jwt.encode(payload, self.secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """Verify a token with python-jose."""
+        try:
+            return self._jwt.decode(token, self.secret, algorithms=[self.algorithm], audience=self.audience)
+        except self._error as e:
+            raise InvalidTokenError(str(e))
+
+
+def create_jwt_backend(secret: str, algorithm: str, backend: str = "auto",
+                       audience: Optional[str] = None) -> JwtBackend:
+    """
+    Create the JWT backend for an algorithm.
+
+    Args:
+        secret: The signing key
+        algorithm: The JWT algorithm
+        backend: "auto" to use the built-in HS256 backend when possible, or "jose" to always use python-jose
+        audience: The audience this service accepts tokens for; tokens with another one are rejected
+
+    Returns:
+        JwtBackend instance
+    """
+    if backend not in ("auto", "jose"):
+        raise ValueError(f"Unsupported JWT backend: {backend}")
+    if backend == "auto" and algorithm == "HS256":
+        return HS256Backend(secret, audience)
+    return JoseBackend(secret, algorithm, audience)
@@ -0,0 +1,478 @@
+"""
+In-memory implementation of the task repository.
+
+This module provides the InMemoryTaskRepository class, which keeps tasks in
+process memory behind the same indexes the MongoDB repositories rely on: a
+hash index on task_id and, for an owner alone and an owner with a status, a
+sorted index per sort field. Owner-scoped listings, keyset pages and change
+syncs bisect the matching index instead of scanning every task, so their cost
+grows with the page size rather than the number of tasks. Listings across all
+owners, which the API never runs, sort the matching tasks instead.
+
+The repository serves single-node deployments, where each process has its own
+copy of the data, and is the baseline backend for benchmarks.
+"""
+
+import copy
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.domain.exceptions import DatabaseError
+from src.domain.interfaces import TaskRepository, UserRepository
+from src.domain.models import Task, Tombstone
+from src.domain.pagination import SORT_FIELDS, decode_cursor
+from src.domain.queries import TaskQuery
+
+# Equality filters with an index, mirroring the MongoDB index prefixes
+EQUALITY_FIELDS: List[Tuple[str, ...]] = [("created_by",), ("created_by", "status")]
+
+# Sorted index entries are (sort value, task_id) pairs
+IndexEntry = Tuple[datetime, str]
+
+
+class _After:
+    """Sorts after every task ID, so that bisecting (value, AFTER) skips all entries with that value."""
+
+    def __lt__(self, other: Any) -> bool:
+        return False
+
+    def __gt__(self, other: Any) -> bool:
+        return True
+
+
+AFTER = _After()
+
+
+def _remove(entries: List[Any], entry: Any) -> None:
+    """Remove an entry from a sorted list by bisection."""
+    index = bisect_left(entries, entry)
+    if index < len(entries) and entries[index] == entry:
+        del entries[index]
+
+
+class InMemoryTaskRepository(TaskRepository):
+    """
+    Thread-safe in-memory task repository with secondary indexes.
+
+    Tasks are copied on the way in and out, so callers can never change a
+    stored task behind the indexes' back. A single lock serializes access;
+    every operation holds it for a bounded number of index steps.
+    """
+
+    def __init__(self, tombstone_retention: Optional[timedelta] = None):
+        """
+        Initialize an empty repository.
+
+        Args:
+            tombstone_retention: How long tombstones of deleted tasks are kept, or None to keep them
+        """
+        self.tombstone_retention = tombstone_retention
+        self._tasks: Dict[str, Task] = {}
+        self._indexes: Dict[Tuple[Tuple[str, ...], str], Dict[Tuple[Any, ...], List[IndexEntry]]] = {
+            (fields, sort_field): {} for fields in EQUALITY_FIELDS for sort_field in SORT_FIELDS
+        }
+        self._tombstones: Dict[Optional[str], List[IndexEntry]] = {}
+        self._versions: Dict[Optional[str], int] = {}
+        self._lock = threading.RLock()
+
+    def _index(self, task: Task) -> None:
+        """Add a stored task to every secondary index."""
+        for (fields, sort_field), partitions in self._indexes.items():
+            key = tuple(getattr(task, field) for field in fields)
+            insort(partitions.setdefault(key, []), (getattr(task, sort_field), task.task_id))
+
+    def _index_many(self, tasks: List[Task]) -> None:
+        """
+        Add many stored tasks to every secondary index.
+
+        The new entries of each partition are appended and the partition is
+        sorted once, which merges the two sorted runs in linear time instead
+        of shifting the list on every insertion.
+        """
+        for (fields, sort_field), partitions in self._indexes.items():
+            added: Dict[Tuple[Any, ...], List[IndexEntry]] = {}
+            for task in tasks:
+                key = tuple(getattr(task, field) for field in fields)
+                added.setdefault(key, []).append((getattr(task, sort_field), task.task_id))
+            for key, entries in added.items():
+                entries.sort()
+                partition = partitions.setdefault(key, [])
+                partition.extend(entries)
+                partition.sort()
+
+    def _unindex(self, task: Task) -> None:
+        """Remove a stored task from every secondary index."""
+        for (fields, sort_field), partitions in self._indexes.items():
+            key = tuple(getattr(task, field) for field in fields)
+            entries = partitions.get(key)
+            if entries is not None:
+                _remove(entries, (getattr(task, sort_field), task.task_id))
+                if not entries:
+                    del partitions[key]
+
+    def _bump_version(self, user_id: Optional[str]) -> None:
+        """Increment the change counter of a user's tasks."""
+        if user_id is not None:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def _owned(self, task_ids: Iterable[str], user_id: str) -> Set[str]:
+        """Find which of the given tasks exist and belong to a user."""
+        return {
+            task_id for task_id in task_ids
+            if task_id in self._tasks and self._tasks[task_id].created_by == user_id
+        }
+
+    def _bury(self, task: Task, now: datetime) -> None:
+        """Remove a task, leave its tombstone and drop tombstones past the retention."""
+        self._unindex(task)
+        del self._tasks[task.task_id]
+        tombstones = self._tombstones.setdefault(task.created_by, [])
+        insort(tombstones, (now, task.task_id))
+        if self.tombstone_retention is not None:
+            del tombstones[:bisect_left(tombstones, (now - self.tombstone_retention,))]
+
+    def _scan(self, query: TaskQuery, cursor: Optional[str], limit: Optional[int]) -> List[Task]:
+        """
+        Answer a task query from the index of its equality filters and sort field.
+
+        The range on the sort field and the cursor narrow the bisected slice;
+        a range on the other date field is checked on the tasks in the slice.
+        Queries without an owner have no index and sort the matching tasks.
+        """
+        equality = tuple(field for field in ("created_by", "status") if getattr(query, field) is not None)
+        field, descending = query.sort_key
+        if (equality, field) in self._indexes:
+            entries = self._indexes[(equality, field)].get(tuple(getattr(query, name) for name in equality), [])
+        else:
+            entries = sorted(
+                (getattr(task, field), task.task_id) for task in self._tasks.values()
+                if query.status is None or task.status == query.status
+            )
+
+        ranges = query.date_ranges()
+        lower, upper = ranges.pop(field, (None, None))
+        start = bisect_left(entries, (lower,)) if lower is not None else 0
+        stop = bisect_left(entries, (upper,)) if upper is not None else len(entries)
+        if cursor:
+            _, value, task_id = decode_cursor(cursor)
+            if descending:
+                stop = min(stop, bisect_left(entries, (value, task_id)))
+            else:
+                start = max(start, bisect_right(entries, (value, task_id)))
+
+        tasks = []
+        positions = range(stop - 1, start - 1, -1) if descending else range(start, stop)
+        for position in positions:
+            task = self._tasks[entries[position][1]]
+            if all(
+                (low is None or getattr(task, name) >= low) and (high is None or getattr(task, name) < high)
+                for name, (low, high) in ranges.items()
+            ):
+                tasks.append(copy.copy(task))
+                if limit and len(tasks) >= limit:
+                    break
+        return tasks
+
+    @staticmethod
+    def _window(entries: List[IndexEntry], since: datetime, until: datetime,
+                limit: Optional[int]) -> List[IndexEntry]:
+        """Get the entries with since < value <= until, oldest first."""
+        start = bisect_right(entries, (since, AFTER))
+        stop = bisect_right(entries, (until, AFTER))
+        if limit:
+            stop = min(stop, start + limit)
+        return entries[start:stop]
+
+    def get_all(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                query: Optional[TaskQuery] = None) -> List[Task]:
+        """
+        Get tasks matching a query in its sort order.
+
+        Args:
+            limit: Optional maximum number of tasks to return
+            cursor: Optional cursor returned with the previous page
+            query: Optional filters and sort order, newest update first by default
+
+        Returns:
+            List of Task objects
+        """
+        with self._lock:
+            return self._scan(query or TaskQuery(), cursor, limit)
+
+    def get_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                         query: Optional[TaskQuery] = None) -> List[Task]:
+        """
+        Get the tasks created by a user that match a query.
+
+        Args:
+            user_id: The ID of the user
+            limit: Optional maximum number of tasks to return
+            cursor: Optional cursor returned with the previous page
+            query: Optional filters and sort order
+
+        Returns:
+            List of Task objects created by the user
+        """
+        return self.get_all(limit=limit, cursor=cursor, query=(query or TaskQuery()).for_owner(user_id))
+
+    def get_by_id(self, task_id: str) -> Optional[Task]:
+        """
+        Get a task by its ID from the hash index.
+
+        Args:
+            task_id: The ID of the task to retrieve
+
+        Returns:
+            Task object if found, None otherwise
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return copy.copy(task) if task is not None else None
+
+    def get_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """
+        Get a task by its ID if it was created by the user.
+
+        Args:
+            task_id: The ID of the task to retrieve
+            user_id: The ID of the user that must own the task
+
+        Returns:
+            Task object if found and owned by the user, None otherwise
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return copy.copy(task) if task is not None and task.created_by == user_id else None
+
+    def get_changed_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Task]:
+        """
+        Get the user's tasks updated within a sync window, oldest first.
+
+        Args:
+            user_id: The owner of the tasks
+            since: Exclusive lower bound on updated_at
+            until: Inclusive upper bound on updated_at
+            limit: Optional maximum number of tasks to return
+
+        Returns:
+            List of Task objects ordered by updated_at and task_id
+        """
+        with self._lock:
+            entries = self._indexes[(("created_by",), "updated_at")].get((user_id,), [])
+            return [copy.copy(self._tasks[task_id]) for _, task_id in self._window(entries, since, until, limit)]
+
+    def get_deleted_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Tombstone]:
+        """
+        Get the tombstones of the user's tasks deleted within a sync window, oldest first.
+
+        Args:
+            user_id: The owner of the deleted tasks
+            since: Exclusive lower bound on deleted_at
+            until: Inclusive upper bound on deleted_at
+            limit: Optional maximum number of tombstones to return
+
+        Returns:
+            List of Tombstone objects ordered by deleted_at and task_id
+        """
+        with self._lock:
+            entries = self._tombstones.get(user_id, [])
+            return [
+                Tombstone(task_id, user_id, deleted_at)
+                for deleted_at, task_id in self._window(entries, since, until, limit)
+            ]
+
+    def get_version(self, user_id: str) -> Optional[int]:
+        """
+        Get the change counter of a user's tasks.
+
+        Args:
+            user_id: The owner of the tasks
+
+        Returns:
+            The number of writes to the user's tasks, 0 if there were none
+        """
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def save(self, task: Task) -> Task:
+        """
+        Save a new task.
+
+        Args:
+            task: The task to save
+
+        Returns:
+            The saved task
+
+        Raises:
+            DatabaseError: If a task with the same ID already exists
+        """
+        with self._lock:
+            if task.task_id in self._tasks:
+                raise DatabaseError(f"Task with id {task.task_id} already exists")
+            stored = copy.copy(task)
+            self._tasks[stored.task_id] = stored
+            self._index(stored)
+            self._bump_version(stored.created_by)
+        return copy.copy(stored)
+
+    def save_many(self, tasks: List[Task]) -> Dict[int, str]:
+        """
+        Save several tasks under one lock acquisition, continuing past duplicates.
+
+        The indexes are updated once for the whole batch, so bulk loads stay
+        linear in the size of each index.
+
+        Args:
+            tasks: The tasks to save
+
+        Returns:
+            Error message of each task that could not be saved, keyed by its position
+        """
+        errors = {}
+        with self._lock:
+            added = []
+            for index, task in enumerate(tasks):
+                if task.task_id in self._tasks:
+                    errors[index] = f"Task with id {task.task_id} already exists"
+                    continue
+                stored = copy.copy(task)
+                self._tasks[stored.task_id] = stored
+                added.append(stored)
+            self._index_many(added)
+            for user_id in {task.created_by for task in added}:
+                self._bump_version(user_id)
+        return errors
+
+    def update(self, task: Task) -> Task:
+        """
+        Replace a stored task.
+
+        Args:
+            task: The task with updated fields
+
+        Returns:
+            The task
+        """
+        with self._lock:
+            existing = self._tasks.get(task.task_id)
+            if existing is not None:
+                self._unindex(existing)
+                stored = copy.copy(task)
+                self._tasks[stored.task_id] = stored
+                self._index(stored)
+                self._bump_version(stored.created_by)
+        return task
+
+    def update_fields(self, task_id: str, fields: Dict[str, Any]) -> Optional[Task]:
+        """
+        Set the given fields of a task and its updated_at, reindexing it.
+
+        Args:
+            task_id: The ID of the task to update
+            fields: Field values to set
+
+        Returns:
+            The updated Task, or None if no task has the ID
+        """
+        with self._lock:
+            existing = self._tasks.get(task_id)
+            if existing is None:
+                return None
+            stored = self._set_fields(existing, fields, datetime.utcnow())
+            self._bump_version(stored.created_by)
+            return copy.copy(stored)
+
+    def _set_fields(self, existing: Task, fields: Dict[str, Any], now: datetime) -> Task:
+        """Replace a stored task with a copy that has the fields and updated_at set, reindexing it."""
+        self._unindex(existing)
+        stored = copy.copy(existing)
+        for name, value in fields.items():
+            setattr(stored, name, value)
+        stored.updated_at = now
+        self._tasks[stored.task_id] = stored
+        self._index(stored)
+        return stored
+
+    def update_fields_many(self, updates: Dict[str, Dict[str, Any]], user_id: str) -> Set[str]:
+        """
+        Set fields of several tasks of a user under one lock acquisition.
+
+        Args:
+            updates: Fields to set keyed by task ID
+            user_id: The user that must own the tasks
+
+        Returns:
+            IDs of the tasks that exist, belong to the user and were updated
+        """
+        with self._lock:
+            found = self._owned(updates, user_id)
+            now = datetime.utcnow()
+            for task_id in found:
+                self._set_fields(self._tasks[task_id], updates[task_id], now)
+            if found:
+                self._bump_version(user_id)
+            return found
+
+    def delete(self, task_id: str) -> bool:
+        """
+        Delete a task by its ID, leaving a tombstone for sync.
+
+        Args:
+            task_id: The ID of the task to delete
+
+        Returns:
+            True if the task existed and was deleted, False otherwise
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return False
+            self._bury(task, datetime.utcnow())
+            self._bump_version(task.created_by)
+            return True
+
+    def delete_many(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """
+        Delete several tasks of a user under one lock acquisition, leaving tombstones.
+
+        Args:
+            task_ids: IDs of the tasks to delete
+            user_id: The user that must own the tasks
+
+        Returns:
+            IDs of the tasks that existed, belonged to the user and were deleted
+        """
+        with self._lock:
+            found = self._owned(task_ids, user_id)
+            now = datetime.utcnow()
+            for task_id in found:
+                self._bury(self._tasks[task_id], now)
+            if found:
+                self._bump_version(user_id)
+            return found
+
+
+class InMemoryUserRepository(UserRepository):
+    """
+    In-memory user repository.
+
+    Like the task repository, each process has its own users, so a user
+    registered in one worker cannot log in to another.
+    """
+
+    def __init__(self):
+        """Initialize an empty repository."""
+        self._password_hashes: Dict[str, str] = {}
+
+    def get_password_hash(self, username: str) -> Optional[str]:
+        """Get the stored password hash of a user, or None if the user is not registered."""
+        return self._password_hashes.get(username)
+
+    def save(self, username: str, password_hash: str) -> None:
+        """Store the password hash of a user, replacing any previous one."""
+        self._password_hashes[username] = password_hash
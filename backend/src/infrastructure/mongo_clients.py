@@ -0,0 +1,145 @@
+"""
+Process-wide registry of MongoDB clients.
+
+A MongoClient owns a connection pool and background monitoring threads, so a
+process should create one per cluster and share it. This module keeps one
+client per URI, built with the pool settings from the configuration, for the
+repositories and the Lambda function alike, and likewise one Motor client per
+URI for the asyncio repository.
+
+Clients must not be used across ``fork()``: the child inherits the parent's
+sockets and locks but not its monitoring threads. After a fork the registry
+forgets the inherited clients, without closing them since their sockets still
+belong to the parent, and calls the hooks registered with ``on_fork`` so that
+objects holding collections rebind them to a client of the child's own.
+"""
+
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict, List
+
+from pymongo import MongoClient
+
+from src.config import (
+    MONGO_COMPRESSORS, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS
+)
+
+_clients: Dict[str, MongoClient] = {}
+_async_clients: Dict[str, Any] = {}
+_lock = threading.Lock()
+_pid = os.getpid()
+_fork_hooks: List[weakref.WeakMethod] = []
+
+
+def client_options() -> Dict[str, Any]:
+    """
+    Build the MongoClient keyword arguments from the configuration.
+
+    Returns:
+        Pool size, wait queue and server selection timeouts, and compressors if any
+    """
+    options: Dict[str, Any] = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+    if MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = MONGO_WAIT_QUEUE_TIMEOUT_MS
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return options
+
+
+def get_client(uri: str) -> MongoClient:
+    """
+    Get the shared client for a URI, creating it on first use.
+
+    Args:
+        uri: MongoDB connection string
+
+    Returns:
+        The MongoClient of this process for the URI
+    """
+    if os.getpid() != _pid:
+        # Forked without going through os.fork(), e.g. by a C extension
+        _after_fork()
+    client = _clients.get(uri)
+    if client is None:
+        with _lock:
+            client = _clients.get(uri)
+            if client is None:
+                client = MongoClient(uri, **client_options())
+                _clients[uri] = client
+    return client
+
+
+def get_async_client(uri: str):
+    """
+    Get the shared Motor client for a URI, creating it on first use.
+
+    Motor is only imported here, so the synchronous stack does not load it.
+    The client attaches to the event loop running when it is first used.
+
+    Args:
+        uri: MongoDB connection string
+
+    Returns:
+        The AsyncIOMotorClient of this process for the URI
+    """
+    if os.getpid() != _pid:
+        _after_fork()
+    client = _async_clients.get(uri)
+    if client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        with _lock:
+            client = _async_clients.get(uri)
+            if client is None:
+                client = AsyncIOMotorClient(uri, **client_options())
+                _async_clients[uri] = client
+    return client
+
+
+def on_fork(hook: Callable[[], None]) -> None:
+    """
+    Register a bound method to call in the child process after a fork.
+
+    The registry only keeps a weak reference, so registering does not keep the
+    hook's object alive.
+
+    Args:
+        hook: Bound method that rebinds its object to the registry's clients
+    """
+    with _lock:
+        _fork_hooks.append(weakref.WeakMethod(hook))
+
+
+def close_clients() -> None:
+    """Close every client of this process, e.g. when a worker shuts down."""
+    with _lock:
+        clients = list(_clients.values()) + list(_async_clients.values())
+        _clients.clear()
+        _async_clients.clear()
+    for client in clients:
+        client.close()
+
+
+def _after_fork() -> None:
+    """Forget the parent's clients and let the registered objects rebind."""
+    global _lock, _pid
+    # The parent may have held the lock while forking; the child gets a fresh one
+    _lock = threading.Lock()
+    _pid = os.getpid()
+    _clients.clear()
+    _async_clients.clear()
+    _fork_hooks[:] = [ref for ref in _fork_hooks if ref() is not None]
+    for ref in list(_fork_hooks):
+        hook = ref()
+        if hook is not None:
+            hook()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,405 @@
+"""
+MongoDB query building blocks shared by the task repositories.
+
+This module keeps the sort order, index definitions and filter construction for
+task listings in one place so that every query issued by a repository has an
+index that covers it. It also maintains the per-user change counters that let
+listings be revalidated without querying the tasks.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING, DESCENDING, DeleteOne, UpdateOne
+from pymongo.collection import Collection
+
+from src.domain.pagination import SORT_FIELDS, decode_cursor, parse_sort
+from src.domain.queries import TaskQuery, parse_query_date
+
+# Equality filters go first so that every supported combination of filters is
+# a prefix of an index followed by the sort key (equality, sort, range). The
+# API scopes every listing to its caller, so each index starts with created_by;
+# indexes without it would never be used and would only slow down writes.
+_EQUALITY_PREFIXES = [
+    [("created_by", ASCENDING)],
+    [("created_by", ASCENDING), ("status", ASCENDING)]
+]
+
+TASK_INDEXES = [
+    prefix + [(field, DESCENDING), ("task_id", DESCENDING)]
+    for prefix in _EQUALITY_PREFIXES
+    for field in SORT_FIELDS
+]
+
+# Owner-scoped lookups by id are resolved from this index alone when the task
+# belongs to someone else, without fetching the document.
+TASK_INDEXES.append([("created_by", ASCENDING), ("task_id", ASCENDING)])
+
+# Names of the unscoped listing indexes earlier versions created, dropped so they stop costing writes
+OBSOLETE_TASK_INDEXES = [
+    f"{prefix}{field}_-1_task_id_-1" for prefix in ("", "status_1_") for field in SORT_FIELDS
+]
+
+TASK_PROJECTION = {"_id": 0}
+
+# Deletions are synced per user in deleted_at order; the single-field index on
+# deleted_at expires old tombstones. Tombstones are upserted by owner and task.
+TOMBSTONE_INDEXES = [
+    [("created_by", ASCENDING), ("deleted_at", ASCENDING), ("task_id", ASCENDING)],
+    [("created_by", ASCENDING), ("task_id", ASCENDING)],
+]
+
+
+def ensure_indexes(collection: Collection) -> None:
+    """
+    Create the indexes backing the task queries.
+
+    Index creation is idempotent, so calling this more than once is harmless.
+    Obsolete indexes left by earlier versions are dropped.
+
+    Args:
+        collection: The tasks collection
+    """
+    for keys in TASK_INDEXES:
+        collection.create_index(keys)
+    for name in set(OBSOLETE_TASK_INDEXES) & set(collection.index_information()):
+        collection.drop_index(name)
+
+
+def ensure_tombstone_indexes(collection: Collection, ttl_seconds: Optional[int] = None) -> None:
+    """
+    Create the indexes backing deletion syncs.
+
+    Args:
+        collection: The tombstones collection
+        ttl_seconds: Seconds after which tombstones are purged, or None to keep them
+    """
+    for keys in TOMBSTONE_INDEXES:
+        collection.create_index(keys)
+    if ttl_seconds is not None:
+        collection.create_index([("deleted_at", ASCENDING)], expireAfterSeconds=ttl_seconds)
+
+
+def change_filter(user_id: str, field: str, since: datetime, until: datetime) -> Dict[str, Any]:
+    """
+    Build the filter selecting a user's documents changed within a sync window.
+
+    Args:
+        user_id: The owner of the documents
+        field: The change timestamp field, updated_at or deleted_at
+        since: Exclusive lower bound
+        until: Inclusive upper bound
+
+    Returns:
+        MongoDB filter document
+    """
+    return {"created_by": user_id, field: {"$gt": since, "$lte": until}}
+
+
+def change_sort(field: str) -> List[Tuple[str, int]]:
+    """
+    Build the sort specification of a change listing, oldest first.
+
+    Args:
+        field: The change timestamp field, updated_at or deleted_at
+
+    Returns:
+        List of (field, direction) pairs ending with the task_id tie-breaker
+    """
+    return [(field, ASCENDING), ("task_id", ASCENDING)]
+
+
+def sort_spec(query: TaskQuery) -> List[Tuple[str, int]]:
+    """
+    Build the sort specification for a task query.
+
+    Args:
+        query: The task query
+
+    Returns:
+        List of (field, direction) pairs ending with the task_id tie-breaker
+    """
+    field, descending = query.sort_key
+    direction = DESCENDING if descending else ASCENDING
+    return [(field, direction), ("task_id", direction)]
+
+
+def keyset_filter(cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Build the filter selecting the tasks that sort after a cursor.
+
+    Args:
+        cursor: Cursor returned with the previous page, or None for the first page
+
+    Returns:
+        MongoDB filter document
+    """
+    if not cursor:
+        return {}
+
+    sort, value, task_id = decode_cursor(cursor)
+    field, descending = parse_sort(sort)
+    operator = "$lt" if descending else "$gt"
+    return {
+        "$or": [
+            {field: {operator: value}},
+            {field: value, "task_id": {operator: task_id}}
+        ]
+    }
+
+
+def task_filter(query: TaskQuery, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the filter document for a task query.
+
+    Args:
+        query: The task query
+        cursor: Optional cursor returned with the previous page
+
+    Returns:
+        MongoDB filter document
+    """
+    conditions = {}
+    if query.created_by is not None:
+        conditions["created_by"] = query.created_by
+    if query.status is not None:
+        conditions["status"] = query.status
+
+    for field, (lower, upper) in query.date_ranges().items():
+        bounds = {}
+        if lower is not None:
+            bounds["$gte"] = lower
+        if upper is not None:
+            bounds["$lt"] = upper
+        conditions[field] = bounds
+
+    keyset = keyset_filter(cursor)
+    if keyset:
+        conditions.update(keyset)
+    return conditions
+
+
+def find_owned_ids(collection: Collection, task_ids: Iterable[str], user_id: str) -> Set[str]:
+    """
+    Find which of the given tasks exist and belong to a user, in one round trip.
+
+    The query is covered by the (created_by, task_id) index.
+
+    Args:
+        collection: The tasks collection
+        task_ids: IDs of the tasks to look for
+        user_id: The user that must own the tasks
+
+    Returns:
+        IDs of the tasks found
+    """
+    documents = collection.find(
+        {"created_by": user_id, "task_id": {"$in": list(task_ids)}},
+        {"_id": 0, "task_id": 1}
+    )
+    return {document["task_id"] for document in documents}
+
+
+def update_owned(collection: Collection, updates: Dict[str, Dict[str, Any]], user_id: str,
+                 now: datetime) -> Set[str]:
+    """
+    Set fields of several of a user's tasks with one unordered bulk_write.
+
+    One covered query finds the tasks to update. When the write matches fewer
+    tasks than were found, some were deleted in between; they are looked up
+    again so that only tasks that still exist are reported as updated.
+
+    Args:
+        collection: The tasks collection
+        updates: Fields to set, keyed by task ID
+        user_id: The user that must own the tasks
+        now: The new updated_at of every updated task
+
+    Returns:
+        IDs of the tasks that were found and updated
+    """
+    found = find_owned_ids(collection, updates, user_id)
+    if not found:
+        return found
+    result = collection.bulk_write([
+        UpdateOne({"created_by": user_id, "task_id": task_id}, {"$set": {**updates[task_id], "updated_at": now}})
+        for task_id in found
+    ], ordered=False)
+    if result.matched_count < len(found):
+        found = find_owned_ids(collection, found, user_id)
+    return found
+
+
+def delete_owned(collection: Collection, task_ids: Iterable[str], user_id: str) -> Set[str]:
+    """
+    Delete several of a user's tasks with one unordered bulk_write.
+
+    One covered query finds the tasks to delete. A bulk result only counts
+    the deleted documents, so when the write deletes fewer tasks than were
+    found, another request deleted some of them in between and both report
+    those; tombstone_writes keeps their tombstones from being duplicated.
+    When the write deletes none, every task was deleted elsewhere and none is
+    reported.
+
+    Args:
+        collection: The tasks collection
+        task_ids: IDs of the tasks to delete
+        user_id: The user that must own the tasks
+
+    Returns:
+        IDs of the tasks that were found and are now deleted
+    """
+    found = find_owned_ids(collection, task_ids, user_id)
+    if not found:
+        return found
+    result = collection.bulk_write(delete_requests(found, user_id), ordered=False)
+    return found if result.deleted_count else set()
+
+
+def delete_requests(task_ids: Iterable[str], user_id: str) -> List[DeleteOne]:
+    """
+    Build the bulk_write requests that delete several of a user's tasks.
+
+    Args:
+        task_ids: IDs of the tasks to delete
+        user_id: The user that must own the tasks
+
+    Returns:
+        One DeleteOne per task, scoped to its owner
+    """
+    return [DeleteOne({"created_by": user_id, "task_id": task_id}) for task_id in task_ids]
+
+
+def tombstone_writes(task_ids: Iterable[str], user_id: Optional[str]) -> List[UpdateOne]:
+    """
+    Build the bulk_write requests that leave the tombstones of deleted tasks.
+
+    Each tombstone is upserted by owner and task ID with $setOnInsert, so a
+    batch delete and a single delete that race on the same task leave one
+    tombstone, stamped by whichever wrote first.
+
+    Args:
+        task_ids: IDs of the deleted tasks
+        user_id: The owner of the tasks
+
+    Returns:
+        One upserting UpdateOne per task
+    """
+    now = datetime.utcnow()
+    return [
+        UpdateOne({"created_by": user_id, "task_id": task_id}, {"$setOnInsert": {"deleted_at": now}}, upsert=True)
+        for task_id in task_ids
+    ]
+
+
+def bury(tombstones: Collection, task_ids: Iterable[str], user_id: Optional[str]) -> None:
+    """
+    Leave the tombstones of deleted tasks with one unordered bulk_write.
+
+    Args:
+        tombstones: The tombstones collection
+        task_ids: IDs of the deleted tasks
+        user_id: The owner of the tasks
+    """
+    tombstones.bulk_write(tombstone_writes(task_ids, user_id), ordered=False)
+
+
+def bump_version(versions: Collection, user_id: Optional[str]) -> None:
+    """
+    Increment the change counter of a user's tasks.
+
+    Must be called after the write it records, so that a reader never pairs a
+    new counter value with a listing read before the write.
+
+    Args:
+        versions: The collection holding one counter document per user
+        user_id: The owner of the task that changed, if known
+    """
+    if user_id is not None:
+        versions.update_one({"_id": user_id}, {"$inc": {"version": 1}}, upsert=True)
+
+
+def version_bumps(user_ids: Iterable[Optional[str]]) -> List[UpdateOne]:
+    """
+    Build the bulk_write requests that increment the change counters of several users.
+
+    Shared by the pymongo and Motor repositories, so both issue the same writes.
+
+    Args:
+        user_ids: The owners of the tasks that changed
+
+    Returns:
+        One upserting UpdateOne per distinct known owner
+    """
+    return [
+        UpdateOne({"_id": user_id}, {"$inc": {"version": 1}}, upsert=True)
+        for user_id in set(user_ids) if user_id is not None
+    ]
+
+
+def bump_versions(versions: Collection, user_ids: Iterable[Optional[str]]) -> None:
+    """
+    Increment the change counters of several users with one unordered bulk_write.
+
+    Bulk inserts touch many owners at once; one round trip for all of their
+    counters keeps the cost of a batch independent of how many users it spans.
+
+    Args:
+        versions: The collection holding one counter document per user
+        user_ids: The owners of the tasks that changed
+    """
+    requests = version_bumps(user_ids)
+    if requests:
+        versions.bulk_write(requests, ordered=False)
+
+
+def read_version(versions: Collection, user_id: str) -> int:
+    """
+    Read the change counter of a user's tasks by its _id, without touching the tasks.
+
+    Args:
+        versions: The collection holding one counter document per user
+        user_id: The owner of the tasks
+
+    Returns:
+        The number of writes recorded for the user, 0 if there were none
+    """
+    document = versions.find_one({"_id": user_id})
+    return document["version"] if document else 0
+
+
+# Tasks written before dates were stored as BSON dates, which range, cursor and
+# sync filters skip because MongoDB compares values of different types by type
+LEGACY_DATE_FILTER = {"$or": [{field: {"$type": "string"}} for field in SORT_FIELDS]}
+
+
+def backfill_dates(collection: Collection, batch_size: int = 1000) -> int:
+    """
+    Rewrite the ISO string dates of legacy task documents as BSON dates.
+
+    Each update only matches while the document still holds the string it was
+    read with, so a task changed in the meantime is left to its writer.
+    Running the backfill again once it has finished does nothing.
+
+    Args:
+        collection: The tasks collection
+        batch_size: Number of updates sent per unordered bulk_write
+
+    Returns:
+        The number of documents rewritten
+    """
+    rewritten = 0
+    requests = []
+    projection = {"_id": 1, **{field: 1 for field in SORT_FIELDS}}
+    for document in collection.find(LEGACY_DATE_FILTER, projection):
+        strings = {field: document[field] for field in SORT_FIELDS if isinstance(document.get(field), str)}
+        requests.append(UpdateOne(
+            {"_id": document["_id"], **strings},
+            {"$set": {field: parse_query_date(value) for field, value in strings.items()}}
+        ))
+        if len(requests) >= batch_size:
+            rewritten += collection.bulk_write(requests, ordered=False).modified_count
+            requests = []
+    if requests:
+        rewritten += collection.bulk_write(requests, ordered=False).modified_count
+    return rewritten
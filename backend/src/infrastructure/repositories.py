@@ -1,50 +1,218 @@
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Set
 
-from pymongo import MongoClient
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 from pymongo.collection import Collection
+from pymongo.cursor import Cursor
 from pymongo.database import Database
 
-from ..domain.interfaces import TaskRepository
-from ..domain.models import Task
+from ..domain.interfaces import TaskRepository, UserRepository
+from ..domain.models import Task, Tombstone
+from ..domain.pagination import DEFAULT_PAGE_SIZE
+from ..domain.queries import TaskQuery
+from .mongo_clients import get_client, on_fork
+from .mongo_queries import (
+    TASK_PROJECTION, bump_version, bump_versions, change_filter, change_sort, ensure_indexes,
+    bury, delete_owned, ensure_tombstone_indexes, read_version, sort_spec, task_filter, update_owned
+)
 
 class MongoTaskRepository(TaskRepository):
     """Implementación del repositorio de tareas usando MongoDB."""
     
-    def __init__(self, mongo_uri: str, db_name: str, collection_name: str):
-        """Inicializa el repositorio con la conexión a MongoDB."""
-        self.client = MongoClient(mongo_uri)
-        self.db: Database = self.client[db_name]
-        self.collection: Collection = self.db[collection_name]
+    def __init__(self, mongo_uri: str, db_name: str, collection_name: str,
+                 tombstone_retention: Optional[timedelta] = None):
+        """Inicializa el repositorio con la conexión a MongoDB y la retención de las lápidas."""
+        self.mongo_uri = mongo_uri
+        self.db_name = db_name
+        self.collection_name = collection_name
+        self.tombstone_retention = tombstone_retention
+        self._indexes_ready = False
+        self._connect()
+        on_fork(self._connect)
+    
+    def _connect(self) -> None:
+        """Toma las colecciones del cliente compartido del proceso; se repite tras un fork."""
+        self.client = get_client(self.mongo_uri)
+        self.db: Database = self.client[self.db_name]
+        self.collection: Collection = self.db[self.collection_name]
+        self.versions: Collection = self.db[f"{self.collection_name}_versions"]
+        self.tombstones: Collection = self.db[f"{self.collection_name}_tombstones"]
+    
+    def _ensure_indexes(self) -> None:
+        """Crea los índices de consulta la primera vez que se necesitan."""
+        if not self._indexes_ready:
+            ensure_indexes(self.collection)
+            ttl = int(self.tombstone_retention.total_seconds()) if self.tombstone_retention else None
+            ensure_tombstone_indexes(self.tombstones, ttl)
+            self._indexes_ready = True
+    
+    def _find(self, query: TaskQuery, cursor: Optional[str], limit: Optional[int]) -> Cursor:
+        """Construye el cursor de MongoDB para una consulta de tareas."""
+        self._ensure_indexes()
+        documents = self.collection.find(task_filter(query, cursor), TASK_PROJECTION).sort(sort_spec(query))
+        if limit:
+            documents = documents.limit(limit)
+        return documents
     
-    def get_all(self) -> List[Task]:
-        """Obtiene todas las tareas."""
-        tasks_data = list(self.collection.find())
-        return [Task.from_dict(task_data) for task_data in tasks_data]
+    def get_all(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                query: Optional[TaskQuery] = None) -> List[Task]:
+        """Obtiene las tareas filtradas y ordenadas según la consulta, paginadas por cursor."""
+        documents = self._find(query or TaskQuery(), cursor, limit)
+        return [Task.from_document(task_data) for task_data in documents]
+    
+    def get_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                         query: Optional[TaskQuery] = None) -> List[Task]:
+        """Obtiene las tareas creadas por un usuario que cumplen la consulta."""
+        query = (query or TaskQuery()).for_owner(user_id)
+        return self.get_all(limit=limit, cursor=cursor, query=query)
+    
+    def iter_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                          query: Optional[TaskQuery] = None,
+                          batch_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Task]:
+        """Recorre las tareas de un usuario con un único cursor de MongoDB leído por lotes."""
+        query = (query or TaskQuery()).for_owner(user_id)
+        documents = self._find(query, cursor, limit).batch_size(batch_size)
+        try:
+            for task_data in documents:
+                yield Task.from_document(task_data)
+        finally:
+            documents.close()
     
     def get_by_id(self, task_id: str) -> Optional[Task]:
         """Obtiene una tarea por su ID."""
-        task_data = self.collection.find_one({"id": task_id})
+        task_data = self.collection.find_one({"task_id": task_id})
         if task_data:
-            return Task.from_dict(task_data)
+            return Task.from_document(task_data)
         return None
     
+    def get_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """Obtiene una tarea por su ID si fue creada por el usuario."""
+        self._ensure_indexes()
+        task_data = self.collection.find_one({"created_by": user_id, "task_id": task_id}, TASK_PROJECTION)
+        if task_data:
+            return Task.from_document(task_data)
+        return None
+    
+    def get_changed_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Task]:
+        """Obtiene las tareas del usuario modificadas en la ventana, de la más antigua a la más reciente."""
+        self._ensure_indexes()
+        documents = self.collection.find(
+            change_filter(user_id, "updated_at", since, until), TASK_PROJECTION
+        ).sort(change_sort("updated_at"))
+        if limit:
+            documents = documents.limit(limit)
+        return [Task.from_document(task_data) for task_data in documents]
+    
+    def get_deleted_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Tombstone]:
+        """Obtiene las lápidas de las tareas del usuario borradas en la ventana, de la más antigua a la más reciente."""
+        self._ensure_indexes()
+        documents = self.tombstones.find(
+            change_filter(user_id, "deleted_at", since, until), {"_id": 0}
+        ).sort(change_sort("deleted_at"))
+        if limit:
+            documents = documents.limit(limit)
+        return [Tombstone.from_document(data) for data in documents]
+    
+    def get_version(self, user_id: str) -> Optional[int]:
+        """Obtiene el contador de cambios de las tareas de un usuario."""
+        return read_version(self.versions, user_id)
+    
     def save(self, task: Task) -> Task:
         """Guarda una tarea."""
         task_dict = task.to_dict()
         result = self.collection.insert_one(task_dict)
+        bump_version(self.versions, task.created_by)
         task_dict["_id"] = str(result.inserted_id)
         return Task.from_dict(task_dict)
     
+    def save_many(self, tasks: List[Task]) -> Dict[int, str]:
+        """Guarda varias tareas con un único insert_many no ordenado y devuelve los errores por posición."""
+        if not tasks:
+            return {}
+        errors = {}
+        try:
+            self.collection.insert_many([task.to_dict() for task in tasks], ordered=False)
+        except BulkWriteError as e:
+            errors = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+        bump_versions(self.versions, (task.created_by for index, task in enumerate(tasks) if index not in errors))
+        return errors
+    
     def update(self, task: Task) -> Task:
         """Actualiza una tarea."""
         task_dict = task.to_dict()
         self.collection.update_one(
-            {"id": task.id},
+            {"task_id": task.task_id},
             {"$set": task_dict}
         )
+        bump_version(self.versions, task.created_by)
         return task
     
+    def update_fields(self, task_id: str, fields: Dict[str, Any]) -> Optional[Task]:
+        """Actualiza solo los campos indicados y updated_at en una única operación atómica."""
+        task_data = self.collection.find_one_and_update(
+            {"task_id": task_id},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}},
+            projection=TASK_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if task_data:
+            bump_version(self.versions, task_data.get("created_by"))
+            return Task.from_document(task_data)
+        return None
+    
     def delete(self, task_id: str) -> bool:
-        """Elimina una tarea por su ID."""
-        result = self.collection.delete_one({"id": task_id})
-        return result.deleted_count > 0 
\ No newline at end of file
+        """Elimina una tarea por su ID dejando una lápida para la sincronización, y devuelve si existía."""
+        task_data = self.collection.find_one_and_delete({"task_id": task_id}, projection={"created_by": 1})
+        if task_data is None:
+            return False
+        self._ensure_indexes()
+        bury(self.tombstones, [task_id], task_data.get("created_by"))
+        bump_version(self.versions, task_data.get("created_by"))
+        return True
+    
+    def update_fields_many(self, updates: Dict[str, Dict[str, Any]], user_id: str) -> Set[str]:
+        """Actualiza varias tareas del usuario con un único bulk_write no ordenado y devuelve las que siguen existiendo."""
+        self._ensure_indexes()
+        found = update_owned(self.collection, updates, user_id, datetime.utcnow())
+        if found:
+            bump_version(self.versions, user_id)
+        return found
+    
+    def delete_many(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """Elimina varias tareas del usuario con un único bulk_write no ordenado, deja sus lápidas y las devuelve."""
+        self._ensure_indexes()
+        found = delete_owned(self.collection, task_ids, user_id)
+        if not found:
+            return found
+        bury(self.tombstones, found, user_id)
+        bump_version(self.versions, user_id)
+        return found
+
+
+class MongoUserRepository(UserRepository):
+    """Implementación del repositorio de usuarios usando MongoDB, compartido por todos los procesos."""
+    
+    def __init__(self, mongo_uri: str, db_name: str, collection_name: str = "users"):
+        """Inicializa el repositorio con la conexión a MongoDB."""
+        self.mongo_uri = mongo_uri
+        self.db_name = db_name
+        self.collection_name = collection_name
+        self._connect()
+        on_fork(self._connect)
+    
+    def _connect(self) -> None:
+        """Toma la colección del cliente compartido del proceso; se repite tras un fork."""
+        self.client = get_client(self.mongo_uri)
+        self.collection: Collection = self.client[self.db_name][self.collection_name]
+    
+    def get_password_hash(self, username: str) -> Optional[str]:
+        """Obtiene el hash de la contraseña de un usuario por su _id."""
+        document = self.collection.find_one({"_id": username}, {"password_hash": 1})
+        return document["password_hash"] if document else None
+    
+    def save(self, username: str, password_hash: str) -> None:
+        """Guarda el hash de la contraseña de un usuario, sustituyendo el anterior."""
+        self.collection.update_one({"_id": username}, {"$set": {"password_hash": password_hash}}, upsert=True)
@@ -0,0 +1,648 @@
+"""
+SQLite implementation of the task repository.
+
+This module provides the SqliteTaskRepository class, which stores tasks in a
+single SQLite database file for single-node deployments, where running a
+MongoDB server costs more than it saves. The schema mirrors the MongoDB
+indexes: for every combination of the created_by and status equality filters
+there is an index on (filters..., sort field, task_id), so listings, keyset
+pages and sync windows are index range scans that return rows already in
+order. The exception is a first page whose only date range is on the other
+date field: SQLite may then scan that field's index and sort the matches in
+a temporary B-tree, bounded by the page size. Dates are stored as integer
+microseconds since the epoch, which keeps the index keys small and compares
+exactly.
+
+Every thread gets its own connection, opened on first use and closed when
+the thread ends, because a SQLite connection must not be shared between
+threads. The database runs in WAL mode, so readers never block the single
+writer, and writes take the write lock up front with BEGIN IMMEDIATE. SQL
+text is built once per query shape and reused, so the sqlite3 statement
+cache serves every call after the first with an already prepared statement.
+
+SqliteUserRepository keeps the registered users in the same file, so every
+worker process of the node sees the same users.
+"""
+
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from src.domain.exceptions import DatabaseError
+from src.domain.interfaces import TaskRepository, UserRepository
+from src.domain.models import Task, Tombstone
+from src.domain.pagination import SORT_FIELDS, decode_cursor
+from src.domain.queries import TaskQuery
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+TASK_COLUMNS = ("task_id", "title", "description", "status", "created_at", "updated_at", "created_by")
+DATE_COLUMNS = ("created_at", "updated_at")
+
+# Equality filters go first so that every supported combination of filters is
+# a prefix of an index followed by the sort key, as in the MongoDB indexes;
+# listings are scoped to their owner, so every index starts with created_by
+EQUALITY_FIELDS: List[Tuple[str, ...]] = [("created_by",), ("created_by", "status")]
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS tasks (
+        task_id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL,
+        created_by TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS task_tombstones (
+        task_id TEXT NOT NULL,
+        created_by TEXT,
+        deleted_at INTEGER NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS task_versions (
+        user_id TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    ) WITHOUT ROWID""",
+    # Owner-scoped lookups by id and ownership checks are answered from this index alone
+    "CREATE INDEX IF NOT EXISTS tasks_owner_id ON tasks (created_by, task_id)",
+    # Deletions are synced per user in deleted_at order; the deleted_at index purges old tombstones
+    "CREATE INDEX IF NOT EXISTS task_tombstones_owner ON task_tombstones (created_by, deleted_at, task_id)",
+    "CREATE INDEX IF NOT EXISTS task_tombstones_deleted ON task_tombstones (deleted_at)",
+] + [
+    # Unscoped listing indexes of earlier versions, which only slowed down writes
+    f"DROP INDEX IF EXISTS tasks_{'_'.join(fields + (field,))}"
+    for fields in [(), ("status",)]
+    for field in SORT_FIELDS
+] + [
+    f"CREATE INDEX IF NOT EXISTS tasks_{'_'.join(fields + (field,))} "
+    f"ON tasks ({', '.join(fields + (field, 'task_id'))})"
+    for fields in EQUALITY_FIELDS
+    for field in SORT_FIELDS
+]
+
+USER_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        password_hash TEXT NOT NULL
+    ) WITHOUT ROWID""",
+]
+
+_SELECT = f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks"
+_INSERT = f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}) VALUES ({', '.join('?' * len(TASK_COLUMNS))})"
+_REPLACE = f"UPDATE tasks SET {', '.join(f'{column} = ?' for column in TASK_COLUMNS[1:])} WHERE task_id = ?"
+_BUMP_VERSION = (
+    "INSERT INTO task_versions (user_id, version) VALUES (?, 1) "
+    "ON CONFLICT (user_id) DO UPDATE SET version = version + 1"
+)
+
+
+def to_micros(value: datetime) -> int:
+    """Convert a naive UTC datetime to integer microseconds since the epoch."""
+    return (value - EPOCH) // MICROSECOND
+
+
+def from_micros(value: int) -> datetime:
+    """Convert integer microseconds since the epoch to a naive UTC datetime."""
+    return EPOCH + timedelta(microseconds=value)
+
+
+def _row(task: Task) -> Tuple[Any, ...]:
+    """Get the column values of a task in TASK_COLUMNS order."""
+    return (
+        task.task_id, task.title, task.description, task.status,
+        to_micros(task.created_at), to_micros(task.updated_at), task.created_by
+    )
+
+
+def _task(row: Tuple[Any, ...]) -> Task:
+    """Build a task from a row selected in TASK_COLUMNS order."""
+    task_id, title, description, status, created_at, updated_at, created_by = row
+    return Task.from_document({
+        "task_id": task_id,
+        "title": title,
+        "description": description,
+        "status": status,
+        "created_at": from_micros(created_at),
+        "updated_at": from_micros(updated_at),
+        "created_by": created_by
+    })
+
+
+class _ThreadConnection:
+    """The connection of one thread, kept in its thread-local storage so it is dropped with the thread."""
+
+    __slots__ = ("connection", "pid", "__weakref__")
+
+    def __init__(self, connection: sqlite3.Connection, pid: int):
+        self.connection = connection
+        self.pid = pid
+
+
+def _release(connections: Set[sqlite3.Connection], connection: sqlite3.Connection, pid: int) -> None:
+    """Close the connection of a thread that has ended, unless it was inherited through a fork."""
+    if os.getpid() != pid:
+        return
+    # No lock: this runs wherever the thread's storage is freed, possibly under the registry lock
+    connections.discard(connection)
+    connection.close()
+
+
+@lru_cache(maxsize=None)
+def listing_sql(equality: Tuple[str, ...], sort_field: str, descending: bool,
+                ranges: Tuple[Tuple[str, bool, bool], ...], keyset: bool, limited: bool) -> str:
+    """
+    Build the SQL of one listing shape.
+
+    The text only depends on which filters are present, never on their
+    values, so there are a bounded number of shapes and each one is prepared
+    once per connection. No index serves a range on one date field in the
+    order of the other, so without a keyset condition on the sort field such
+    a listing may be planned as a range scan followed by a temporary sort.
+
+    Args:
+        equality: The equality filters present, in index order
+        sort_field: The date field the listing is sorted by
+        descending: Whether the listing is newest first
+        ranges: (field, has lower bound, has upper bound) of each date range
+        keyset: Whether the listing continues after a cursor
+        limited: Whether the listing has a page size
+
+    Returns:
+        SELECT statement taking the filter values as positional parameters
+    """
+    conditions = [f"{field} = ?" for field in equality]
+    for field, lower, upper in ranges:
+        if lower:
+            conditions.append(f"{field} >= ?")
+        if upper:
+            conditions.append(f"{field} < ?")
+    if keyset:
+        conditions.append(f"({sort_field}, task_id) {'<' if descending else '>'} (?, ?)")
+
+    direction = "DESC" if descending else "ASC"
+    sql = _SELECT
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += f" ORDER BY {sort_field} {direction}, task_id {direction}"
+    if limited:
+        sql += " LIMIT ?"
+    return sql
+
+
+class SqliteDatabase:
+    """
+    Per-thread connections to one SQLite database file.
+
+    Safe to share between threads: each thread uses its own connection to the
+    file, which is closed once the thread has ended. Connections opened before
+    a fork are never used by the child, which opens its own.
+    """
+
+    def __init__(self, path: str, schema: List[str], busy_timeout_ms: int = 5000, cached_statements: int = 128):
+        """
+        Open the database and create its schema if it does not exist.
+
+        Args:
+            path: Path of the database file
+            schema: Statements that create the tables and indexes, run in one transaction
+            busy_timeout_ms: How long a write waits for another connection's write lock
+            cached_statements: Number of prepared statements each connection keeps
+        """
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections: Set[sqlite3.Connection] = set()
+        self._connections_lock = threading.Lock()
+        self._pid = os.getpid()
+        with self._transaction() as connection:
+            for statement in schema:
+                connection.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it on first use in this process."""
+        pid = os.getpid()
+        holder = getattr(self._local, "holder", None)
+        if holder is None or holder.pid != pid:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout_ms / 1000,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=self.cached_statements
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            # In WAL mode NORMAL only syncs at checkpoints and stays consistent after a crash
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            with self._connections_lock:
+                if self._pid != pid:
+                    # Connections inherited through a fork belong to the parent
+                    self._connections, self._pid = set(), pid
+                self._connections.add(connection)
+            holder = _ThreadConnection(connection, pid)
+            weakref.finalize(holder, _release, self._connections, connection, pid)
+            self._local.holder = holder
+        return holder.connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block of writes in one transaction that holds the write lock from the start."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close every connection opened by this process; threads reopen theirs on next use."""
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+class SqliteTaskRepository(SqliteDatabase, TaskRepository):
+    """SQLite implementation of the task repository."""
+
+    def __init__(self, path: str, tombstone_retention: Optional[timedelta] = None,
+                 busy_timeout_ms: int = 5000, cached_statements: int = 128):
+        """
+        Initialize the repository and create the schema if it does not exist.
+
+        Args:
+            path: Path of the database file
+            tombstone_retention: How long tombstones of deleted tasks are kept, or None to keep them
+            busy_timeout_ms: How long a write waits for another connection's write lock
+            cached_statements: Number of prepared statements each connection keeps
+        """
+        self.tombstone_retention = tombstone_retention
+        super().__init__(path, SCHEMA, busy_timeout_ms, cached_statements)
+
+    def _select(self, sql: str, parameters: Tuple[Any, ...]) -> List[Task]:
+        """Run a task SELECT and build the tasks."""
+        return [_task(row) for row in self._connection().execute(sql, parameters)]
+
+    @staticmethod
+    def _bury(connection: sqlite3.Connection, task_id: str, user_id: Optional[str], now: int) -> None:
+        """Leave the tombstone of a deleted task within the current transaction."""
+        connection.execute(
+            "INSERT INTO task_tombstones (created_by, deleted_at, task_id) VALUES (?, ?, ?)",
+            (user_id, now, task_id)
+        )
+
+    def _purge_tombstones(self, connection: sqlite3.Connection, now: int) -> None:
+        """Drop tombstones past the retention, once per transaction that leaves tombstones."""
+        if self.tombstone_retention is not None:
+            connection.execute(
+                "DELETE FROM task_tombstones WHERE deleted_at < ?",
+                (now - self.tombstone_retention // MICROSECOND,)
+            )
+
+    @staticmethod
+    def _bump_version(connection: sqlite3.Connection, user_id: Optional[str]) -> None:
+        """Increment the change counter of a user's tasks within the current transaction."""
+        if user_id is not None:
+            connection.execute(_BUMP_VERSION, (user_id,))
+
+    @staticmethod
+    def _set_clause(fields: Dict[str, Any]) -> Tuple[str, Tuple[Any, ...]]:
+        """
+        Build the SET clause writing some task fields and their updated_at.
+
+        Raises:
+            DatabaseError: If a field is not a task column
+        """
+        unknown = set(fields) - set(TASK_COLUMNS[1:])
+        if unknown:
+            raise DatabaseError(f"Unknown task fields: {', '.join(sorted(unknown))}")
+        names = sorted(name for name in fields if name != "updated_at")
+        values = [to_micros(fields[name]) if name in DATE_COLUMNS else fields[name] for name in names]
+        clause = ", ".join(f"{name} = ?" for name in names + ["updated_at"])
+        return clause, tuple(values) + (to_micros(datetime.utcnow()),)
+
+    def get_all(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                query: Optional[TaskQuery] = None) -> List[Task]:
+        """
+        Get tasks matching a query in its sort order.
+
+        Args:
+            limit: Optional maximum number of tasks to return
+            cursor: Optional cursor returned with the previous page
+            query: Optional filters and sort order, newest update first by default
+
+        Returns:
+            List of Task objects
+        """
+        query = query or TaskQuery()
+        equality = tuple(field for field in ("created_by", "status") if getattr(query, field) is not None)
+        field, descending = query.sort_key
+        parameters: List[Any] = [getattr(query, name) for name in equality]
+
+        ranges = []
+        for name, (lower, upper) in query.date_ranges().items():
+            ranges.append((name, lower is not None, upper is not None))
+            parameters.extend(to_micros(bound) for bound in (lower, upper) if bound is not None)
+        if cursor:
+            _, value, task_id = decode_cursor(cursor)
+            parameters.extend((to_micros(value), task_id))
+        if limit:
+            parameters.append(limit)
+
+        sql = listing_sql(equality, field, descending, tuple(ranges), bool(cursor), bool(limit))
+        return self._select(sql, tuple(parameters))
+
+    def get_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                         query: Optional[TaskQuery] = None) -> List[Task]:
+        """
+        Get the tasks created by a user that match a query.
+
+        Args:
+            user_id: The ID of the user that owns the tasks
+            limit: Optional maximum number of tasks to return
+            cursor: Optional cursor returned with the previous page
+            query: Optional filters and sort order; its created_by is replaced by user_id
+
+        Returns:
+            List of Task objects
+        """
+        return self.get_all(limit=limit, cursor=cursor, query=(query or TaskQuery()).for_owner(user_id))
+
+    def get_by_id(self, task_id: str) -> Optional[Task]:
+        """
+        Get a task by its ID.
+
+        Args:
+            task_id: The ID of the task to retrieve
+
+        Returns:
+            Task object if found, None otherwise
+        """
+        tasks = self._select(f"{_SELECT} WHERE task_id = ?", (task_id,))
+        return tasks[0] if tasks else None
+
+    def get_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """
+        Get a task by its ID if it was created by the user.
+
+        Args:
+            task_id: The ID of the task to retrieve
+            user_id: The ID of the user that must own the task
+
+        Returns:
+            Task object if found and owned by the user, None otherwise
+        """
+        tasks = self._select(f"{_SELECT} WHERE created_by = ? AND task_id = ?", (user_id, task_id))
+        return tasks[0] if tasks else None
+
+    def get_changed_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Task]:
+        """
+        Get the user's tasks updated within a sync window, oldest first.
+
+        Args:
+            user_id: The owner of the tasks
+            since: Exclusive lower bound on updated_at
+            until: Inclusive upper bound on updated_at
+            limit: Optional maximum number of tasks to return
+
+        Returns:
+            List of Task objects ordered by updated_at and task_id
+        """
+        return self._select(
+            f"{_SELECT} WHERE created_by = ? AND updated_at > ? AND updated_at <= ? "
+            "ORDER BY updated_at, task_id LIMIT ?",
+            (user_id, to_micros(since), to_micros(until), limit or -1)
+        )
+
+    def get_deleted_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Tombstone]:
+        """
+        Get the tombstones of the user's tasks deleted within a sync window, oldest first.
+
+        Args:
+            user_id: The owner of the deleted tasks
+            since: Exclusive lower bound on deleted_at
+            until: Inclusive upper bound on deleted_at
+            limit: Optional maximum number of tombstones to return
+
+        Returns:
+            List of Tombstone objects ordered by deleted_at and task_id
+        """
+        rows = self._connection().execute(
+            "SELECT task_id, deleted_at FROM task_tombstones "
+            "WHERE created_by = ? AND deleted_at > ? AND deleted_at <= ? "
+            "ORDER BY deleted_at, task_id LIMIT ?",
+            (user_id, to_micros(since), to_micros(until), limit or -1)
+        )
+        return [Tombstone(task_id, user_id, from_micros(deleted_at)) for task_id, deleted_at in rows]
+
+    def get_version(self, user_id: str) -> Optional[int]:
+        """
+        Get the change counter of a user's tasks.
+
+        Args:
+            user_id: The owner of the tasks
+
+        Returns:
+            The number of writes recorded for the user's tasks, 0 if there were none
+        """
+        row = self._connection().execute(
+            "SELECT version FROM task_versions WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def save(self, task: Task) -> Task:
+        """
+        Save a new task.
+
+        Args:
+            task: The Task object to save
+
+        Returns:
+            The saved Task object
+
+        Raises:
+            DatabaseError: If a task with the same ID already exists
+        """
+        try:
+            with self._transaction() as connection:
+                connection.execute(_INSERT, _row(task))
+                self._bump_version(connection, task.created_by)
+        except sqlite3.IntegrityError:
+            raise DatabaseError(f"Task with id {task.task_id} already exists")
+        return task
+
+    def save_many(self, tasks: List[Task]) -> Dict[int, str]:
+        """
+        Save several new tasks in one transaction, continuing past duplicates.
+
+        Args:
+            tasks: The Task objects to save
+
+        Returns:
+            Error message of each task that was not saved, keyed by its position
+        """
+        errors = {}
+        owners = set()
+        with self._transaction() as connection:
+            for index, task in enumerate(tasks):
+                try:
+                    connection.execute(_INSERT, _row(task))
+                except sqlite3.IntegrityError:
+                    errors[index] = f"Task with id {task.task_id} already exists"
+                else:
+                    owners.add(task.created_by)
+            for user_id in owners:
+                self._bump_version(connection, user_id)
+        return errors
+
+    def update(self, task: Task) -> Task:
+        """
+        Replace the stored fields of an existing task.
+
+        Args:
+            task: The Task object with updated fields
+
+        Returns:
+            The updated Task object
+        """
+        task_id, *values = _row(task)
+        with self._transaction() as connection:
+            if connection.execute(_REPLACE, (*values, task_id)).rowcount:
+                self._bump_version(connection, task.created_by)
+        return task
+
+    def update_fields(self, task_id: str, fields: Dict[str, Any]) -> Optional[Task]:
+        """
+        Set some fields of a task and its updated_at, and return the updated task.
+
+        Args:
+            task_id: The ID of the task to update
+            fields: Mapping of field names to their new values
+
+        Returns:
+            The updated Task object if found, None otherwise
+
+        Raises:
+            DatabaseError: If a field is not a task column
+        """
+        clause, values = self._set_clause(fields)
+        with self._transaction() as connection:
+            if not connection.execute(f"UPDATE tasks SET {clause} WHERE task_id = ?", values + (task_id,)).rowcount:
+                return None
+            row = connection.execute(f"{_SELECT} WHERE task_id = ?", (task_id,)).fetchone()
+            self._bump_version(connection, row[-1])
+        return _task(row)
+
+    def update_fields_many(self, updates: Dict[str, Dict[str, Any]], user_id: str) -> Set[str]:
+        """
+        Set fields of several of a user's tasks in one transaction.
+
+        Args:
+            updates: Fields to set, keyed by task ID
+            user_id: The ID of the user that must own the tasks
+
+        Returns:
+            IDs of the tasks that were found and updated
+        """
+        statements = {task_id: self._set_clause(fields) for task_id, fields in updates.items()}
+        found = set()
+        with self._transaction() as connection:
+            for task_id, (clause, values) in statements.items():
+                cursor = connection.execute(
+                    f"UPDATE tasks SET {clause} WHERE created_by = ? AND task_id = ?",
+                    values + (user_id, task_id)
+                )
+                if cursor.rowcount:
+                    found.add(task_id)
+            if found:
+                self._bump_version(connection, user_id)
+        return found
+
+    def delete(self, task_id: str) -> bool:
+        """
+        Delete a task, leaving a tombstone so that clients can sync the deletion.
+
+        Args:
+            task_id: The ID of the task to delete
+
+        Returns:
+            True if the task was deleted, False otherwise
+        """
+        with self._transaction() as connection:
+            row = connection.execute("SELECT created_by FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None:
+                return False
+            connection.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+            now = to_micros(datetime.utcnow())
+            self._bury(connection, task_id, row[0], now)
+            self._purge_tombstones(connection, now)
+            self._bump_version(connection, row[0])
+        return True
+
+    def delete_many(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """
+        Delete several of a user's tasks in one transaction, leaving tombstones.
+
+        Args:
+            task_ids: IDs of the tasks to delete
+            user_id: The ID of the user that must own the tasks
+
+        Returns:
+            IDs of the tasks that were found and deleted
+        """
+        now = to_micros(datetime.utcnow())
+        found = set()
+        with self._transaction() as connection:
+            for task_id in dict.fromkeys(task_ids):
+                if connection.execute(
+                    "DELETE FROM tasks WHERE created_by = ? AND task_id = ?", (user_id, task_id)
+                ).rowcount:
+                    self._bury(connection, task_id, user_id, now)
+                    found.add(task_id)
+            if found:
+                self._purge_tombstones(connection, now)
+                self._bump_version(connection, user_id)
+        return found
+
+
+class SqliteUserRepository(SqliteDatabase, UserRepository):
+    """SQLite implementation of the user repository, in the same database file as the tasks."""
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        """
+        Initialize the repository and create the users table if it does not exist.
+
+        Args:
+            path: Path of the database file
+            busy_timeout_ms: How long a write waits for another connection's write lock
+        """
+        super().__init__(path, USER_SCHEMA, busy_timeout_ms, cached_statements=8)
+
+    def get_password_hash(self, username: str) -> Optional[str]:
+        """Get the stored password hash of a user, or None if the user is not registered."""
+        row = self._connection().execute(
+            "SELECT password_hash FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self, username: str, password_hash: str) -> None:
+        """Store the password hash of a user, replacing any previous one."""
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO users (username, password_hash) VALUES (?, ?) "
+                "ON CONFLICT (username) DO UPDATE SET password_hash = excluded.password_hash",
+                (username, password_hash)
+            )
@@ -5,11 +5,21 @@ This module provides the MongoTaskRepository class which implements the TaskRepo
 interface using MongoDB as the storage backend.
 """
 
-from typing import List, Optional
-from pymongo import MongoClient
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Set
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from pymongo.cursor import Cursor
 from src.domain.interfaces import TaskRepository
-from src.domain.models import Task
-from src.config import MONGO_URI, DB_NAME
+from src.domain.models import Task, Tombstone
+from src.domain.pagination import DEFAULT_PAGE_SIZE
+from src.domain.queries import TaskQuery
+from src.config import MONGO_URI, DB_NAME, TASK_TOMBSTONE_RETENTION_DAYS
+from src.infrastructure.mongo_clients import get_client, on_fork
+from src.infrastructure.mongo_queries import (
+    TASK_PROJECTION, bump_version, bump_versions, change_filter, change_sort, ensure_indexes,
+    bury, delete_owned, ensure_tombstone_indexes, read_version, sort_spec, task_filter, update_owned
+)
 
 class MongoTaskRepository(TaskRepository):
     """
@@ -21,21 +31,91 @@ class MongoTaskRepository(TaskRepository):
     
     def __init__(self):
         """Initialize the MongoDB task repository."""
-        self.client = MongoClient(MONGO_URI)
+        self._indexes_ready = False
+        self._connect()
+        on_fork(self._connect)
+    
+    def _connect(self) -> None:
+        """Bind the collections to the process's shared client; called again after a fork."""
+        self.client = get_client(MONGO_URI)
         self.db = self.client[DB_NAME]
         self.collection = self.db.tasks
+        self.versions = self.db.tasks_versions
+        self.tombstones = self.db.tasks_tombstones
+    
+    def _ensure_indexes(self) -> None:
+        """Create the query indexes the first time they are needed."""
+        if not self._indexes_ready:
+            ensure_indexes(self.collection)
+            ttl = int(timedelta(days=TASK_TOMBSTONE_RETENTION_DAYS).total_seconds()) \
+                if TASK_TOMBSTONE_RETENTION_DAYS > 0 else None
+            ensure_tombstone_indexes(self.tombstones, ttl)
+            self._indexes_ready = True
+    
+    def _find(self, query: TaskQuery, cursor: Optional[str], limit: Optional[int]) -> Cursor:
+        """Build the MongoDB cursor for a task query."""
+        self._ensure_indexes()
+        documents = self.collection.find(task_filter(query, cursor), TASK_PROJECTION).sort(sort_spec(query))
+        if limit:
+            documents = documents.limit(limit)
+        return documents
     
-    def get_all(self) -> List[Task]:
+    def get_all(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                query: Optional[TaskQuery] = None) -> List[Task]:
         """
-        Get all tasks from the database.
+        Get tasks matching a query in its sort order.
         
+        Args:
+            limit: Optional maximum number of tasks to return
+            cursor: Optional cursor returned with the previous page
+            query: Optional filters and sort order, newest update first by default
+            
         Returns:
             List of Task objects
         """
-        tasks = []
-        for doc in self.collection.find():
-            tasks.append(Task.from_dict(doc))
-        return tasks
+        documents = self._find(query or TaskQuery(), cursor, limit)
+        return [Task.from_document(doc) for doc in documents]
+    
+    def get_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                         query: Optional[TaskQuery] = None) -> List[Task]:
+        """
+        Get the tasks created by a user that match a query.
+        
+        Args:
+            user_id: The ID of the user that owns the tasks
+            limit: Optional maximum number of tasks to return
+            cursor: Optional cursor returned with the previous page
+            query: Optional filters and sort order; its created_by is replaced by user_id
+            
+        Returns:
+            List of Task objects
+        """
+        query = (query or TaskQuery()).for_owner(user_id)
+        return self.get_all(limit=limit, cursor=cursor, query=query)
+    
+    def iter_all_for_user(self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                          query: Optional[TaskQuery] = None,
+                          batch_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Task]:
+        """
+        Iterate the tasks created by a user over a single batched MongoDB cursor.
+        
+        Args:
+            user_id: The ID of the user that owns the tasks
+            limit: Optional maximum number of tasks to yield
+            cursor: Optional cursor to resume after
+            query: Optional filters and sort order; its created_by is replaced by user_id
+            batch_size: Number of documents fetched per round trip
+            
+        Returns:
+            Iterator of Task objects
+        """
+        query = (query or TaskQuery()).for_owner(user_id)
+        documents = self._find(query, cursor, limit).batch_size(batch_size)
+        try:
+            for doc in documents:
+                yield Task.from_document(doc)
+        finally:
+            documents.close()
     
     def get_by_id(self, task_id: str) -> Optional[Task]:
         """
@@ -48,7 +128,78 @@ class MongoTaskRepository(TaskRepository):
             Task object if found, None otherwise
         """
         doc = self.collection.find_one({"task_id": task_id})
-        return Task.from_dict(doc) if doc else None
+        return Task.from_document(doc) if doc else None
+    
+    def get_by_id_for_user(self, task_id: str, user_id: str) -> Optional[Task]:
+        """
+        Get a task by its ID if it was created by the user.
+        
+        Args:
+            task_id: The ID of the task to retrieve
+            user_id: The ID of the user that must own the task
+            
+        Returns:
+            Task object if found and owned by the user, None otherwise
+        """
+        self._ensure_indexes()
+        doc = self.collection.find_one({"created_by": user_id, "task_id": task_id}, TASK_PROJECTION)
+        return Task.from_document(doc) if doc else None
+    
+    def get_changed_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Task]:
+        """
+        Get the user's tasks updated within a sync window, oldest first.
+        
+        Args:
+            user_id: The owner of the tasks
+            since: Exclusive lower bound on updated_at
+            until: Inclusive upper bound on updated_at
+            limit: Optional maximum number of tasks to return
+            
+        Returns:
+            List of Task objects ordered by updated_at and task_id
+        """
+        self._ensure_indexes()
+        documents = self.collection.find(
+            change_filter(user_id, "updated_at", since, until), TASK_PROJECTION
+        ).sort(change_sort("updated_at"))
+        if limit:
+            documents = documents.limit(limit)
+        return [Task.from_document(doc) for doc in documents]
+    
+    def get_deleted_for_user(self, user_id: str, since: datetime, until: datetime,
+                             limit: Optional[int] = None) -> List[Tombstone]:
+        """
+        Get the tombstones of the user's tasks deleted within a sync window, oldest first.
+        
+        Args:
+            user_id: The owner of the deleted tasks
+            since: Exclusive lower bound on deleted_at
+            until: Inclusive upper bound on deleted_at
+            limit: Optional maximum number of tombstones to return
+            
+        Returns:
+            List of Tombstone objects ordered by deleted_at and task_id
+        """
+        self._ensure_indexes()
+        documents = self.tombstones.find(
+            change_filter(user_id, "deleted_at", since, until), {"_id": 0}
+        ).sort(change_sort("deleted_at"))
+        if limit:
+            documents = documents.limit(limit)
+        return [Tombstone.from_document(doc) for doc in documents]
+    
+    def get_version(self, user_id: str) -> Optional[int]:
+        """
+        Get the change counter of a user's tasks.
+        
+        Args:
+            user_id: The owner of the tasks
+            
+        Returns:
+            The number of writes recorded for the user's tasks
+        """
+        return read_version(self.versions, user_id)
     
     def save(self, task: Task) -> Task:
         """
@@ -61,8 +212,31 @@ class MongoTaskRepository(TaskRepository):
             The saved Task object
         """
         self.collection.insert_one(task.to_dict())
+        bump_version(self.versions, task.created_by)
         return task
     
+    def save_many(self, tasks: List[Task]) -> Dict[int, str]:
+        """
+        Save several new tasks with a single unordered insert_many.
+        
+        Tasks that fail to insert do not stop the others.
+        
+        Args:
+            tasks: The Task objects to save
+            
+        Returns:
+            Error message of each task that was not saved, keyed by its position
+        """
+        if not tasks:
+            return {}
+        errors = {}
+        try:
+            self.collection.insert_many([task.to_dict() for task in tasks], ordered=False)
+        except BulkWriteError as e:
+            errors = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+        bump_versions(self.versions, (task.created_by for index, task in enumerate(tasks) if index not in errors))
+        return errors
+    
     def update(self, task: Task) -> Task:
         """
         Update an existing task in the database.
@@ -77,11 +251,37 @@ class MongoTaskRepository(TaskRepository):
             {"task_id": task.task_id},
             {"$set": task.to_dict()}
         )
+        bump_version(self.versions, task.created_by)
         return task
     
+    def update_fields(self, task_id: str, fields: Dict[str, Any]) -> Optional[Task]:
+        """
+        Atomically set some fields of a task and return the updated task.
+        
+        Only the given fields and updated_at are written, in a single
+        find_one_and_update round trip.
+        
+        Args:
+            task_id: The ID of the task to update
+            fields: Mapping of field names to their new values
+            
+        Returns:
+            The updated Task object if found, None otherwise
+        """
+        doc = self.collection.find_one_and_update(
+            {"task_id": task_id},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}},
+            projection=TASK_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if not doc:
+            return None
+        bump_version(self.versions, doc.get("created_by"))
+        return Task.from_document(doc)
+    
     def delete(self, task_id: str) -> bool:
         """
-        Delete a task from the database.
+        Delete a task from the database, leaving a tombstone so that clients can sync the deletion.
         
         Args:
             task_id: The ID of the task to delete
@@ -89,5 +289,54 @@ class MongoTaskRepository(TaskRepository):
         Returns:
             True if the task was deleted, False otherwise
         """
-        result = self.collection.delete_one({"task_id": task_id})
-        return result.deleted_count > 0 
\ No newline at end of file
+        doc = self.collection.find_one_and_delete({"task_id": task_id}, projection={"created_by": 1})
+        if doc is None:
+            return False
+        self._ensure_indexes()
+        bury(self.tombstones, [task_id], doc.get("created_by"))
+        bump_version(self.versions, doc.get("created_by"))
+        return True
+    
+    def update_fields_many(self, updates: Dict[str, Dict[str, Any]], user_id: str) -> Set[str]:
+        """
+        Set fields of several of a user's tasks with a single unordered bulk_write.
+        
+        One query finds which tasks exist and belong to the user, so that the
+        result can be reported per task; every update also sets updated_at.
+        Tasks deleted before the write reached them are not reported.
+        
+        Args:
+            updates: Fields to set, keyed by task ID
+            user_id: The ID of the user that must own the tasks
+            
+        Returns:
+            IDs of the tasks that were found and updated
+        """
+        self._ensure_indexes()
+        found = update_owned(self.collection, updates, user_id, datetime.utcnow())
+        if found:
+            bump_version(self.versions, user_id)
+        return found
+    
+    def delete_many(self, task_ids: List[str], user_id: str) -> Set[str]:
+        """
+        Delete several of a user's tasks with a single unordered bulk_write, leaving tombstones.
+        
+        One query finds which tasks exist and belong to the user. The
+        tombstones are upserted with one more bulk_write, so a task that a
+        concurrent request also deleted keeps a single tombstone.
+        
+        Args:
+            task_ids: IDs of the tasks to delete
+            user_id: The ID of the user that must own the tasks
+            
+        Returns:
+            IDs of the tasks that were found and deleted
+        """
+        self._ensure_indexes()
+        found = delete_owned(self.collection, task_ids, user_id)
+        if not found:
+            return found
+        bury(self.tombstones, found, user_id)
+        bump_version(self.versions, user_id)
+        return found
@@ -0,0 +1,38 @@
+"""
+One-off backfill of the task dates stored by earlier versions.
+
+Tasks used to be stored with created_at and updated_at as ISO strings; they
+are now BSON dates. MongoDB compares values of different types by type, so
+the date range, cursor and sync filters never match the string dates, and
+those tasks drop out of filtered listings and delta syncs. Reads parse the
+strings, but only this backfill makes the tasks visible to those filters
+again. It can run while the API serves requests and can be run again safely.
+
+Usage (from the backend directory):
+    python -m src.migrate_dates [--batch-size N]
+"""
+
+import argparse
+import time
+
+from src.config import DB_NAME, MONGO_URI, TASK_STORAGE
+
+
+def main() -> None:
+    from src.infrastructure.mongo_clients import get_client
+    from src.infrastructure.mongo_queries import backfill_dates
+
+    parser = argparse.ArgumentParser(description="Rewrite legacy ISO string task dates as BSON dates")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    if TASK_STORAGE != "mongo":
+        parser.error("Only MongoDB holds tasks written by earlier versions")
+
+    started = time.perf_counter()
+    collection = get_client(MONGO_URI)[DB_NAME]["tasks"]
+    rewritten = backfill_dates(collection, args.batch_size)
+    print(f"Rewrote the dates of {rewritten:,} tasks in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Synthetic dataset seeder for load testing.
+
+Fills the configured task storage (TASK_STORAGE) with realistic tasks without
+going through the API: a skewed status mix, many owners of very different
+sizes, and creation and update dates spread over a period. Tasks are built
+from a seeded random generator, one generator per batch keyed by the seed and
+the batch's position, so the same arguments produce the same tasks no matter
+how the batches are spread over the worker processes.
+
+Each worker process builds its own repository through the handlers, as a
+forked server worker does, and writes every batch with the repository's
+save_many, which MongoDB runs as one unordered insert_many. Progress and the
+final insertion rate are reported on stdout. SQLite has a single writer, so
+with it extra workers only overlap building tasks with writing them.
+
+Usage (from the backend directory):
+    python -m src.seed --count 10000000 [--workers N] [--batch-size N] [--users N] [--days N] [--seed N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
+from typing import Iterator, List, Optional, Tuple
+
+from src.domain.models import Task
+
+STATUSES = ["completed", "pending", "in_progress"]
+STATUS_WEIGHTS = [60, 30, 10]
+
+# Owners follow Zipf's law: a few users own a large share of the tasks
+OWNER_SKEW = 1.1
+
+# Mean delay between creating a task and its last update, for tasks that were updated
+MEAN_UPDATE_DELAY_SECONDS = 3 * 86400
+
+# Share of pending tasks that were never updated after being created
+UNTOUCHED_PENDING_RATIO = 0.7
+
+VERBS = ["Review", "Write", "Fix", "Plan", "Update", "Test", "Deploy", "Document", "Prepare", "Check"]
+NOUNS = ["report", "release", "invoice", "meeting notes", "login page", "budget", "roadmap", "backups", "API docs", "tests"]
+
+# One batch of work: (seed, first task number, number of tasks, users, until, days)
+Batch = Tuple[int, int, int, int, datetime, int]
+
+_repository = None
+
+
+@lru_cache(maxsize=8)
+def owner_weights(users: int) -> List[float]:
+    """Cumulative Zipf weights of the owners, heaviest first."""
+    return list(accumulate(1 / (rank + 1) ** OWNER_SKEW for rank in range(users)))
+
+
+def build_tasks(seed: int, start: int, count: int, users: int, until: datetime, days: int) -> List[Task]:
+    """
+    Build one batch of synthetic tasks.
+
+    Args:
+        seed: Seed of the whole dataset
+        start: Number of the first task of the batch
+        count: Number of tasks to build
+        users: Number of distinct owners, named user-0 (the largest) to user-<users - 1>
+        until: Latest creation and update date
+        days: Number of days before ``until`` over which creation dates are spread
+
+    Returns:
+        List of Task objects, identical for identical arguments
+    """
+    rng = random.Random(f"{seed}:{start}")
+    span = days * 86400
+    owners = rng.choices(range(users), cum_weights=owner_weights(users), k=count)
+    statuses = rng.choices(STATUSES, weights=STATUS_WEIGHTS, k=count)
+
+    tasks = []
+    for owner, status in zip(owners, statuses):
+        age = rng.random() * span
+        created_at = until - timedelta(seconds=age)
+        if status == "pending" and rng.random() < UNTOUCHED_PENDING_RATIO:
+            updated_at = created_at
+        else:
+            updated_at = created_at + timedelta(seconds=min(age, rng.expovariate(1 / MEAN_UPDATE_DELAY_SECONDS)))
+        tasks.append(Task(
+            task_id=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            title=f"{rng.choice(VERBS)} {rng.choice(NOUNS)}",
+            description=f"{rng.choice(VERBS)} the {rng.choice(NOUNS)} " * rng.randrange(4),
+            status=status,
+            created_at=created_at,
+            updated_at=updated_at,
+            created_by=f"user-{owner}"
+        ))
+    return tasks
+
+
+def _start_worker() -> None:
+    """Build the worker's own repository, forgetting any inherited from the parent."""
+    global _repository
+    from src.api import handlers
+
+    handlers.reset_singletons()
+    _repository = handlers.get_task_repository()
+
+
+def _insert(batch: Batch) -> Tuple[int, int]:
+    """Build and save one batch, returning the number of tasks saved and failed."""
+    tasks = build_tasks(*batch)
+    errors = _repository.save_many(tasks)
+    return len(tasks) - len(errors), len(errors)
+
+
+def seed_tasks(count: int, workers: int = 1, batch_size: int = 10000, users: int = 10000, days: int = 365,
+               seed: int = 0, until: Optional[datetime] = None) -> Iterator[Tuple[int, int]]:
+    """
+    Insert synthetic tasks into the configured storage.
+
+    Args:
+        count: Number of tasks to insert
+        workers: Number of worker processes, or 1 to insert from this process
+        batch_size: Number of tasks per save_many call
+        users: Number of distinct owners
+        days: Number of days over which creation dates are spread
+        seed: Seed of the dataset
+        until: Latest creation date, now by default
+
+    Returns:
+        Iterator of (saved, failed) counts, one per batch as it completes
+    """
+    until = until or datetime.utcnow()
+    batches = [
+        (seed, start, min(batch_size, count - start), users, until, days)
+        for start in range(0, count, batch_size)
+    ]
+    if workers <= 1:
+        _start_worker()
+        yield from map(_insert, batches)
+        return
+    with multiprocessing.Pool(workers, initializer=_start_worker) as pool:
+        yield from pool.imap_unordered(_insert, batches)
+
+
+def main() -> None:
+    from src.config import TASK_STORAGE
+
+    parser = argparse.ArgumentParser(description="Fill the task storage with synthetic tasks for load testing")
+    parser.add_argument("--count", type=int, required=True)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    if TASK_STORAGE == "memory":
+        parser.error("TASK_STORAGE=memory keeps tasks inside each process; seed mongo or sqlite instead")
+
+    saved = failed = 0
+    started = reported = time.perf_counter()
+    for batch_saved, batch_failed in seed_tasks(
+        args.count, args.workers, args.batch_size, args.users, args.days, args.seed
+    ):
+        saved += batch_saved
+        failed += batch_failed
+        now = time.perf_counter()
+        if now - reported >= args.report_seconds:
+            print(f"{saved:,} / {args.count:,} tasks, {saved / (now - started):,.0f} tasks/s", flush=True)
+            reported = now
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Inserted {saved:,} tasks ({failed:,} failed) into {TASK_STORAGE} in {elapsed:.1f} s: "
+        f"{saved / elapsed:,.0f} tasks/s with {args.workers} workers"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Production server for the Task Manager API.
+
+Runs the Flask application under gunicorn: a master process that imports the
+application once and forks worker processes, each serving requests on a pool
+of threads. Preloading lets the workers share the imported code copy-on-write
+and makes import errors fail the master instead of every worker.
+
+Nothing that holds sockets or per-process state is created in the master. The
+handlers build their services on first use, and after each fork the worker
+forgets any that exist, so every worker opens its own MongoDB client and
+starts with empty caches. On SIGTERM gunicorn stops accepting connections and
+gives in-flight requests ``SERVER_GRACEFUL_TIMEOUT_SECONDS`` to finish.
+
+Registered users live in the configured storage with the tasks, so any worker
+can log in a user registered through another. The exception is
+TASK_STORAGE=memory, where every worker would have its own tasks and users;
+the server then runs a single worker and scales with threads, and asking for
+more workers is an error.
+
+Usage (from the backend directory):
+    python -m src.serve [--bind HOST:PORT] [--workers N] [--threads N]
+"""
+
+import argparse
+import os
+from typing import Any, Dict, Optional
+
+from gunicorn.app.base import BaseApplication
+
+from src.config import (
+    TASK_STORAGE, SERVER_BIND, SERVER_WORKERS, SERVER_THREADS, SERVER_KEEPALIVE_SECONDS,
+    SERVER_GRACEFUL_TIMEOUT_SECONDS, SERVER_TIMEOUT_SECONDS, SERVER_MAX_REQUESTS
+)
+
+
+def post_fork(server, worker) -> None:
+    """Drop any services inherited from the master so the worker builds its own."""
+    from src.api import handlers
+
+    handlers.reset_singletons()
+
+
+def worker_exit(server, worker) -> None:
+    """Close the worker's MongoDB clients once it has drained its requests."""
+    from src.infrastructure.mongo_clients import close_clients
+
+    close_clients()
+
+
+def server_options(bind: str = SERVER_BIND, workers: int = SERVER_WORKERS,
+                   threads: int = SERVER_THREADS) -> Dict[str, Any]:
+    """
+    Build the gunicorn settings from the configuration.
+
+    Args:
+        bind: Address to listen on
+        workers: Number of worker processes; 0 starts one per CPU, or a single
+            one with TASK_STORAGE=memory
+        threads: Number of request threads per worker
+
+    Returns:
+        Dict of gunicorn settings
+
+    Raises:
+        ValueError: If more than one worker is requested with TASK_STORAGE=memory
+    """
+    in_memory = TASK_STORAGE == "memory"
+    if workers > 1 and in_memory:
+        raise ValueError(
+            f"Cannot run {workers} workers: TASK_STORAGE=memory keeps the tasks and users in each worker's memory"
+        )
+    options = {
+        "bind": bind,
+        "workers": workers or (1 if in_memory else os.cpu_count() or 1),
+        "worker_class": "gthread",
+        "threads": threads,
+        "preload_app": True,
+        "keepalive": SERVER_KEEPALIVE_SECONDS,
+        "graceful_timeout": SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        "timeout": SERVER_TIMEOUT_SECONDS,
+        "post_fork": post_fork,
+        "worker_exit": worker_exit,
+    }
+    if SERVER_MAX_REQUESTS > 0:
+        options["max_requests"] = SERVER_MAX_REQUESTS
+        options["max_requests_jitter"] = max(1, SERVER_MAX_REQUESTS // 10)
+    return options
+
+
+class TaskManagerServer(BaseApplication):
+    """gunicorn application serving ``src.app:app`` with settings from the configuration."""
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the server.
+
+        Args:
+            options: gunicorn settings; defaults to server_options()
+        """
+        self.options = options if options is not None else server_options()
+        super().__init__()
+
+    def load_config(self) -> None:
+        """Apply the settings to gunicorn's configuration."""
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        """Import the WSGI application, once in the master since it is preloaded."""
+        from src.app import app
+
+        return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Task Manager API with gunicorn")
+    parser.add_argument("--bind", default=SERVER_BIND)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS)
+    parser.add_argument("--threads", type=int, default=SERVER_THREADS)
+    args = parser.parse_args()
+
+    try:
+        options = server_options(args.bind, args.workers, args.threads)
+    except ValueError as e:
+        parser.error(str(e))
+    TaskManagerServer(options).run()
+
+
+if __name__ == "__main__":
+    main()
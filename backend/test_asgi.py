@@ -0,0 +1,131 @@
+import json
+from datetime import timedelta
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.api import async_handlers, handlers
+from src.application.async_services import AsyncTaskServiceImpl
+from src.domain.interfaces import AsyncTaskRepository
+from test_handlers import FakeTaskRepository, add_tasks
+
+# Coroutine facade over the in-memory repository of the handler tests
+class AsyncFakeTaskRepository(AsyncTaskRepository):
+    def __init__(self, repository):
+        self.repository = repository
+
+    async def get_all_for_user(self, user_id, limit=None, cursor=None, query=None):
+        return self.repository.get_all_for_user(user_id, limit, cursor, query)
+
+    async def iter_all_for_user(self, user_id, limit=None, cursor=None, query=None, batch_size=50):
+        for task in self.repository.iter_all_for_user(user_id, limit, cursor, query, batch_size):
+            yield task
+
+    async def get_by_id_for_user(self, task_id, user_id):
+        return self.repository.get_by_id_for_user(task_id, user_id)
+
+    async def get_changed_for_user(self, user_id, since, until, limit=None):
+        return self.repository.get_changed_for_user(user_id, since, until, limit)
+
+    async def get_deleted_for_user(self, user_id, since, until, limit=None):
+        return self.repository.get_deleted_for_user(user_id, since, until, limit)
+
+    async def save(self, task):
+        return self.repository.save(task)
+
+    async def save_many(self, tasks):
+        return self.repository.save_many(tasks)
+
+    async def update_fields(self, task_id, fields):
+        return self.repository.update_fields(task_id, fields)
+
+    async def update_fields_many(self, updates, user_id):
+        return self.repository.update_fields_many(updates, user_id)
+
+    async def delete(self, task_id):
+        return self.repository.delete(task_id)
+
+    async def delete_many(self, task_ids, user_id):
+        return self.repository.delete_many(task_ids, user_id)
+
+@pytest.fixture
+def repository(monkeypatch):
+    repository = FakeTaskRepository()
+    service = AsyncTaskServiceImpl(AsyncFakeTaskRepository(repository), sync_lag=timedelta(0))
+    monkeypatch.setattr(async_handlers, 'task_service', service)
+    # The bearer token is the user id
+    monkeypatch.setattr(handlers.get_auth_service(), 'verify_token', lambda token: {'sub': token})
+    return repository
+
+@pytest.fixture
+def client():
+    from src.asgi import app
+
+    return TestClient(app)
+
+def test_asgi_routes_match_the_flask_application(repository, client):
+    headers = {'Authorization': 'Bearer admin'}
+
+    response = client.post('/tasks', json={'title': 'Async task'}, headers=headers)
+    assert response.status_code == 201
+    task_id = response.json()['task_id']
+
+    response = client.get(f'/tasks/{task_id}', headers=headers)
+    assert response.status_code == 200
+    assert response.json()['title'] == 'Async task'
+    response = client.get(f'/tasks/{task_id}', headers={**headers, 'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+    assert response.content == b''
+
+    response = client.put(f'/tasks/{task_id}', json={'status': 'completed'}, headers=headers)
+    assert response.json()['status'] == 'completed'
+    assert client.get(f'/tasks/{task_id}', headers={'Authorization': 'Bearer alice'}).status_code == 404
+
+    response = client.post('/tasks', json={'title': 'x'}, headers=headers)
+    assert response.status_code == 422
+    assert response.json()['error']['type'] == 'ValidationError'
+    assert client.get('/tasks').status_code == 401
+
+    response = client.delete(f'/tasks/{task_id}', headers=headers)
+    assert response.status_code == 204
+    assert client.delete(f'/tasks/{task_id}', headers=headers).status_code == 404
+
+def test_asgi_lists_pages_streams_and_syncs(repository, client, monkeypatch):
+    monkeypatch.setattr(async_handlers, 'TASK_STREAM_BATCH_SIZE', 3)
+    add_tasks(repository, 7)
+    headers = {'Authorization': 'Bearer admin'}
+
+    response = client.get('/tasks?limit=5', headers=headers)
+    body = response.json()
+    assert len(body['tasks']) == 5
+    response = client.get(f"/tasks?limit=5&cursor={body['next_cursor']}", headers=headers)
+    assert len(response.json()['tasks']) == 2
+
+    response = client.get('/tasks', headers={**headers, 'Accept': 'application/x-ndjson'})
+    assert response.headers['Content-Type'] == 'application/x-ndjson'
+    lines = response.text.splitlines()
+    assert len({json.loads(line)['task_id'] for line in lines}) == 7
+    assert len(client.get('/tasks?stream=1&limit=5', headers=headers).text.splitlines()) == 5
+
+    deleted = next(iter(repository.tasks))
+    client.delete(f'/tasks/{deleted}', headers=headers)
+    response = client.get('/tasks?since=2022-12-31T00:00:00', headers=headers)
+    body = response.json()
+    assert len(body['tasks']) == 6
+    assert [tombstone['task_id'] for tombstone in body['deleted']] == [deleted]
+
+def test_asgi_batches_report_each_item(repository, client):
+    headers = {'Authorization': 'Bearer admin'}
+
+    response = client.post('/tasks/batch', headers=headers, json={'tasks': [{'title': 'First task'}, {'title': 'x'}]})
+    assert response.status_code == 207
+    assert [r['status'] for r in response.json()['results']] == [201, 422]
+    task_id = response.json()['results'][0]['task']['task_id']
+
+    response = client.put('/tasks/batch', headers=headers, json={'tasks': [{'task_id': task_id, 'status': 'completed'}]})
+    assert response.status_code == 200
+    assert repository.tasks[task_id].status == 'completed'
+
+    response = client.post('/tasks/batch/delete', headers=headers, json={'tasks': [{'task_id': task_id}]})
+    assert response.status_code == 200
+    assert repository.tasks == {}
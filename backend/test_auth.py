@@ -0,0 +1,125 @@
+import base64
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from jose import jwt
+
+from src.config import JWT_ALGORITHM, JWT_SECRET
+from src.infrastructure.auth import JwtAuthService, hash_password
+from src.infrastructure.jwt_backends import HS256Backend, InvalidTokenError, JoseBackend, create_jwt_backend
+
+def test_verify_token_caches_valid_tokens():
+    auth_service = JwtAuthService(token_cache_size=10)
+    token = auth_service.register('alice', 'secret-password')
+
+    assert auth_service.verify_token(token)['sub'] == 'alice'
+    assert auth_service.verify_token(token)['sub'] == 'alice'
+
+    stats = auth_service.token_cache_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['size'] == 1
+
+def test_cached_tokens_never_outlive_their_expiration():
+    auth_service = JwtAuthService(token_cache_size=10)
+    expires = int(time.time()) + 5
+    token = jwt.encode({'sub': 'alice', 'exp': expires}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+    started = time.monotonic()
+    assert auth_service.verify_token(token)['sub'] == 'alice'
+
+    [(_, expires_at)] = auth_service.token_cache._entries.values()
+    assert expires_at <= started + 5.1
+
+def test_verify_token_rejects_invalid_tokens():
+    auth_service = JwtAuthService(token_cache_size=10)
+    expired = jwt.encode(
+        {'sub': 'alice', 'exp': datetime.utcnow() - timedelta(minutes=1)},
+        JWT_SECRET, algorithm=JWT_ALGORITHM
+    )
+
+    assert auth_service.verify_token('not-a-token') is None
+    assert auth_service.verify_token(expired) is None
+    assert auth_service.token_cache_stats()['size'] == 0
+
+    assert JwtAuthService(token_cache_size=0).token_cache_stats() is None
+
+def test_users_registered_through_one_worker_log_in_through_another(tmp_path):
+    from src.infrastructure.sqlite_repository import SqliteUserRepository
+
+    # Two services on one database file stand for two gunicorn workers
+    workers = [JwtAuthService(users=SqliteUserRepository(str(tmp_path / 'tasks.db'))) for _ in range(2)]
+    workers[0].register('alice', 'secret-password')
+
+    assert workers[1].verify_token(workers[1].authenticate('alice', 'secret-password'))['sub'] == 'alice'
+    assert workers[1].authenticate('alice', 'wrong-password') is None
+    assert workers[1].authenticate('bob', 'secret-password') is None
+    # Passwords are only stored as salted hashes
+    stored = workers[1].users.get_password_hash('alice')
+    assert 'secret-password' not in stored and stored.startswith('pbkdf2_sha256$')
+    assert stored != hash_password('secret-password')
+
+def test_hs256_backend_interoperates_with_jose():
+    backend = HS256Backend(JWT_SECRET)
+    expires = datetime.utcnow() + timedelta(minutes=5)
+
+    token = backend.encode({'sub': 'alice', 'exp': expires})
+    assert jwt.decode(token, JWT_SECRET, algorithms=['HS256'])['sub'] == 'alice'
+
+    jose_token = jwt.encode({'sub': 'bob', 'exp': expires}, JWT_SECRET, algorithm='HS256')
+    assert backend.decode(jose_token)['sub'] == 'bob'
+
+def test_hs256_backend_rejects_tampered_and_unsigned_tokens():
+    backend = HS256Backend(JWT_SECRET)
+    header, payload, signature = backend.encode({'sub': 'alice'}).split('.')
+    forged_payload = jwt.encode({'sub': 'mallory'}, JWT_SECRET, algorithm='HS256').split('.')[1]
+    unsigned_header = base64.urlsafe_b64encode(b'{"alg":"none","typ":"JWT"}').rstrip(b'=').decode()
+
+    for token in (
+        f'{header}.{forged_payload}.{signature}',
+        f'{unsigned_header}.{payload}.',
+        jwt.encode({'sub': 'alice'}, 'another-secret', algorithm='HS256'),
+        jwt.encode({'sub': 'alice', 'nbf': int(time.time()) + 60}, JWT_SECRET, algorithm='HS256'),
+        'a.b',
+    ):
+        with pytest.raises(InvalidTokenError):
+            backend.decode(token)
+
+def test_hs256_backend_rejects_garbage_in_the_signature_segment():
+    backend = HS256Backend(JWT_SECRET)
+    token = backend.encode({'sub': 'alice'})
+    header, payload, signature = token.split('.')
+
+    assert backend.decode(token)['sub'] == 'alice'
+    # Non-validating base64 drops these characters and would accept the tokens
+    for garbage in (signature[:10] + '!' + signature[10:], signature + '$', signature[:20] + '+/' + signature[20:]):
+        with pytest.raises(InvalidTokenError):
+            backend.decode(f'{header}.{payload}.{garbage}')
+
+@pytest.mark.parametrize('audience', [None, 'tasks-api'])
+def test_hs256_backend_checks_audience_like_jose(audience):
+    backends = [HS256Backend(JWT_SECRET, audience), JoseBackend(JWT_SECRET, 'HS256', audience)]
+
+    for claims, accepted in (
+        ({'sub': 'alice'}, True),
+        ({'sub': 'alice', 'aud': 'tasks-api'}, audience == 'tasks-api'),
+        ({'sub': 'alice', 'aud': ['other', 'tasks-api']}, audience == 'tasks-api'),
+        ({'sub': 'alice', 'aud': 'other'}, False),
+        ({'sub': 'alice', 'aud': 7}, False),
+    ):
+        token = jwt.encode(claims, JWT_SECRET, algorithm='HS256')
+        for backend in backends:
+            if accepted:
+                assert backend.decode(token)['sub'] == 'alice'
+            else:
+                with pytest.raises(InvalidTokenError):
+                    backend.decode(token)
+
+def test_create_jwt_backend_uses_jose_for_other_algorithms():
+    assert isinstance(create_jwt_backend(JWT_SECRET, 'HS256'), HS256Backend)
+    assert isinstance(create_jwt_backend(JWT_SECRET, 'HS256', 'jose'), JoseBackend)
+
+    backend = create_jwt_backend(JWT_SECRET, 'HS512')
+    assert isinstance(backend, JoseBackend)
+    assert backend.decode(backend.encode({'sub': 'alice'}))['sub'] == 'alice'
@@ -0,0 +1,68 @@
+from src.domain.models import Task
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.cached_repository import CachingTaskRepository
+from test_handlers import FakeTaskRepository
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class CountingRepository(FakeTaskRepository):
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get_by_id(self, task_id):
+        self.reads += 1
+        return super().get_by_id(task_id)
+
+    def get_by_id_for_user(self, task_id, user_id):
+        self.reads += 1
+        return super().get_by_id_for_user(task_id, user_id)
+
+def test_ttl_cache_evicts_least_recently_used_and_expires():
+    clock = FakeClock()
+    cache = TTLCache(max_size=2, ttl=10, clock=clock)
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    cache.set('d', 4, ttl=1)
+    clock.now = 5
+    assert cache.get('d') is None
+    assert cache.get('a') == 1
+    clock.now = 20
+    assert cache.get('a') is None
+
+    assert cache.stats() == {
+        'size': 0, 'max_size': 2, 'hits': 3, 'misses': 3, 'expirations': 2, 'evictions': 2
+    }
+
+def test_caching_repository_serves_reads_and_invalidates_on_write():
+    inner = CountingRepository()
+    repository = CachingTaskRepository(inner, max_size=10, ttl=60)
+    task = repository.save(Task(title='Cached', created_by='alice'))
+
+    assert repository.get_by_id_for_user(task.task_id, 'alice').title == 'Cached'
+    assert repository.get_by_id_for_user(task.task_id, 'alice').title == 'Cached'
+    assert repository.get_by_id_for_user(task.task_id, 'bob') is None
+    assert inner.reads == 1
+
+    # Mutating a returned task does not change the cached copy
+    repository.get_by_id(task.task_id).title = 'Changed locally'
+    assert repository.get_by_id(task.task_id).title == 'Cached'
+
+    repository.update_fields(task.task_id, {'title': 'Renamed'})
+    assert repository.get_by_id(task.task_id).title == 'Renamed'
+    assert inner.reads == 2
+
+    repository.delete(task.task_id)
+    assert repository.get_by_id(task.task_id) is None
+    assert repository.stats()['hits'] == 4
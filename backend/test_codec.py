@@ -0,0 +1,25 @@
+import importlib
+from datetime import datetime
+
+import pytest
+
+from src import codec, config
+
+@pytest.fixture(params=['json', 'auto'])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(config, 'JSON_CODEC', request.param)
+    yield importlib.reload(codec)
+    monkeypatch.undo()
+    importlib.reload(codec)
+
+def test_codec_serializes_datetimes(backend):
+    value = {'title': 'Tarea', 'updated_at': datetime(2023, 1, 1, 12, 30, 0, 5)}
+
+    encoded = backend.dumps(value)
+    assert isinstance(encoded, str)
+    assert backend.loads(encoded) == {'title': 'Tarea', 'updated_at': '2023-01-01T12:30:00.000005'}
+    assert backend.dumps_bytes(value) == encoded.encode('utf-8')
+
+def test_codec_rejects_unknown_types(backend):
+    with pytest.raises(TypeError):
+        backend.dumps({'value': object()})
@@ -0,0 +1,488 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.api import handlers
+from src.application.services import TaskServiceImpl
+from src.domain.interfaces import TaskRepository
+from src.domain.models import Task, Tombstone
+from src.domain.pagination import decode_cursor
+from src.domain.queries import TaskQuery
+
+# In-memory repository standing in for MongoDB
+class FakeTaskRepository(TaskRepository):
+    def __init__(self):
+        self.tasks = {}
+        self.tombstones = []
+
+    def get_all(self, limit=None, cursor=None, query=None):
+        query = query or TaskQuery()
+        field, descending = query.sort_key
+        key = lambda t: (getattr(t, field), t.task_id)
+
+        tasks = [t for t in self.tasks.values() if self._matches(t, query)]
+        tasks.sort(key=key, reverse=descending)
+        if cursor:
+            _, value, task_id = decode_cursor(cursor)
+            after = (value, task_id)
+            tasks = [t for t in tasks if (key(t) < after if descending else key(t) > after)]
+        return tasks[:limit] if limit else tasks
+
+    @staticmethod
+    def _matches(task, query):
+        if query.status is not None and task.status != query.status:
+            return False
+        if query.created_by is not None and task.created_by != query.created_by:
+            return False
+        for field, (lower, upper) in query.date_ranges().items():
+            value = getattr(task, field)
+            if (lower is not None and value < lower) or (upper is not None and value >= upper):
+                return False
+        return True
+
+    def get_all_for_user(self, user_id, limit=None, cursor=None, query=None):
+        return self.get_all(limit, cursor, (query or TaskQuery()).for_owner(user_id))
+
+    @staticmethod
+    def _window(items, key, since, until, limit):
+        items = sorted((i for i in items if since < key(i) <= until), key=lambda i: (key(i), i.task_id))
+        return items[:limit] if limit else items
+
+    def get_changed_for_user(self, user_id, since, until, limit=None):
+        tasks = [t for t in self.tasks.values() if t.created_by == user_id]
+        return self._window(tasks, lambda t: t.updated_at, since, until, limit)
+
+    def get_deleted_for_user(self, user_id, since, until, limit=None):
+        tombstones = [t for t in self.tombstones if t.created_by == user_id]
+        return self._window(tombstones, lambda t: t.deleted_at, since, until, limit)
+
+    def get_by_id(self, task_id):
+        return self.tasks.get(task_id)
+
+    def get_by_id_for_user(self, task_id, user_id):
+        task = self.tasks.get(task_id)
+        return task if task and task.created_by == user_id else None
+
+    def save(self, task):
+        self.tasks[task.task_id] = task
+        return task
+
+    def update(self, task):
+        self.tasks[task.task_id] = task
+        return task
+
+    def update_fields(self, task_id, fields):
+        task = self.tasks.get(task_id)
+        if task:
+            task.update(**fields)
+        return task
+
+    def delete(self, task_id):
+        task = self.tasks.pop(task_id, None)
+        if task is None:
+            return False
+        self.tombstones.append(Tombstone(task_id, task.created_by))
+        return True
+
+@pytest.fixture
+def repository(monkeypatch):
+    repository = FakeTaskRepository()
+    monkeypatch.setattr('src.api.handlers.task_service', TaskServiceImpl(repository))
+    # The bearer token is the user id
+    monkeypatch.setattr(handlers.get_auth_service(), 'verify_token', lambda token: {'sub': token})
+    return repository
+
+def add_tasks(repository, count, user='admin', status='pending'):
+    start = datetime(2023, 1, 1)
+    for i in range(count):
+        # Pairs of tasks share a timestamp so the task_id tie-breaker is exercised
+        repository.save(Task(
+            title=f'Task {i}',
+            status=status,
+            created_by=user,
+            created_at=start + timedelta(days=i),
+            updated_at=start + timedelta(seconds=i // 2)
+        ))
+
+def list_event(user='admin', **params):
+    return {
+        'headers': {'Authorization': f'Bearer {user}'},
+        'queryStringParameters': {k: str(v) for k, v in params.items()}
+    }
+
+def test_get_tasks_paginates_with_cursor(repository):
+    add_tasks(repository, 25)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {'limit': 10}
+        if cursor:
+            params['cursor'] = cursor
+        response = handlers.get_tasks(list_event(**params), {})
+        assert response['statusCode'] == 200
+
+        body = json.loads(response['body'])
+        seen.extend(task['task_id'] for task in body['tasks'])
+        pages += 1
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+
+def test_get_tasks_uses_default_page_size(repository):
+    add_tasks(repository, 3)
+
+    response = handlers.get_tasks(list_event(), {})
+    assert response['statusCode'] == 200
+
+    body = json.loads(response['body'])
+    assert len(body['tasks']) == 3
+    assert body['next_cursor'] is None
+
+def test_get_tasks_rejects_invalid_pagination(repository):
+    response = handlers.get_tasks(list_event(limit=0), {})
+    assert response['statusCode'] == 422
+
+    response = handlers.get_tasks(list_event(limit='ten'), {})
+    assert response['statusCode'] == 422
+
+    response = handlers.get_tasks(list_event(cursor='not-a-cursor'), {})
+    assert response['statusCode'] == 422
+
+    body = json.loads(response['body'])
+    assert body['error']['type'] == 'ValidationError'
+
+def test_get_tasks_filters_and_sorts(repository):
+    add_tasks(repository, 4, user='alice', status='in_progress')
+    add_tasks(repository, 4, user='alice', status='completed')
+    add_tasks(repository, 4, user='bob', status='in_progress')
+
+    response = handlers.get_tasks(list_event('alice', status='in_progress'), {})
+    assert response['statusCode'] == 200
+
+    body = json.loads(response['body'])
+    assert len(body['tasks']) == 4
+    assert all(t['created_by'] == 'alice' and t['status'] == 'in_progress' for t in body['tasks'])
+
+    response = handlers.get_tasks(list_event('bob', sort='created_at', created_after='2023-01-02', limit=2), {})
+    body = json.loads(response['body'])
+    created = [t['created_at'] for t in body['tasks']]
+    assert created == sorted(created)
+    assert all(value >= '2023-01-02' for value in created)
+
+    # Cursors only continue the sort order they were issued for
+    params = {'sort': '-created_at', 'cursor': body['next_cursor']}
+    response = handlers.get_tasks(list_event('bob', **params), {})
+    assert response['statusCode'] == 422
+
+def test_get_tasks_rejects_invalid_filters(repository):
+    for params in ({'status': 'done'}, {'sort': 'title'}, {'updated_before': 'yesterday'}):
+        response = handlers.get_tasks(list_event(**params), {})
+        assert response['statusCode'] == 422
+
+def test_task_reads_are_scoped_to_the_caller(repository):
+    add_tasks(repository, 3, user='alice')
+    add_tasks(repository, 2, user='bob')
+
+    assert handlers.get_tasks(list_event('bob', created_by='alice'), {})['statusCode'] == 403
+    assert handlers.stream_tasks(list_event('bob', created_by='alice'), {})['statusCode'] == 403
+    response = handlers.get_tasks(list_event('bob', created_by='bob'), {})
+    body = json.loads(response['body'])
+    assert len(body['tasks']) == 2
+    assert all(t['created_by'] == 'bob' for t in body['tasks'])
+
+    task_id = body['tasks'][0]['task_id']
+    event = {'headers': {'Authorization': 'Bearer bob'}, 'pathParameters': {'taskId': task_id}}
+    assert handlers.get_task(event, {})['statusCode'] == 200
+
+    event['headers']['Authorization'] = 'Bearer alice'
+    assert handlers.get_task(event, {})['statusCode'] == 404
+
+def test_get_tasks_streams_ndjson(repository, monkeypatch):
+    from src.app import app
+
+    monkeypatch.setattr('src.api.handlers.TASK_STREAM_BATCH_SIZE', 3)
+    add_tasks(repository, 7)
+    client = app.test_client()
+
+    response = client.get('/tasks', headers={
+        'Authorization': 'Bearer admin',
+        'Accept': 'application/x-ndjson'
+    })
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 7
+    assert len({json.loads(line)['task_id'] for line in lines}) == 7
+
+    response = client.get('/tasks?stream=1&limit=5', headers={'Authorization': 'Bearer admin'})
+    assert len(response.get_data(as_text=True).splitlines()) == 5
+
+    response = client.get('/tasks?stream=1', headers={'Authorization': 'Bearer nobody'})
+    assert response.get_data(as_text=True) == ''
+
+    response = client.get('/tasks?stream=1')
+    assert response.status_code == 401
+
+def test_flask_routes_use_native_bodies(repository):
+    from src.app import app
+
+    client = app.test_client()
+    headers = {'Authorization': 'Bearer admin'}
+
+    response = client.post('/tasks', json={'title': 'Native task'}, headers=headers)
+    assert response.status_code == 201
+    task_id = response.get_json()['task_id']
+
+    response = client.get(f'/tasks/{task_id}', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['title'] == 'Native task'
+
+    response = client.post('/tasks', json={'title': 'x'}, headers=headers)
+    assert response.status_code == 422
+    assert response.get_json()['error']['type'] == 'ValidationError'
+
+def test_lambda_handlers_encode_bodies(repository):
+    event = {
+        'headers': {'Authorization': 'Bearer admin'},
+        'body': json.dumps({'title': 'Lambda task'})
+    }
+    response = handlers.create_task(event, {})
+    assert response['statusCode'] == 201
+    assert json.loads(response['body'])['title'] == 'Lambda task'
+
+def test_update_task_sets_only_changed_fields(repository):
+    add_tasks(repository, 1)
+    task = next(iter(repository.tasks.values()))
+    before = task.updated_at
+
+    event = {
+        'headers': {'Authorization': 'Bearer admin'},
+        'pathParameters': {'taskId': task.task_id},
+        'body': {'status': 'completed'}
+    }
+    response = handlers.update_task.native(event, {})
+    assert response['statusCode'] == 200
+    assert response['body']['status'] == 'completed'
+    assert response['body']['title'] == 'Task 0'
+    assert response['body']['updated_at'] > before
+
+    event['pathParameters']['taskId'] = '00000000-0000-0000-0000-000000000000'
+    assert handlers.update_task.native(event, {})['statusCode'] == 404
+
+class VersionedTaskRepository(FakeTaskRepository):
+    """Fake repository keeping a change counter per user, like the Mongo repositories."""
+
+    def __init__(self):
+        super().__init__()
+        self.versions = {}
+        self.listings = 0
+
+    def _bump(self, user_id):
+        self.versions[user_id] = self.versions.get(user_id, 0) + 1
+
+    def get_version(self, user_id):
+        return self.versions.get(user_id, 0)
+
+    def get_all(self, limit=None, cursor=None, query=None):
+        self.listings += 1
+        return super().get_all(limit, cursor, query)
+
+    def save(self, task):
+        super().save(task)
+        self._bump(task.created_by)
+        return task
+
+    def update_fields(self, task_id, fields):
+        task = super().update_fields(task_id, fields)
+        if task:
+            self._bump(task.created_by)
+        return task
+
+def test_legacy_documents_with_string_dates_are_served(repository):
+    stored = Task(title='Legacy', created_by='admin', created_at=datetime(2023, 1, 1, 12, 30, 0, 250)).to_dict()
+    stored['created_at'] = stored['updated_at'] = stored['created_at'].isoformat()
+    task = Task.from_document(stored)
+    assert task.created_at == task.updated_at == datetime(2023, 1, 1, 12, 30, 0, 250)
+
+    repository.save(task)
+    add_tasks(repository, 1)
+    event = {'headers': {'Authorization': 'Bearer admin'}, 'pathParameters': {'taskId': task.task_id}}
+    assert handlers.get_task(event, {})['statusCode'] == 200
+    response = handlers.get_tasks(list_event(limit=1, sort='created_at'), {})
+    assert json.loads(response['body'])['next_cursor']
+
+def test_get_task_answers_if_none_match_with_304(repository):
+    add_tasks(repository, 1)
+    task = next(iter(repository.tasks.values()))
+    event = {'headers': {'Authorization': 'Bearer admin'}, 'pathParameters': {'taskId': task.task_id}}
+
+    response = handlers.get_task.native(event, {})
+    etag = response['headers']['ETag']
+
+    event['headers']['if-none-match'] = f'"stale", W/{etag}'
+    response = handlers.get_task(event, {})
+    assert response['statusCode'] == 304
+    assert response['body'] == ''
+
+    task.update(title='Renamed task')
+    response = handlers.get_task.native(event, {})
+    assert response['statusCode'] == 200
+    assert response['headers']['ETag'] != etag
+
+def test_get_tasks_without_change_counter_tags_the_page(repository):
+    add_tasks(repository, 3)
+    etag = handlers.get_tasks.native(list_event(limit=2), {})['headers']['ETag']
+
+    event = list_event(limit=2)
+    event['headers']['If-None-Match'] = etag
+    assert handlers.get_tasks.native(event, {})['statusCode'] == 304
+
+    event = list_event(limit=3)
+    event['headers']['If-None-Match'] = etag
+    assert handlers.get_tasks.native(event, {})['statusCode'] == 200
+
+def test_get_tasks_revalidates_from_change_counter_without_listing(monkeypatch):
+    repository = VersionedTaskRepository()
+    monkeypatch.setattr('src.api.handlers.task_service', TaskServiceImpl(repository))
+    monkeypatch.setattr(handlers.get_auth_service(), 'verify_token', lambda token: {'sub': token})
+    add_tasks(repository, 3)
+    add_tasks(repository, 1, user='other')
+
+    etag = handlers.get_tasks.native(list_event(), {})['headers']['ETag']
+    listings = repository.listings
+
+    event = list_event()
+    event['headers']['If-None-Match'] = etag
+    assert handlers.get_tasks.native(event, {})['statusCode'] == 304
+    assert repository.listings == listings
+
+    # Writes by another user leave the caller's tag untouched
+    add_tasks(repository, 1, user='other')
+    assert handlers.get_tasks.native(event, {})['statusCode'] == 304
+
+    task = next(t for t in repository.tasks.values() if t.created_by == 'admin')
+    repository.update_fields(task.task_id, {'status': 'completed'})
+    response = handlers.get_tasks.native(event, {})
+    assert response['statusCode'] == 200
+    assert response['headers']['ETag'] != etag
+
+def test_flask_routes_send_empty_304(repository):
+    from src.app import app
+
+    add_tasks(repository, 2)
+    client = app.test_client()
+    headers = {'Authorization': 'Bearer admin'}
+
+    response = client.get('/tasks', headers=headers)
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    response = client.get('/tasks', headers={**headers, 'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+
+def test_get_tasks_since_returns_changes_and_tombstones(repository):
+    handlers.task_service.sync_lag = timedelta(0)
+    add_tasks(repository, 3)
+    since = '2022-12-31T00:00:00'
+
+    response = handlers.get_tasks.native(list_event(since=since), {})
+    assert response['statusCode'] == 200
+    body = response['body']
+    assert len(body['tasks']) == 3
+    assert body['deleted'] == []
+    assert body['has_more'] is False
+
+    watermark = body['watermark']
+    task = next(iter(repository.tasks.values()))
+    repository.delete(task.task_id)
+
+    body = json.loads(handlers.get_tasks(list_event(since=watermark.isoformat()), {})['body'])
+    assert body['tasks'] == []
+    assert [deleted['task_id'] for deleted in body['deleted']] == [task.task_id]
+
+    response = handlers.get_tasks.native(list_event(since=since, status='pending'), {})
+    assert response['statusCode'] == 422
+
+    response = handlers.get_tasks.native(list_event(since='2000-01-01T00:00:00'), {})
+    assert response['statusCode'] == 200
+
+def test_create_tasks_batch_reports_each_item(repository, monkeypatch):
+    save = repository.save
+
+    def failing_save(task):
+        if task.title == 'Unlucky task':
+            raise RuntimeError('write failed')
+        return save(task)
+
+    monkeypatch.setattr(repository, 'save', failing_save)
+    event = {
+        'headers': {'Authorization': 'Bearer admin'},
+        'body': {'tasks': [
+            {'title': 'First task'},
+            {'title': 'x'},
+            'not a task',
+            {'title': 'Unlucky task', 'status': 'completed'},
+            {'title': 'Last task', 'status': 'in_progress'}
+        ]}
+    }
+
+    response = handlers.create_tasks_batch.native(event, {})
+    assert response['statusCode'] == 207
+    body = response['body']
+    assert [result['status'] for result in body['results']] == [201, 422, 422, 500, 201]
+    assert [result['index'] for result in body['results']] == [0, 1, 2, 3, 4]
+    assert body['results'][1]['error']['type'] == 'ValidationError'
+    assert body['results'][4]['task']['status'] == 'in_progress'
+    assert (body['succeeded'], body['failed']) == (2, 3)
+    assert sorted(t.title for t in repository.tasks.values()) == ['First task', 'Last task']
+
+    event['body'] = {'tasks': [{'title': 'Only task'}]}
+    assert handlers.create_tasks_batch.native(event, {})['statusCode'] == 201
+
+    monkeypatch.setattr('src.api.handlers.TASK_BATCH_MAX_SIZE', 2)
+    event['body'] = {'tasks': [{'title': 'Task'}] * 3}
+    assert handlers.create_tasks_batch.native(event, {})['statusCode'] == 422
+    event['body'] = {'tasks': []}
+    assert handlers.create_tasks_batch.native(event, {})['statusCode'] == 422
+
+def test_update_and_delete_batches_report_each_item(repository):
+    from src.app import app
+
+    add_tasks(repository, 3)
+    add_tasks(repository, 1, user='other')
+    mine = [t.task_id for t in repository.tasks.values() if t.created_by == 'admin']
+    theirs = next(t.task_id for t in repository.tasks.values() if t.created_by == 'other')
+    client = app.test_client()
+    headers = {'Authorization': 'Bearer admin'}
+
+    response = client.put('/tasks/batch', headers=headers, json={'tasks': [
+        {'task_id': mine[0], 'status': 'completed'},
+        {'task_id': theirs, 'status': 'completed'},
+        {'task_id': mine[1]},
+        {'task_id': mine[0], 'title': 'Again'},
+        {'task_id': mine[2], 'status': 'completed'}
+    ]})
+    assert response.status_code == 207
+    assert [r['status'] for r in response.get_json()['results']] == [200, 404, 422, 422, 200]
+    assert repository.tasks[mine[2]].status == 'completed'
+    assert repository.tasks[theirs].status == 'pending'
+
+    response = client.post('/tasks/batch/delete', headers=headers, json={'tasks': [
+        {'task_id': mine[0]}, {'task_id': theirs}, {'task_id': 'not-a-uuid'}
+    ]})
+    assert response.status_code == 207
+    assert [r['status'] for r in response.get_json()['results']] == [200, 404, 422]
+    assert mine[0] not in repository.tasks
+    assert theirs in repository.tasks
+    assert [t.task_id for t in repository.tombstones] == [mine[0]]
+
+    response = client.post('/tasks/batch/delete', headers=headers, json={'tasks': [{'task_id': mine[1]}]})
+    assert response.status_code == 200
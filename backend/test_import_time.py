@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cold import budgets in milliseconds, a few times the measured cost so that
+# slow machines pass while eager database or JWT imports still fail
+IMPORT_BUDGETS_MS = {
+    'src.api.handlers': 150,
+    'lambda_function': 150,
+}
+
+# Modules that must not be imported until a request needs them
+DEFERRED_MODULES = ('pymongo', 'jose', 'dotenv')
+
+def cold_import(module):
+    """Imports a module in a fresh Lambda-like interpreter and returns its -X importtime report."""
+    code = (
+        f'import sys, {module}; '
+        f'print(",".join(name for name in {DEFERRED_MODULES!r} if name in sys.modules))'
+    )
+    env = dict(os.environ, AWS_LAMBDA_FUNCTION_NAME='import-time-test')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, total, name = line.split('|')
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total) / 1000
+    return cumulative, [name for name in result.stdout.strip().split(',') if name]
+
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGETS_MS))
+def test_cold_import_stays_within_budget(module):
+    cold_import(module)  # warm the bytecode cache so only import work is measured
+    cumulative, deferred = cold_import(module)
+
+    assert deferred == []
+    assert cumulative[module] < IMPORT_BUDGETS_MS[module], (
+        f'importing {module} took {cumulative[module]:.0f} ms, budget is {IMPORT_BUDGETS_MS[module]} ms'
+    )
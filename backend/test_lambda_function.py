@@ -1,7 +1,7 @@
 import json
 import os
 import pytest
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument
 from pymongo.errors import ConnectionFailure
 from lambda_function import lambda_handler, create_task, get_tasks, update_task, delete_task, login
 
@@ -24,23 +24,29 @@ class MockCollection:
     def __init__(self):
         self.items = []
         self.next_id = 1
+        # Number of database operations, each a round trip on a real server
+        self.round_trips = 0
     
     def find(self):
+        self.round_trips += 1
         return self.items
     
     def find_one(self, query):
+        self.round_trips += 1
         for item in self.items:
             if all(item.get(k) == v for k, v in query.items()):
                 return item
         return None
     
     def insert_one(self, document):
+        self.round_trips += 1
         document['_id'] = str(self.next_id)
         self.next_id += 1
         self.items.append(document)
         return type('obj', (object,), {'inserted_id': document['_id']})
     
     def update_one(self, query, update):
+        self.round_trips += 1
         for i, item in enumerate(self.items):
             if all(item.get(k) == v for k, v in query.items()):
                 for key, value in update['$set'].items():
@@ -48,7 +54,17 @@ class MockCollection:
                 return type('obj', (object,), {'modified_count': 1})
         return type('obj', (object,), {'modified_count': 0})
     
+    def find_one_and_update(self, query, update, return_document=ReturnDocument.BEFORE):
+        self.round_trips += 1
+        for item in self.items:
+            if all(item.get(k) == v for k, v in query.items()):
+                before = dict(item)
+                item.update(update['$set'])
+                return dict(item) if return_document == ReturnDocument.AFTER else before
+        return None
+    
     def delete_one(self, query):
+        self.round_trips += 1
         for i, item in enumerate(self.items):
             if all(item.get(k) == v for k, v in query.items()):
                 del self.items[i]
@@ -59,7 +75,6 @@ class MockCollection:
 @pytest.fixture
 def mock_mongo(monkeypatch):
     mock_client = MockMongoClient()
-    monkeypatch.setattr('lambda_function.MongoClient', lambda *args, **kwargs: mock_client)
     monkeypatch.setattr('lambda_function.client', mock_client)
     monkeypatch.setattr('lambda_function.db', mock_client.db)
     monkeypatch.setattr('lambda_function.collection', mock_client.db.collection)
@@ -130,9 +145,11 @@ def test_create_task(mock_mongo):
     }
     
     # Mock token verification
+    mock_mongo.db.collection.round_trips = 0
     with pytest.MonkeyPatch.context() as mp:
         mp.setattr('lambda_function.verify_token', lambda token: {'sub': 'admin'})
         response = lambda_handler(event, context)
+    assert mock_mongo.db.collection.round_trips == 1
     
     assert response['statusCode'] == 201
     
@@ -153,9 +170,11 @@ def test_create_task(mock_mongo):
         })
     }
     
+    mock_mongo.db.collection.round_trips = 0
     with pytest.MonkeyPatch.context() as mp:
         mp.setattr('lambda_function.verify_token', lambda token: {'sub': 'admin'})
         response = lambda_handler(event, context)
+    assert mock_mongo.db.collection.round_trips == 0
     
     assert response['statusCode'] == 422
     
@@ -181,9 +200,11 @@ def test_get_tasks(mock_mongo):
         }
     }
     
+    mock_mongo.db.collection.round_trips = 0
     with pytest.MonkeyPatch.context() as mp:
         mp.setattr('lambda_function.verify_token', lambda token: {'sub': 'admin'})
         response = lambda_handler(event, context)
+    assert mock_mongo.db.collection.round_trips == 1
     
     assert response['statusCode'] == 200
     
@@ -203,9 +224,11 @@ def test_get_tasks(mock_mongo):
         'created_by': 'admin'
     })
     
+    mock_mongo.db.collection.round_trips = 0
     with pytest.MonkeyPatch.context() as mp:
         mp.setattr('lambda_function.verify_token', lambda token: {'sub': 'admin'})
         response = lambda_handler(event, context)
+    assert mock_mongo.db.collection.round_trips == 1
     
     assert response['statusCode'] == 200
     
@@ -252,9 +275,11 @@ def test_update_task(mock_mongo):
         })
     }
     
+    mock_mongo.db.collection.round_trips = 0
     with pytest.MonkeyPatch.context() as mp:
         mp.setattr('lambda_function.verify_token', lambda token: {'sub': 'admin'})
         response = lambda_handler(event, context)
+    assert mock_mongo.db.collection.round_trips == 1
     
     assert response['statusCode'] == 200
     
@@ -274,9 +299,11 @@ def test_update_task(mock_mongo):
         })
     }
     
+    mock_mongo.db.collection.round_trips = 0
     with pytest.MonkeyPatch.context() as mp:
         mp.setattr('lambda_function.verify_token', lambda token: {'sub': 'admin'})
         response = lambda_handler(event, context)
+    assert mock_mongo.db.collection.round_trips == 0
     
     assert response['statusCode'] == 422
     
@@ -296,9 +323,11 @@ def test_update_task(mock_mongo):
         })
     }
     
+    mock_mongo.db.collection.round_trips = 0
     with pytest.MonkeyPatch.context() as mp:
         mp.setattr('lambda_function.verify_token', lambda token: {'sub': 'admin'})
         response = lambda_handler(event, context)
+    assert mock_mongo.db.collection.round_trips == 1
     
     assert response['statusCode'] == 404
     
@@ -338,9 +367,11 @@ def test_delete_task(mock_mongo):
         'pathParameters': {'id': 'task1'}
     }
     
+    mock_mongo.db.collection.round_trips = 0
     with pytest.MonkeyPatch.context() as mp:
         mp.setattr('lambda_function.verify_token', lambda token: {'sub': 'admin'})
         response = lambda_handler(event, context)
+    assert mock_mongo.db.collection.round_trips == 1
     
     assert response['statusCode'] == 204
     
@@ -356,9 +387,11 @@ def test_delete_task(mock_mongo):
         'pathParameters': {'id': 'non_existent_task'}
     }
     
+    mock_mongo.db.collection.round_trips = 0
     with pytest.MonkeyPatch.context() as mp:
         mp.setattr('lambda_function.verify_token', lambda token: {'sub': 'admin'})
         response = lambda_handler(event, context)
+    assert mock_mongo.db.collection.round_trips == 1
     
     assert response['statusCode'] == 404
     
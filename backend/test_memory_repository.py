@@ -0,0 +1,143 @@
+import random
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.domain.exceptions import DatabaseError
+from src.domain.models import Task
+from src.domain.pagination import next_cursor
+from src.domain.queries import TaskQuery
+from src.infrastructure.memory_repository import InMemoryTaskRepository
+from test_handlers import FakeTaskRepository
+
+START = datetime(2023, 1, 1)
+
+def random_tasks(count, seed=7):
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(count):
+        created_at = START + timedelta(hours=rng.randrange(200))
+        tasks.append(Task(
+            title=f'Task {i}',
+            status=rng.choice(['pending', 'in_progress', 'completed']),
+            created_by=rng.choice(['alice', 'bob', 'carol']),
+            created_at=created_at,
+            # Few distinct timestamps so the task_id tie-breaker is exercised
+            updated_at=created_at + timedelta(hours=rng.randrange(3))
+        ))
+    return tasks
+
+def walk(repository, query, limit):
+    tasks, cursor = [], None
+    while True:
+        page = repository.get_all(limit=limit, cursor=cursor, query=query)
+        tasks.extend(page)
+        cursor = next_cursor(page, limit, query.sort)
+        if not cursor:
+            return [task.task_id for task in tasks]
+
+@pytest.fixture
+def repositories():
+    memory, reference = InMemoryTaskRepository(), FakeTaskRepository()
+    for task in random_tasks(300):
+        memory.save(task)
+        reference.save(task)
+    return memory, reference
+
+QUERIES = [
+    TaskQuery(),
+    TaskQuery(sort='updated_at'),
+    TaskQuery(sort='-created_at', status='completed'),
+    TaskQuery(sort='created_at', created_by='bob'),
+    TaskQuery(created_by='alice', status='pending'),
+    TaskQuery(sort='updated_at', updated_after=START + timedelta(hours=50), updated_before=START + timedelta(hours=90)),
+    TaskQuery(created_by='carol', created_after=START + timedelta(hours=20), created_before=START + timedelta(hours=150)),
+]
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_indexed_listings_match_a_full_scan(repositories, query):
+    memory, reference = repositories
+
+    assert walk(memory, query, 7) == [task.task_id for task in reference.get_all(query=query)]
+    assert walk(memory, query, 1000) == walk(reference, query, 1000)
+
+def test_bulk_loads_index_like_single_saves():
+    single, bulk = InMemoryTaskRepository(), InMemoryTaskRepository()
+    tasks = random_tasks(300)
+    for task in tasks:
+        single.save(task)
+    assert bulk.save_many(tasks[:100]) == {}
+    assert bulk.save_many(tasks[100:] + tasks[:1]) == {200: f'Task with id {tasks[0].task_id} already exists'}
+
+    for query in QUERIES:
+        assert walk(bulk, query, 1000) == walk(single, query, 1000)
+    assert bulk.get_version('alice') == 2
+
+def test_writes_keep_the_indexes_consistent(repositories):
+    memory, reference = repositories
+    owned = [t.task_id for t in reference.get_all(query=TaskQuery(created_by='alice'))]
+
+    memory.update_fields(owned[0], {'status': 'completed'})
+    reference.update_fields(owned[0], {'status': 'completed'})
+    assert memory.update_fields_many({owned[1]: {'title': 'Renamed'}, owned[2]: {'status': 'pending'}}, 'bob') == set()
+    assert memory.delete_many(owned[3:6] + ['missing'], 'alice') == set(owned[3:6])
+    for task_id in owned[3:6]:
+        reference.delete(task_id)
+    # A batch counts as one change, as in the MongoDB and SQLite repositories
+    version = memory.get_version('alice')
+    batch = {owned[6]: {'title': 'Renamed'}, owned[7]: {'status': 'completed'}, 'missing': {'title': 'Nope'}}
+    assert memory.update_fields_many(batch, 'alice') == {owned[6], owned[7]}
+    assert memory.get_version('alice') == version + 1
+    for task_id in owned[6:8]:
+        reference.update(memory.get_by_id(task_id))
+
+    stored = memory.get_by_id(owned[0])
+    stored.status = 'pending'
+    assert memory.get_by_id(owned[0]).status == 'completed'
+    for query in QUERIES:
+        assert walk(memory, query, 1000) == walk(reference, query, 1000)
+    assert memory.get_by_id_for_user(owned[0], 'bob') is None
+    assert memory.get_version('alice') > 0
+
+def test_sync_windows_exclude_since_and_include_until():
+    repository = InMemoryTaskRepository(tombstone_retention=timedelta(days=1))
+    tasks = [Task(title=f'Task {i}', created_by='alice', updated_at=START + timedelta(seconds=i // 2)) for i in range(6)]
+    for task in tasks:
+        repository.save(task)
+
+    changed = repository.get_changed_for_user('alice', START, START + timedelta(seconds=2))
+    assert {t.task_id for t in changed} == {t.task_id for t in tasks[2:6]}
+    assert [t.task_id for t in changed] == sorted(t.task_id for t in tasks[2:4]) + sorted(t.task_id for t in tasks[4:6])
+    assert len(repository.get_changed_for_user('alice', START, START + timedelta(seconds=2), limit=3)) == 3
+
+    assert repository.delete(tasks[0].task_id)
+    assert not repository.delete(tasks[0].task_id)
+    deleted = repository.get_deleted_for_user('alice', START, datetime.utcnow() + timedelta(seconds=1))
+    assert [tombstone.task_id for tombstone in deleted] == [tasks[0].task_id]
+    with pytest.raises(DatabaseError):
+        repository.save(tasks[1])
+    assert repository.save_many([tasks[1], Task(title='New task', created_by='alice')]).keys() == {0}
+
+def test_concurrent_writers_leave_consistent_indexes():
+    repository = InMemoryTaskRepository()
+
+    def writer(user):
+        for i in range(200):
+            task = repository.save(Task(title=f'Task {i}', created_by=user))
+            if i % 3 == 0:
+                repository.update_fields(task.task_id, {'status': 'completed'})
+            if i % 5 == 0:
+                repository.delete(task.task_id)
+
+    threads = [threading.Thread(target=writer, args=(f'user-{n}',)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for n in range(8):
+        user = f'user-{n}'
+        assert len(repository.get_all_for_user(user)) == 160
+        completed = repository.get_all_for_user(user, query=TaskQuery(status='completed'))
+        assert len(completed) == len([i for i in range(200) if i % 3 == 0 and i % 5 != 0])
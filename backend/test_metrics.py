@@ -0,0 +1,138 @@
+import re
+import threading
+
+from src.api import lambda_handler as lambda_routes
+from src.api.metrics import LATENCY_BUCKETS, RequestMetrics, metrics
+
+def sample(text, name, **labels):
+    """Returns the value of one sample of a rendered exposition, or 0 if it is missing."""
+    wanted = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    for line in text.splitlines():
+        match = re.fullmatch(r'(\w+)\{(.*)\} (\S+)', line)
+        if match and match.group(1) == name and match.group(2) == wanted:
+            return float(match.group(3))
+    return 0
+
+def test_render_exposes_cumulative_histograms_and_counters():
+    registry = RequestMetrics()
+    series = registry.start('GET', '/tasks')
+    registry.observe(series, 200, 0.003, 0, 2500)
+    registry.observe(series, 200, 0.2, 0, 50)
+    registry.observe(series, 401, 20.0, 10, None)
+    in_flight = registry.start('GET', '/tasks')
+    registry.finish(series)
+
+    text = registry.render()
+    labels = {'method': 'GET', 'route': '/tasks'}
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert sample(text, 'http_requests_in_flight', **labels) == 1
+    assert sample(text, 'http_responses_total', **labels, status=200) == 2
+    assert sample(text, 'http_responses_total', **labels, status=401) == 1
+    assert sample(text, 'http_request_duration_seconds_bucket', **labels, le=0.001) == 0
+    assert sample(text, 'http_request_duration_seconds_bucket', **labels, le=0.005) == 1
+    assert sample(text, 'http_request_duration_seconds_bucket', **labels, le=LATENCY_BUCKETS[-1]) == 2
+    assert sample(text, 'http_request_duration_seconds_bucket', **labels, le='+Inf') == 3
+    assert sample(text, 'http_request_duration_seconds_count', **labels) == 3
+    assert abs(sample(text, 'http_request_duration_seconds_sum', **labels) - 20.203) < 1e-9
+    # Streamed responses have no known size
+    assert sample(text, 'http_response_size_bytes_count', **labels) == 2
+    assert sample(text, 'http_response_size_bytes_bucket', **labels, le=100) == 1
+    assert sample(text, 'http_response_size_bytes_sum', **labels) == 2550
+    assert sample(text, 'http_request_size_bytes_sum', **labels) == 10
+
+    registry.finish(in_flight)
+    assert sample(registry.render(), 'http_requests_in_flight', **labels) == 0
+
+def test_threads_record_into_their_own_shards():
+    registry = RequestMetrics()
+    release = threading.Event()
+
+    def serve(route, count):
+        for _ in range(count):
+            series = registry.start('GET', route)
+            registry.observe(series, 200, 0.01, 0, 10)
+            registry.finish(series)
+        if route == '/tasks':
+            release.wait()
+
+    finished = [threading.Thread(target=serve, args=('/tasks/<task_id>', 500), daemon=True) for _ in range(4)]
+    running = threading.Thread(target=serve, args=('/tasks', 300), daemon=True)
+    for thread in finished + [running]:
+        thread.start()
+    for thread in finished:
+        thread.join()
+
+    text = registry.render()
+    assert sample(text, 'http_responses_total', method='GET', route='/tasks/<task_id>', status=200) == 2000
+    assert sample(text, 'http_responses_total', method='GET', route='/tasks', status=200) == 300
+    # Shards of ended threads are folded into one and keep counting
+    assert list(registry._shards) == [running]
+    release.set()
+    running.join()
+    text = registry.render()
+    assert not registry._shards
+    assert sample(text, 'http_responses_total', method='GET', route='/tasks/<task_id>', status=200) == 2000
+    assert sample(text, 'http_request_duration_seconds_count', method='GET', route='/tasks') == 300
+
+def test_flask_requests_are_recorded_by_route_template():
+    from src.app import app
+
+    client = app.test_client()
+    before = client.get('/metrics').get_data(as_text=True)
+    client.get('/tasks')
+    client.get('/tasks/some-id')
+    client.get('/missing/path')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    for route, status in (('/tasks', 401), ('/tasks/<task_id>', 401), ('unmatched', 404)):
+        labels = {'method': 'GET', 'route': route, 'status': status}
+        assert sample(text, 'http_responses_total', **labels) == sample(before, 'http_responses_total', **labels) + 1
+    assert sample(text, 'http_responses_total', method='GET', route='/metrics', status=200) >= 1
+    assert sample(text, 'http_requests_in_flight', method='GET', route='/metrics') == 1
+    assert sample(text, 'http_requests_in_flight', method='GET', route='/tasks') == 0
+
+def test_lambda_requests_are_recorded_by_route_template():
+    labels = {'method': 'PUT', 'route': '/tasks/<task_id>'}
+    before = metrics.render()
+
+    response = lambda_routes.lambda_handler({'httpMethod': 'PUT', 'path': '/tasks/abc', 'body': '{"title": "x"}'}, None)
+    assert response['statusCode'] == 401
+    assert lambda_routes.lambda_handler({'httpMethod': 'GET', 'path': '/nowhere'}, None)['statusCode'] == 404
+
+    response = lambda_routes.lambda_handler({'httpMethod': 'GET', 'path': '/metrics'}, None)
+    assert response['headers']['Content-Type'].startswith('text/plain')
+    text = response['body']
+    count = sample(before, 'http_responses_total', **labels, status=401)
+    assert sample(text, 'http_responses_total', **labels, status=401) == count + 1
+    assert sample(text, 'http_request_size_bytes_sum', **labels) >= 14
+    assert sample(text, 'http_responses_total', method='GET', route='unmatched', status=404) >= 1
+
+def test_merging_a_series_while_its_thread_adds_statuses():
+    registry = RequestMetrics()
+    done = threading.Event()
+
+    def serve():
+        series = registry.start('GET', '/tasks')
+        for status in range(100000):
+            registry.observe(series, status, 0.01)
+        done.set()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    while not done.is_set():
+        registry.snapshot()
+    thread.join()
+    assert len(registry.snapshot()['GET']['/tasks'].statuses) == 100000
+
+def test_lambda_sizes_are_measured_in_bytes():
+    assert lambda_routes.body_size({'body': '{"title": "Café ☕"}'}) == len('{"title": "Café ☕"}'.encode())
+    assert lambda_routes.body_size({'body': 'w6k=', 'isBase64Encoded': True}) == 2
+    assert lambda_routes.body_size({'body': None}) == 0
+
+    labels = {'method': 'POST', 'route': '/tasks'}
+    before = sample(metrics.render(), 'http_request_size_bytes_sum', **labels)
+    lambda_routes.lambda_handler({'httpMethod': 'POST', 'path': '/tasks', 'body': '{"title": "ñandú"}'}, None)
+    assert sample(metrics.render(), 'http_request_size_bytes_sum', **labels) == before + 20
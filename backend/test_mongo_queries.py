@@ -0,0 +1,358 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from src.domain.models import Task
+from src.domain.pagination import encode_cursor
+from src.domain.queries import TaskQuery
+from src.infrastructure.mongo_queries import TASK_INDEXES, sort_spec, task_filter
+
+def is_index_prefix(fields, index):
+    return [name for name, _ in index[:len(fields)]] == fields
+
+def test_task_filter_pushes_down_filters():
+    query = TaskQuery(
+        status='in_progress',
+        created_by='alice',
+        updated_after=datetime(2023, 1, 1),
+        updated_before=datetime(2023, 2, 1)
+    )
+
+    assert task_filter(query) == {
+        'created_by': 'alice',
+        'status': 'in_progress',
+        'updated_at': {'$gte': datetime(2023, 1, 1), '$lt': datetime(2023, 2, 1)}
+    }
+
+def test_task_filter_continues_from_cursor():
+    task = Task(title='Task', updated_at=datetime(2023, 1, 1, 12))
+    query = TaskQuery(sort='updated_at')
+
+    conditions = task_filter(query, encode_cursor(task, query.sort))
+    assert conditions['$or'] == [
+        {'updated_at': {'$gt': datetime(2023, 1, 1, 12)}},
+        {'updated_at': datetime(2023, 1, 1, 12), 'task_id': {'$gt': task.task_id}}
+    ]
+    assert sort_spec(query) == [('updated_at', 1), ('task_id', 1)]
+
+def test_every_filter_combination_has_an_index():
+    for equality in (['created_by'], ['created_by', 'status']):
+        for sort in ('updated_at', 'created_at'):
+            fields = equality + [sort, 'task_id']
+            assert any(is_index_prefix(fields, index) for index in TASK_INDEXES)
+    # Listings are always scoped to their owner, so other indexes would only cost writes
+    assert all(index[0][0] == 'created_by' for index in TASK_INDEXES)
+
+def test_ensure_indexes_drops_unscoped_indexes():
+    from src.infrastructure.mongo_queries import OBSOLETE_TASK_INDEXES, ensure_indexes
+
+    class IndexCollection:
+        def __init__(self):
+            self.names = {'_id_', 'updated_at_-1_task_id_-1', 'status_1_created_at_-1_task_id_-1'}
+
+        def create_index(self, keys, **kwargs):
+            self.names.add('_'.join(f'{name}_{direction}' for name, direction in keys))
+
+        def index_information(self):
+            return {name: {} for name in self.names}
+
+        def drop_index(self, name):
+            self.names.remove(name)
+
+    collection = IndexCollection()
+    ensure_indexes(collection)
+    assert not collection.names & set(OBSOLETE_TASK_INDEXES)
+    assert len(collection.names) == len(TASK_INDEXES) + 1
+
+class RecordingCollection:
+    def __init__(self, document):
+        self.document = document
+        self.calls = []
+
+    def find_one_and_update(self, query, update, projection=None, return_document=None):
+        self.calls.append((query, update, return_document))
+        if query['task_id'] != self.document['task_id']:
+            return None
+        return {**self.document, **update['$set']}
+
+    def update_one(self, query, update, upsert=False):
+        self.calls.append((query, update, upsert))
+
+def test_update_fields_is_a_single_partial_write():
+    from pymongo import ReturnDocument
+    from src.infrastructure.repositories import MongoTaskRepository
+
+    task = Task(title='Task', created_by='alice', updated_at=datetime(2023, 1, 1))
+    repository = MongoTaskRepository('mongodb://localhost:27017', 'test', 'tasks')
+    repository.collection = RecordingCollection(task.to_dict())
+    repository.versions = RecordingCollection({})
+
+    updated = repository.update_fields(task.task_id, {'status': 'completed'})
+    assert updated.status == 'completed'
+    assert updated.title == 'Task'
+    assert updated.updated_at > datetime(2023, 1, 1)
+
+    [(query, update, return_document)] = repository.collection.calls
+    assert query == {'task_id': task.task_id}
+    assert set(update['$set']) == {'status', 'updated_at'}
+    assert return_document == ReturnDocument.AFTER
+    # The owner's change counter is bumped after the write
+    assert repository.versions.calls == [({'_id': 'alice'}, {'$inc': {'version': 1}}, True)]
+
+    assert repository.update_fields('missing', {'status': 'completed'}) is None
+
+class BulkInsertCollection:
+    def __init__(self, failing_index):
+        self.failing_index = failing_index
+        self.calls = []
+
+    def insert_many(self, documents, ordered=True):
+        from pymongo.errors import BulkWriteError
+
+        self.calls.append((documents, ordered))
+        raise BulkWriteError({'writeErrors': [{'index': self.failing_index, 'errmsg': 'duplicate key'}]})
+
+def test_save_many_is_one_unordered_insert():
+    from src.infrastructure.repositories import MongoTaskRepository
+
+    tasks = [Task(title='Task', created_by=user) for user in ('alice', 'bob', 'alice')]
+    repository = MongoTaskRepository('mongodb://localhost:27017', 'test', 'tasks')
+    repository.collection = BulkInsertCollection(failing_index=1)
+    repository.versions = BulkWriteCollection(set())
+
+    assert repository.save_many(tasks) == {1: 'duplicate key'}
+
+    [(documents, ordered)] = repository.collection.calls
+    assert ordered is False
+    assert [d['task_id'] for d in documents] == [t.task_id for t in tasks]
+    # Only users with a saved task get their change counter bumped, all in one bulk_write
+    [(_, operations, ordered)] = repository.versions.calls
+    assert [operation._filter for operation in operations] == [{'_id': 'alice'}]
+    assert ordered is False
+
+class BulkWriteCollection:
+    def __init__(self, existing_ids):
+        self.existing_ids = existing_ids
+        self.calls = []
+        # IDs another request deletes between this request's lookup and its writes
+        self.deleted_concurrently = set()
+
+    def create_index(self, keys, **kwargs):
+        pass
+
+    def index_information(self):
+        return {'_id_': {}}
+
+    def find(self, query, projection=None):
+        self.calls.append(('find', query))
+        found = [{'task_id': task_id} for task_id in query['task_id']['$in'] if task_id in self.existing_ids]
+        self.existing_ids -= self.deleted_concurrently
+        return found
+
+    def bulk_write(self, operations, ordered=True):
+        from pymongo import DeleteOne
+
+        self.calls.append(('bulk_write', operations, ordered))
+        matched = {op._filter.get('task_id') for op in operations} & self.existing_ids
+        if all(isinstance(op, DeleteOne) for op in operations):
+            self.existing_ids -= matched
+        return type('Result', (), {'matched_count': len(matched), 'deleted_count': len(matched)})()
+
+    def insert_many(self, documents, ordered=True):
+        self.calls.append(('insert_many', documents, ordered))
+
+def test_batch_updates_are_one_lookup_and_one_bulk_write():
+    from pymongo import UpdateOne
+    from src.infrastructure.repositories import MongoTaskRepository
+
+    repository = MongoTaskRepository('mongodb://localhost:27017', 'test', 'tasks')
+    repository.collection = BulkWriteCollection({'a', 'b'})
+    repository.tombstones = BulkWriteCollection(set())
+    repository.versions = RecordingCollection({})
+
+    updated = repository.update_fields_many({'a': {'status': 'completed'}, 'c': {'title': 'Missing'}}, 'alice')
+    assert updated == {'a'}
+    (_, query), (_, [operation], ordered) = repository.collection.calls
+    assert query['created_by'] == 'alice'
+    assert isinstance(operation, UpdateOne) and ordered is False
+    assert operation._doc['$set']['status'] == 'completed'
+
+    # A task deleted between the lookup and the write is not reported as updated
+    repository.collection.deleted_concurrently = {'b'}
+    assert repository.update_fields_many({'a': {'title': 'A'}, 'b': {'title': 'B'}}, 'alice') == {'a'}
+    assert len(repository.versions.calls) == 2
+
+def test_batch_deletes_are_one_lookup_and_one_bulk_write():
+    from pymongo import DeleteOne
+    from src.infrastructure import repositories, task_repository
+
+    for repository in (
+        repositories.MongoTaskRepository('mongodb://localhost:27017', 'test', 'tasks'),
+        task_repository.MongoTaskRepository()
+    ):
+        repository.collection = BulkWriteCollection({'a', 'b', 'c'})
+        repository.tombstones = BulkWriteCollection(set())
+        repository.versions = RecordingCollection({})
+
+        # 'c' was deleted by another request, which reports and tombstones it itself
+        repository.collection.existing_ids.discard('c')
+        assert repository.delete_many(['a', 'b', 'c', 'a', 'd'], 'alice') == {'a', 'b'}
+        (_, query), (_, operations, ordered) = repository.collection.calls
+        assert query['created_by'] == 'alice'
+        assert all(isinstance(op, DeleteOne) and op._filter['created_by'] == 'alice' for op in operations)
+        assert sorted(op._filter['task_id'] for op in operations) == ['a', 'b'] and ordered is False
+        [(_, tombstones, _)] = repository.tombstones.calls
+        assert sorted(t._filter['task_id'] for t in tombstones) == ['a', 'b']
+        assert len(repository.versions.calls) == 1
+
+def test_batch_deletes_racing_other_deletes_leave_one_tombstone_per_task():
+    from src.infrastructure.repositories import MongoTaskRepository
+
+    repository = MongoTaskRepository('mongodb://localhost:27017', 'test', 'tasks')
+    repository.collection = BulkWriteCollection({'a', 'b'})
+    repository.tombstones = BulkWriteCollection(set())
+    repository.versions = RecordingCollection({})
+
+    # Another request deletes 'b' between the lookup and the bulk write, and tombstones it too
+    repository.collection.deleted_concurrently = {'b'}
+    assert repository.delete_many(['a', 'b'], 'alice') == {'a', 'b'}
+    [(_, tombstones, _)] = repository.tombstones.calls
+    for tombstone in tombstones:
+        assert tombstone._upsert is True
+        assert set(tombstone._filter) == {'created_by', 'task_id'}
+        assert set(tombstone._doc) == {'$setOnInsert'}
+
+    # When every task was deleted elsewhere, nothing is reported, tombstoned or counted
+    repository.tombstones.calls.clear()
+    repository.collection = BulkWriteCollection({'c'})
+    repository.collection.deleted_concurrently = {'c'}
+    assert repository.delete_many(['c'], 'alice') == set()
+    assert repository.tombstones.calls == []
+    assert len(repository.versions.calls) == 1
+
+class AsyncCollection:
+    """Motor-like view of a fake collection: awaitable writes and an async find cursor."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def find(self, query, projection=None):
+        documents = self.collection.find(query, projection)
+
+        async def cursor():
+            for document in documents:
+                yield document
+        return cursor()
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+def test_motor_batch_writes_match_the_sync_repositories():
+    import asyncio
+    from src.infrastructure.async_repositories import MotorTaskRepository
+
+    repository = MotorTaskRepository('mongodb://localhost:27017', 'test', 'tasks')
+    collection, tombstones = BulkWriteCollection({'a', 'b', 'c'}), BulkWriteCollection(set())
+    repository.collection, repository.tombstones = AsyncCollection(collection), AsyncCollection(tombstones)
+    repository.versions = AsyncCollection(RecordingCollection({}))
+
+    collection.deleted_concurrently = {'b'}
+    assert asyncio.run(repository.update_fields_many({'a': {'title': 'A'}, 'b': {'title': 'B'}}, 'alice')) == {'a'}
+    collection.existing_ids.discard('c')
+    assert asyncio.run(repository.delete_many(['a', 'c', 'a'], 'alice')) == {'a'}
+    (_, query), (_, [operation], ordered) = collection.calls[-2:]
+    assert operation._filter == {'created_by': 'alice', 'task_id': 'a'} and ordered is False
+    [(_, [tombstone], _)] = tombstones.calls
+    assert tombstone._filter == {'created_by': 'alice', 'task_id': 'a'} and tombstone._upsert is True
+
+def test_motor_save_many_bumps_versions_like_the_sync_repositories():
+    import asyncio
+    from src.infrastructure.async_repositories import MotorTaskRepository
+    from src.infrastructure.repositories import MongoTaskRepository
+
+    tasks = [Task(title='Task', created_by=user) for user in ('alice', 'bob', 'carol', 'bob')]
+    sync = MongoTaskRepository('mongodb://localhost:27017', 'test', 'tasks')
+    sync.collection, sync.versions = BulkInsertCollection(failing_index=2), BulkWriteCollection(set())
+    motor = MotorTaskRepository('mongodb://localhost:27017', 'test', 'tasks')
+    motor_versions = BulkWriteCollection(set())
+    motor.collection = AsyncCollection(BulkInsertCollection(failing_index=2))
+    motor.versions = AsyncCollection(motor_versions)
+
+    assert asyncio.run(motor.save_many(tasks)) == sync.save_many(tasks) == {2: 'duplicate key'}
+    [(_, operations, ordered)] = motor_versions.calls
+    [(_, sync_operations, _)] = sync.versions.calls
+    assert ordered is False
+    assert operations == sync_operations
+    assert sorted(operation._filter['_id'] for operation in operations) == ['alice', 'bob']
+
+def test_repositories_share_one_client_per_uri():
+    from src.infrastructure.mongo_clients import get_client
+    from src.infrastructure.repositories import MongoTaskRepository
+
+    first = MongoTaskRepository('mongodb://localhost:27017', 'test', 'tasks')
+    second = MongoTaskRepository('mongodb://localhost:27017', 'test', 'other')
+
+    assert first.client is second.client is get_client('mongodb://localhost:27017')
+    assert get_client('mongodb://localhost:27018') is not first.client
+    assert first.client.options.pool_options.max_pool_size == 100
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires fork()')
+def test_repository_rebinds_to_a_new_client_after_fork():
+    from src.infrastructure.repositories import MongoTaskRepository
+
+    repository = MongoTaskRepository('mongodb://localhost:27017', 'test', 'tasks')
+    parent_client = repository.client
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        rebound = repository.client is not parent_client and repository.collection.database.client is repository.client
+        os.write(write_end, b'1' if rebound else b'0')
+        os._exit(0)
+
+    os.close(write_end)
+    os.waitpid(pid, 0)
+    assert os.read(read_end, 1) == b'1'
+    os.close(read_end)
+    assert repository.client is parent_client
+
+def test_backfill_rewrites_only_string_dates():
+    from bson import ObjectId
+    from src.infrastructure.mongo_queries import LEGACY_DATE_FILTER, backfill_dates
+
+    class BackfillCollection:
+        def __init__(self, documents):
+            self.documents = documents
+            self.batches = []
+
+        def find(self, query, projection=None):
+            assert query == LEGACY_DATE_FILTER
+            return [d for d in self.documents if any(isinstance(d[f], str) for f in ('created_at', 'updated_at'))]
+
+        def bulk_write(self, requests, ordered=True):
+            self.batches.append(len(requests))
+            modified = 0
+            for request in requests:
+                document = next(d for d in self.documents if d['_id'] == request._filter['_id'])
+                if all(document[k] == v for k, v in request._filter.items()):
+                    document.update(request._doc['$set'])
+                    modified += 1
+            return type('Result', (), {'modified_count': modified})()
+
+    when = datetime(2023, 1, 1, 12, 30, 0, 250)
+    documents = [
+        {'_id': ObjectId(), 'created_at': when.isoformat(), 'updated_at': when.isoformat()},
+        {'_id': ObjectId(), 'created_at': when.isoformat(), 'updated_at': when},
+        {'_id': ObjectId(), 'created_at': when, 'updated_at': when},
+        {'_id': ObjectId(), 'created_at': '2023-01-01T13:30:00.000250+01:00', 'updated_at': when},
+    ]
+    collection = BackfillCollection(documents)
+
+    assert backfill_dates(collection, batch_size=2) == 3
+    assert collection.batches == [2, 1]
+    assert all(d['created_at'] == d['updated_at'] == when for d in documents)
+    assert backfill_dates(collection) == 0
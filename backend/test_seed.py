@@ -0,0 +1,36 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+from src import seed
+from src.api import handlers
+from src.infrastructure.sqlite_repository import SqliteTaskRepository
+
+UNTIL = datetime(2024, 6, 1)
+
+def test_batches_are_reproducible_and_skewed():
+    tasks = seed.build_tasks(7, 0, 5000, 200, UNTIL, 30)
+
+    assert [t.task_id for t in tasks] == [t.task_id for t in seed.build_tasks(7, 0, 5000, 200, UNTIL, 30)]
+    assert tasks[0].task_id != seed.build_tasks(7, 5000, 1, 200, UNTIL, 30)[0].task_id
+    statuses = Counter(t.status for t in tasks)
+    assert statuses['completed'] > statuses['pending'] > statuses['in_progress']
+    owners = Counter(t.created_by for t in tasks).most_common()
+    assert owners[0][0] == 'user-0' and owners[0][1] > 10 * owners[-1][1]
+    assert all(UNTIL - timedelta(days=30) <= t.created_at <= t.updated_at <= UNTIL for t in tasks)
+
+def test_workers_insert_every_batch_through_the_repository(tmp_path, monkeypatch):
+    path = str(tmp_path / 'tasks.db')
+    monkeypatch.setattr(handlers, 'TASK_STORAGE', 'sqlite')
+    monkeypatch.setattr(handlers, 'SQLITE_PATH', path)
+    monkeypatch.setattr(handlers, 'TASK_CACHE_ENABLED', False)
+    monkeypatch.setattr(handlers, 'task_repository', None)
+    monkeypatch.setattr(handlers, 'task_service', None)
+
+    results = list(seed.seed_tasks(2500, workers=2, batch_size=1000, users=50, until=UNTIL))
+    assert sorted(results) == [(500, 0), (1000, 0), (1000, 0)]
+    # The same seed builds the same tasks, so seeding again only finds duplicates
+    assert sum(failed for _, failed in seed.seed_tasks(1000, batch_size=1000, users=50, until=UNTIL)) == 1000
+
+    repository = SqliteTaskRepository(path)
+    assert len(repository.get_all()) == 2500
+    assert repository.get_version('user-0') == 3
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from src import serve
+from src.api import handlers
+
+def test_server_options_preload_a_threaded_worker_per_cpu(monkeypatch):
+    monkeypatch.setattr(serve, 'TASK_STORAGE', 'mongo')
+    options = serve.server_options('127.0.0.1:9000', workers=0, threads=8)
+
+    assert options['bind'] == '127.0.0.1:9000'
+    assert options['workers'] == (os.cpu_count() or 1)
+    assert options['worker_class'] == 'gthread'
+    assert options['threads'] == 8
+    assert options['preload_app'] is True
+    assert options['post_fork'] is serve.post_fork
+
+def test_workers_never_split_tasks_kept_in_process_memory(monkeypatch):
+    for storage in ('mongo', 'sqlite'):
+        monkeypatch.setattr(serve, 'TASK_STORAGE', storage)
+        assert serve.server_options(workers=4)['workers'] == 4
+
+    monkeypatch.setattr(serve, 'TASK_STORAGE', 'memory')
+    assert serve.server_options(workers=0)['workers'] == 1
+    with pytest.raises(ValueError, match='TASK_STORAGE=memory'):
+        serve.server_options(workers=4)
+    assert serve.server_options(workers=1, threads=16)['threads'] == 16
+
+def test_post_fork_drops_services_inherited_from_the_master(monkeypatch):
+    monkeypatch.setattr(handlers, 'task_repository', object())
+    monkeypatch.setattr(handlers, 'task_service', object())
+    monkeypatch.setattr(handlers, 'user_repository', object())
+    monkeypatch.setattr(handlers, 'auth_service', object())
+
+    serve.post_fork(None, None)
+
+    assert handlers.user_repository is None
+    assert handlers.task_repository is None
+    assert handlers.task_service is None
+    assert handlers.auth_service is None
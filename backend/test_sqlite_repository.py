@@ -0,0 +1,125 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.domain.exceptions import DatabaseError
+from src.domain.models import Task
+from src.domain.queries import TaskQuery
+from src.infrastructure.sqlite_repository import SqliteTaskRepository
+from test_handlers import FakeTaskRepository
+from test_memory_repository import QUERIES, START, random_tasks, walk
+
+@pytest.fixture
+def repositories(tmp_path):
+    sqlite, reference = SqliteTaskRepository(str(tmp_path / 'tasks.db')), FakeTaskRepository()
+    tasks = random_tasks(300)
+    assert sqlite.save_many(tasks) == {}
+    for task in tasks:
+        reference.save(task)
+    yield sqlite, reference
+    sqlite.close()
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_indexed_listings_match_a_full_scan(repositories, query):
+    sqlite, reference = repositories
+
+    assert walk(sqlite, query, 7) == [task.task_id for task in reference.get_all(query=query)]
+    assert walk(sqlite, query, 1000) == walk(reference, query, 1000)
+
+def test_writes_round_trip_and_bump_versions(repositories):
+    sqlite, reference = repositories
+    owned = [t.task_id for t in reference.get_all(query=TaskQuery(created_by='alice'))]
+    version = sqlite.get_version('alice')
+
+    updated = sqlite.update_fields(owned[0], {'status': 'completed', 'title': 'Renamed'})
+    assert (updated.status, updated.title) == ('completed', 'Renamed')
+    assert sqlite.get_by_id(owned[0]).updated_at == updated.updated_at
+    assert sqlite.update_fields('missing', {'status': 'completed'}) is None
+    with pytest.raises(DatabaseError):
+        sqlite.update_fields(owned[0], {'owner': 'bob'})
+
+    assert sqlite.update_fields_many({owned[1]: {'title': 'Renamed'}}, 'bob') == set()
+    assert sqlite.update_fields_many({owned[1]: {'title': 'Renamed'}, 'missing': {}}, 'alice') == {owned[1]}
+    assert sqlite.delete_many(owned[2:5] + ['missing'], 'alice') == set(owned[2:5])
+    assert sqlite.get_by_id_for_user(owned[1], 'bob') is None
+    assert sqlite.get_by_id_for_user(owned[1], 'alice').title == 'Renamed'
+    assert sqlite.get_version('alice') == version + 3
+    assert sqlite.get_version('nobody') == 0
+
+def test_sync_windows_exclude_since_and_include_until(tmp_path):
+    repository = SqliteTaskRepository(str(tmp_path / 'tasks.db'), tombstone_retention=timedelta(days=1))
+    tasks = [Task(title=f'Task {i}', created_by='alice', updated_at=START + timedelta(seconds=i // 2)) for i in range(6)]
+    for task in tasks:
+        repository.save(task)
+
+    changed = repository.get_changed_for_user('alice', START, START + timedelta(seconds=2))
+    assert [t.task_id for t in changed] == sorted(t.task_id for t in tasks[2:4]) + sorted(t.task_id for t in tasks[4:6])
+    assert len(repository.get_changed_for_user('alice', START, START + timedelta(seconds=2), limit=3)) == 3
+
+    assert repository.delete(tasks[0].task_id)
+    assert not repository.delete(tasks[0].task_id)
+    deleted = repository.get_deleted_for_user('alice', START, datetime.utcnow() + timedelta(seconds=1))
+    assert [tombstone.task_id for tombstone in deleted] == [tasks[0].task_id]
+    with pytest.raises(DatabaseError):
+        repository.save(tasks[1])
+    assert repository.save_many([tasks[1], Task(title='New task', created_by='alice')]).keys() == {0}
+
+def test_batch_deletes_purge_expired_tombstones_once(tmp_path):
+    repository = SqliteTaskRepository(str(tmp_path / 'tasks.db'), tombstone_retention=timedelta(days=1))
+    tasks = [Task(title=f'Task {i}', created_by='alice') for i in range(50)]
+    repository.save_many(tasks)
+    statements = []
+    repository._connection().set_trace_callback(statements.append)
+
+    assert len(repository.delete_many([t.task_id for t in tasks], 'alice')) == 50
+    assert sum(sql.startswith('DELETE FROM task_tombstones') for sql in statements) == 1
+    deleted = repository.get_deleted_for_user('alice', START, datetime.utcnow() + timedelta(seconds=1))
+    assert len(deleted) == 50
+    repository.close()
+
+def test_threads_use_their_own_connections_to_one_wal_database(tmp_path):
+    repository = SqliteTaskRepository(str(tmp_path / 'tasks.db'))
+    connections = set()
+
+    def writer(user):
+        connections.add(repository._connection())
+        for i in range(100):
+            task = repository.save(Task(title=f'Task {i}', created_by=user))
+            if i % 4 == 0:
+                repository.delete(task.task_id)
+
+    threads = [threading.Thread(target=writer, args=(f'user-{n}',)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(connections) == 4
+    assert repository._connection().execute('PRAGMA journal_mode').fetchone() == ('wal',)
+    for n in range(4):
+        assert len(repository.get_all_for_user(f'user-{n}')) == 75
+    repository.close()
+
+def test_connections_of_ended_threads_are_closed(tmp_path):
+    import gc
+    import sqlite3
+
+    repository = SqliteTaskRepository(str(tmp_path / 'tasks.db'))
+    opened = []
+
+    def reader():
+        opened.append(repository._connection())
+        repository.get_version('alice')
+
+    for _ in range(50):
+        thread = threading.Thread(target=reader)
+        thread.start()
+        thread.join()
+    gc.collect()
+
+    assert repository._connections == {repository._connection()}
+    for connection in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute('SELECT 1')
+    repository.close()
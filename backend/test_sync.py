@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.domain.exceptions import SyncExpiredError
+from src.domain.models import Task
+from src.domain.sync import collect_changes
+from test_handlers import FakeTaskRepository
+
+START = datetime(2023, 1, 1)
+NOW = START + timedelta(hours=1)
+
+def add_task(repository, seconds, user='alice'):
+    task = Task(title='Task', created_by=user, updated_at=START + timedelta(seconds=seconds))
+    repository.save(task)
+    return task
+
+def sync_all(repository, since, limit):
+    seen = []
+    while True:
+        result = collect_changes(repository, 'alice', since, limit, now=NOW)
+        seen.extend(task.task_id for task in result.tasks)
+        assert result.watermark > since or not result.has_more
+        since = result.watermark
+        if not result.has_more:
+            return seen, since
+
+def test_pages_end_on_whole_timestamps():
+    repository = FakeTaskRepository()
+    # Three tasks share the timestamp that straddles the first page boundary
+    expected = [add_task(repository, seconds).task_id for seconds in (1, 2, 2, 2, 3, 4)]
+    add_task(repository, 1, user='bob')
+
+    result = collect_changes(repository, 'alice', START, 2, now=NOW)
+    assert len(result.tasks) == 1
+    assert result.watermark == START + timedelta(seconds=1)
+    assert result.has_more
+
+    seen, watermark = sync_all(repository, START, 2)
+    assert sorted(seen) == sorted(expected)
+    assert watermark == NOW - timedelta(seconds=2)
+
+def test_more_ties_than_a_page_are_returned_together():
+    repository = FakeTaskRepository()
+    expected = [add_task(repository, 5).task_id for _ in range(4)]
+
+    result = collect_changes(repository, 'alice', START, 2, now=NOW)
+    assert sorted(task.task_id for task in result.tasks) == sorted(expected)
+    assert result.watermark == START + timedelta(seconds=5)
+
+def test_deletions_are_synced_and_old_watermarks_expire():
+    repository = FakeTaskRepository()
+    task = add_task(repository, 1)
+    repository.delete(task.task_id)
+
+    result = collect_changes(repository, 'alice', START, 10, now=datetime.utcnow() + timedelta(seconds=5))
+    assert result.tasks == []
+    assert [tombstone.task_id for tombstone in result.deleted] == [task.task_id]
+
+    with pytest.raises(SyncExpiredError):
+        collect_changes(repository, 'alice', START, 10, retention=timedelta(minutes=1), now=NOW)
@@ -16,6 +16,8 @@ import {
   Chip,
   CircularProgress,
   Alert,
+  MenuItem,
+  TextField,
 } from '@mui/material';
 import { Edit as EditIcon, Delete as DeleteIcon, Add as AddIcon } from '@mui/icons-material';
 import axios from 'axios';
@@ -36,6 +38,9 @@ const Tasks: React.FC = () => {
   const [tasks, setTasks] = useState<Task[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [statusFilter, setStatusFilter] = useState<string>('');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     if (!isAuthenticated) {
@@ -43,18 +48,32 @@ const Tasks: React.FC = () => {
       return;
     }
     fetchTasks();
-  }, [isAuthenticated, navigate]);
+  }, [isAuthenticated, navigate, statusFilter]);
+
+  // The API returns one page at a time; next_cursor is set while more pages remain
+  const fetchPage = (cursor?: string) => {
+    const params: Record<string, string> = {};
+    if (statusFilter) {
+      params.status = statusFilter;
+    }
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    return axios.get(`${process.env.REACT_APP_API_URL}/tasks`, {
+      headers: {
+        Authorization: `Bearer ${token}`
+      },
+      params
+    });
+  };
 
   const fetchTasks = async () => {
     try {
       setLoading(true);
       setError(null);
-      const response = await axios.get(`${process.env.REACT_APP_API_URL}/tasks`, {
-        headers: {
-          Authorization: `Bearer ${token}`
-        }
-      });
+      const response = await fetchPage();
       setTasks(response.data.tasks || []);
+      setNextCursor(response.data.next_cursor || null);
     } catch (error) {
       console.error('Error fetching tasks:', error);
       setError('Failed to fetch tasks. Please try again later.');
@@ -63,6 +82,24 @@ const Tasks: React.FC = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) {
+      return;
+    }
+    try {
+      setLoadingMore(true);
+      setError(null);
+      const response = await fetchPage(nextCursor);
+      setTasks((current) => [...current, ...(response.data.tasks || [])]);
+      setNextCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Error fetching tasks:', error);
+      setError('Failed to fetch tasks. Please try again later.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (taskId: string) => {
     if (window.confirm('Are you sure you want to delete this task?')) {
       try {
@@ -106,6 +143,19 @@ const Tasks: React.FC = () => {
         <Typography variant="h4" component="h1">
           Tasks
         </Typography>
+        <TextField
+          select
+          size="small"
+          label="Status"
+          value={statusFilter}
+          onChange={(e) => setStatusFilter(e.target.value)}
+          sx={{ minWidth: 160 }}
+        >
+          <MenuItem value="">All</MenuItem>
+          <MenuItem value="pending">Pending</MenuItem>
+          <MenuItem value="in_progress">In progress</MenuItem>
+          <MenuItem value="completed">Completed</MenuItem>
+        </TextField>
         <Button
           variant="contained"
           startIcon={<AddIcon />}
@@ -173,6 +223,13 @@ const Tasks: React.FC = () => {
           </TableBody>
         </Table>
       </TableContainer>
+      {nextCursor && (
+        <Box sx={{ display: 'flex', justifyContent: 'center', mt: 2 }}>
+          <Button variant="outlined" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </Button>
+        </Box>
+      )}
     </Container>
   );
 };